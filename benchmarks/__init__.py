@@ -0,0 +1,3 @@
+"""
+Benchmarks and local upstream stand-ins for the Newsaroo application.
+"""
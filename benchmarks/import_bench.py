@@ -0,0 +1,205 @@
+"""
+Cold-start benchmark for Newsaroo.
+
+Measures how long a fresh interpreter takes to import the application entry
+points (`python -X importtime -c "import <module>"`) and to run
+`python -m src.cli --help`, over several repeats. Reports the median wall time
+per target and the heaviest imports by cumulative time, and can fail with a
+non-zero exit code when a target exceeds a time budget so it can gate CI.
+
+Usage:
+    python -m benchmarks.import_bench --repeats 5
+    python -m benchmarks.import_bench --max-ms src.main=1500 --baseline import_previous.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .report import write_results
+
+DEFAULT_MODULES = ["src.config", "src.cli", "src.main"]
+CLI_HELP = "cli --help"
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output
+
+    Args:
+        stderr (str): Interpreter stderr
+
+    Returns:
+        dict: Module name -> (self microseconds, cumulative microseconds)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def _environ():
+    # Measure the import itself: no log file, cache or persisted statistics
+    return {**os.environ, "NEWSAROO_LOG_FILE": "", "NEWSAROO_CACHE_ENABLED": "false", "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def measure_import(module):
+    """Import a module in a fresh interpreter
+
+    Returns:
+        tuple: (wall milliseconds, parsed importtime dict)
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_environ()
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def measure_cli_help():
+    """Wall time of `python -m src.cli --help` in milliseconds"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "src.cli", "--help"], capture_output=True, text=True, env=_environ()
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"src.cli --help failed:\n{result.stderr[-2000:]}")
+    return (time.perf_counter() - start) * 1000
+
+
+def heaviest(modules, limit, exclude=None):
+    """Top-level packages with the largest cumulative import time
+
+    Args:
+        modules (dict): Parsed importtime output
+        limit (int): Number of entries
+        exclude (str, optional): Package left out, normally the one being measured,
+            whose cumulative time includes everything else
+
+    Returns:
+        list: [package, cumulative milliseconds] pairs, slowest first
+    """
+    packages = {}
+    for name, (_, cumulative_us) in modules.items():
+        root = name.split(".")[0]
+        if root == exclude:
+            continue
+        packages[root] = max(packages.get(root, 0), cumulative_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [[name, round(us / 1000, 1)] for name, us in ranked]
+
+
+def run(modules, repeats, top):
+    """Measure every target
+
+    Returns:
+        dict: Target -> {"median_ms", "min_ms", "max_ms", "heaviest"}
+    """
+    results = {}
+    for module in modules:
+        walls = []
+        last = {}
+        for _ in range(repeats):
+            wall_ms, last = measure_import(module)
+            walls.append(wall_ms)
+        results[module] = {
+            "median_ms": round(statistics.median(walls), 1),
+            "min_ms": round(min(walls), 1),
+            "max_ms": round(max(walls), 1),
+            "heaviest": heaviest(last, top, exclude=module.split(".")[0]),
+        }
+    walls = [measure_cli_help() for _ in range(repeats)]
+    results[CLI_HELP] = {
+        "median_ms": round(statistics.median(walls), 1),
+        "min_ms": round(min(walls), 1),
+        "max_ms": round(max(walls), 1),
+    }
+    return results
+
+
+def check_budgets(results, budgets):
+    """Targets whose median wall time exceeds their budget
+
+    Args:
+        results (dict): Output of run()
+        budgets (dict): Target -> maximum milliseconds
+
+    Returns:
+        list: Human-readable violations
+    """
+    violations = []
+    for target, limit in budgets.items():
+        measured = results.get(target)
+        if measured is None:
+            violations.append(f"{target}: not measured")
+        elif measured["median_ms"] > limit:
+            violations.append(f"{target}: {measured['median_ms']:.0f} ms > {limit:.0f} ms budget")
+    return violations
+
+
+def _parse_budgets(values):
+    budgets = {}
+    for value in values or []:
+        target, _, limit = value.rpartition("=")
+        if not target:
+            raise SystemExit(f"--max-ms expects TARGET=MS, got {value!r}")
+        budgets[target] = float(limit)
+    return budgets
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Newsaroo cold-start (import time) benchmark")
+    parser.add_argument("--modules", type=str, default=",".join(DEFAULT_MODULES), help="Comma-separated modules")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to report per module")
+    parser.add_argument("--max-ms", action="append", metavar="TARGET=MS",
+                        help=f"Fail if a target's median exceeds MS (targets: modules or '{CLI_HELP}')")
+    parser.add_argument("--output", type=str, default="import_results.json", help="Results file")
+    parser.add_argument("--baseline", type=str, help="Previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    modules = [module.strip() for module in args.modules.split(",") if module.strip()]
+    budgets = _parse_budgets(args.max_ms)
+
+    results = run(modules, args.repeats, args.top)
+    config = {"modules": modules, "repeats": args.repeats, "budgets": budgets}
+    write_results(args.output, "import", config, {"targets": results})
+
+    baseline = json.loads(Path(args.baseline).read_text())["results"]["targets"] if args.baseline else {}
+    print("\nCold start (median of fresh interpreters)")
+    for target, stats in results.items():
+        line = f"  {target:<16}{stats['median_ms']:>9.1f} ms"
+        before = baseline.get(target)
+        if before:
+            change = (stats["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+            line += f"  (was {before['median_ms']:.1f} ms, {change:+.1f}%)"
+        print(line)
+        for name, ms in stats.get("heaviest", [])[:5]:
+            print(f"      {name:<24}{ms:>9.1f} ms")
+    print(f"Results written to {args.output}")
+
+    violations = check_budgets(results, budgets)
+    for violation in violations:
+        print(f"Budget exceeded: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Open-loop HTTP load test for the Newsaroo API.
+
+Runs `src.main:app` in a single uvicorn worker (separate process) with every
+external dependency stubbed locally: SerpAPI, publisher sites and the LLM via
+benchmarks.stubs, and Supabase via an in-memory client. Requests are sent at
+fixed arrival rates regardless of how fast the server answers (open loop), and
+latency is measured from the scheduled send time so queueing is not hidden.
+
+For each rate step the tool reports achieved throughput, p50/p95/p99 latency,
+error counts and the server's event-loop lag, then marks the step where
+latency degrades. Results are written as JSON (latency-versus-throughput curve).
+
+Usage:
+    python -m benchmarks.loadtest --rates 1,2,4,8,16 --duration 20
+    python -m benchmarks.loadtest --mix summarize=1 --rates 2,4 --output capacity.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+
+from .report import summarize_latencies, write_results
+from .stubs import DEFAULT_PROFILE, LocalUpstreams
+
+DEFAULT_TOPICS = ["artificial intelligence", "climate", "elections", "markets", "football", "space"]
+LAG_PROBE_INTERVAL = 0.05
+
+
+def _seed_users(count, topics_per_user, rng):
+    users = []
+    for i in range(count):
+        mobile = f"{9000000000 + i}"
+        users.append((mobile, rng.sample(DEFAULT_TOPICS, topics_per_user)))
+    return users
+
+
+# --- Server side -----------------------------------------------------------
+
+def serve(args):
+    """Run the API with in-memory Supabase and an event-loop lag probe"""
+    import uvicorn
+    from src.main import app
+    from src.utils.logging_setup import configure_logging
+    from .stubs import InMemorySupabaseClient, install_in_memory_supabase
+
+    configure_logging(level="WARNING", log_file="")
+    supabase = InMemorySupabaseClient()
+    supabase.seed_users(_seed_users(args.users, args.topics_per_user, random.Random(args.seed)))
+    supabase.latency_ms = args.supabase_latency_ms
+    install_in_memory_supabase(supabase)
+
+    lag = {"max": 0.0, "total": 0.0, "samples": 0, "stalls": 0}
+
+    async def probe():
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            delay = max(0.0, loop.time() - start - LAG_PROBE_INTERVAL)
+            lag["max"] = max(lag["max"], delay)
+            lag["total"] += delay
+            lag["samples"] += 1
+            if delay > args.stall_ms / 1000:
+                lag["stalls"] += 1
+
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan_with_probe(app):
+        async with app_lifespan(app) as state:
+            task = asyncio.create_task(probe())
+            try:
+                yield state
+            finally:
+                task.cancel()
+
+    app.router.lifespan_context = lifespan_with_probe
+
+    # Bench-only endpoint: return and reset the lag statistics
+    @app.get("/_bench/lag", include_in_schema=False)
+    async def read_lag():
+        snapshot = dict(lag)
+        snapshot["mean"] = snapshot["total"] / snapshot["samples"] if snapshot["samples"] else 0.0
+        lag.update({"max": 0.0, "total": 0.0, "samples": 0, "stalls": 0})
+        return snapshot
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, workers=1, log_level="warning", access_log=False)
+
+
+# --- Load generator --------------------------------------------------------
+
+def _parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"summarize", "user"}
+    if unknown:
+        raise SystemExit(f"Unknown request kinds in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+async def run_step(client, rate, duration, mix, users, rng, timeout):
+    """Send requests at `rate` per second for `duration` seconds (Poisson arrivals)"""
+    kinds, weights = zip(*mix.items())
+    samples = {kind: [] for kind in kinds}
+    statuses = {}
+    send_lateness = []
+    tasks = []
+    loop = asyncio.get_running_loop()
+
+    async def fire(kind, target, scheduled):
+        send_lateness.append(max(0.0, loop.time() - scheduled) * 1000)
+        try:
+            if kind == "summarize":
+                response = await client.post(
+                    "/api/v1/news/summarize",
+                    json={"topic": target, "max_articles": 5},
+                    timeout=timeout,
+                )
+            else:
+                response = await client.get(f"/api/v1/users/{target}/summaries", timeout=timeout)
+            status = response.status_code
+        except Exception as e:
+            status = type(e).__name__
+        latency_ms = (loop.time() - scheduled) * 1000
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        if status == 200:
+            samples[kind].append(latency_ms)
+
+    start = loop.time()
+    next_at = start
+    while next_at < start + duration:
+        delay = next_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Draw everything at schedule time so the request sequence depends only on the seed
+        kind = rng.choices(kinds, weights)[0]
+        target = rng.choice(DEFAULT_TOPICS) if kind == "summarize" else rng.choice(users)[0]
+        tasks.append(asyncio.create_task(fire(kind, target, next_at)))
+        next_at += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    all_ok = [value for values in samples.values() for value in values]
+    return {
+        "offered_rps": rate,
+        "sent": len(tasks),
+        "achieved_rps": round(len(all_ok) / elapsed, 3),
+        "latency": summarize_latencies(all_ok),
+        "by_route": {kind: summarize_latencies(values) for kind, values in samples.items()},
+        "statuses": statuses,
+        "error_rate": round(1 - len(all_ok) / len(tasks), 4) if tasks else 0.0,
+        "generator_lateness_p99_ms": summarize_latencies(send_lateness)["p99_ms"],
+    }
+
+
+def find_knee(steps, factor, max_error_rate):
+    """First offered rate where p99 exceeds `factor` x the lowest-rate p99 or errors exceed the limit"""
+    baseline = next((step["latency"]["p99_ms"] for step in steps if step["latency"]["p99_ms"]), None)
+    for step in steps:
+        p99 = step["latency"]["p99_ms"]
+        if step["error_rate"] > max_error_rate or (baseline and p99 and p99 > factor * baseline):
+            return step["offered_rps"]
+    return None
+
+
+async def generate(args, base_url):
+    import httpx
+
+    rng = random.Random(args.seed)
+    users = _seed_users(args.users, args.topics_per_user, random.Random(args.seed))
+    mix = _parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        if args.warmup > 0:
+            # Discarded burst: opens connections and warms imports and code paths
+            await run_step(client, args.rates[0], args.warmup, mix, users, random.Random(args.seed + 1), args.timeout)
+            print(f"  warm-up: {args.warmup:.0f}s at {args.rates[0]:.1f} rps (discarded)")
+        steps = []
+        for rate in args.rates:
+            await client.get("/_bench/lag")  # reset lag statistics
+            step = await run_step(client, rate, args.duration, mix, users, rng, args.timeout)
+            lag = (await client.get("/_bench/lag")).json()
+            step["event_loop_lag"] = {
+                "max_ms": round(lag["max"] * 1000, 2),
+                "mean_ms": round(lag["mean"] * 1000, 2),
+                "stalls": lag["stalls"],
+            }
+            steps.append(step)
+            print(
+                f"  {rate:>6.1f} rps offered  {step['achieved_rps']:>7.2f} ok/s  "
+                f"p50 {step['latency']['p50_ms'] or 0:>8.1f}  p95 {step['latency']['p95_ms'] or 0:>8.1f}  "
+                f"p99 {step['latency']['p99_ms'] or 0:>8.1f} ms  errors {step['error_rate']:.1%}  "
+                f"loop lag max {step['event_loop_lag']['max_ms']:.1f} ms"
+            )
+            await asyncio.sleep(args.cooldown)
+    return steps
+
+
+async def _wait_ready(base_url, process, timeout=60):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit("API server exited during startup")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except Exception:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit("API server did not become ready")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load test for the Newsaroo API")
+    parser.add_argument("command", nargs="?", choices=["run", "serve"], default="run")
+    parser.add_argument("--rates", type=lambda s: [float(r) for r in s.split(",")], default=[1, 2, 4, 8],
+                        help="Comma-separated arrival rates (requests/second)")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per rate step")
+    parser.add_argument("--cooldown", type=float, default=2, help="Pause between steps")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of discarded load before the first step")
+    parser.add_argument("--mix", type=str, default="summarize=1,user=1",
+                        help="Request mix, e.g. summarize=3,user=1")
+    parser.add_argument("--users", type=int, default=50, help="Users seeded into the in-memory Supabase")
+    parser.add_argument("--topics-per-user", type=int, default=2)
+    parser.add_argument("--supabase-latency-ms", type=float, default=20, help="Simulated Supabase round trip")
+    parser.add_argument("--stall-ms", type=float, default=100, help="Event-loop lag counted as a stall")
+    parser.add_argument("--timeout", type=float, default=60, help="Client timeout per request")
+    parser.add_argument("--knee-factor", type=float, default=2.0,
+                        help="p99 growth over the lowest-rate p99 that marks degradation")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--profile", type=str, help="JSON object overriding the upstream simulation profile")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=str, default="loadtest_results.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "serve":
+        serve(args)
+        return
+
+    profile = {**DEFAULT_PROFILE, **(json.loads(args.profile) if args.profile else {})}
+    base_url = f"http://127.0.0.1:{args.port}"
+    with LocalUpstreams(profile) as upstreams:
+        env = {**os.environ, **upstreams.environ(), "NEWSAROO_LOG_FILE": ""}
+        server_args = [
+            sys.executable, "-m", "benchmarks.loadtest", "serve",
+            "--port", str(args.port),
+            "--users", str(args.users),
+            "--topics-per-user", str(args.topics_per_user),
+            "--supabase-latency-ms", str(args.supabase_latency_ms),
+            "--stall-ms", str(args.stall_ms),
+            "--seed", str(args.seed),
+        ]
+        server = subprocess.Popen(server_args, env=env)
+        try:
+            asyncio.run(_wait_ready(base_url, server))
+            print(f"Load test against {base_url} ({args.duration:.0f}s per step, mix {args.mix})")
+            steps = asyncio.run(generate(args, base_url))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    knee = find_knee(steps, args.knee_factor, args.max_error_rate)
+    results = {"steps": steps, "degradation_rps": knee}
+    config = {key: value for key, value in vars(args).items() if key not in ("command", "output")}
+    config["profile"] = profile
+    write_results(args.output, "loadtest", config, results)
+    if knee is None:
+        print("\nNo degradation within the tested rates")
+    else:
+        print(f"\nLatency degrades at {knee} rps offered")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
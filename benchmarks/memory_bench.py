@@ -0,0 +1,143 @@
+"""
+Memory benchmark for article representations in Newsaroo.
+
+Builds a batch of synthetic SerpAPI results with fetched page text (10,000
+articles by default) and measures with tracemalloc how much memory the
+pipeline's article representation adds on top of the raw results:
+
+- records: the current pipeline (search results as ArticleRecords, then
+  process_news_results)
+- dicts: the previous representation, kept here as a reference: a copy of
+  every SERP dict plus a processed `article_info` dict with a 200-character
+  snippet
+
+Page text is allocated before measuring, so only per-article overhead is
+compared.
+
+Usage:
+    python -m benchmarks.memory_bench --articles 10000
+    python -m benchmarks.memory_bench --output memory_results.json
+"""
+
+import argparse
+import asyncio
+import gc
+import random
+import tracemalloc
+
+from .report import write_results
+
+
+def synthetic_results(count, publishers, content_chars, seed):
+    """SERP-shaped results and their fetched page text
+
+    Each result is decoded separately, as it would be from JSON, so strings are
+    not shared between articles unless the representation shares them.
+    """
+    rng = random.Random(seed)
+    names = [f"Publisher {i}" for i in range(publishers)]
+    words = ["market", "policy", "launch", "report", "climate", "election", "court", "team", "growth", "study"]
+    results, pages = [], []
+    for i in range(count):
+        name = rng.choice(names)
+        results.append({
+            "position": i + 1,
+            "title": f"Story {i}: {rng.choice(words)} {rng.choice(words)}",
+            "link": f"https://{name.lower().replace(' ', '')}.example/news/{i}",
+            # A fresh name string per article, as json.loads would produce
+            "source": {"name": "".join(list(name)), "icon": f"https://{i}.example/icon.png"},
+            "date": "2 hours ago",
+            "snippet": " ".join(rng.choice(words) for _ in range(25)),
+        })
+        pages.append(" ".join(rng.choice(words) for _ in range(content_chars // 7)))
+    return results, pages
+
+
+def build_dicts(results, pages):
+    """The previous pipeline: copied SERP dicts, then processed article_info dicts"""
+    enhanced = []
+    for article, page in zip(results, pages):
+        article = dict(article)
+        article["full_content"] = page
+        enhanced.append(article)
+    processed = []
+    for article in enhanced:
+        content = article.get("full_content") or article.get("snippet") or "No content available"
+        processed.append({
+            "title": article.get("title", "Untitled"),
+            "source": article.get("source", "Unknown Source"),
+            "content": content,
+            "snippet": content[:200] + "..." if len(content) > 200 else content,
+            "link": article.get("link"),
+        })
+    return enhanced, processed
+
+
+def build_records(results, pages):
+    """The current pipeline: ArticleRecords built from the SERP results, then processed"""
+    from src.news.content import process_news_results
+    from src.news.records import ArticleRecord
+
+    records = []
+    for result, page in zip(results, pages):
+        record = ArticleRecord.from_serp(result)
+        record.full_content = page
+        records.append(record)
+    processed = asyncio.run(process_news_results(records, max_articles=len(records)))
+    return records, processed
+
+
+def measure(build, results, pages):
+    """Bytes retained and peak bytes allocated by build(results, pages)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        kept = build(results, pages)
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return {
+        "retained_bytes": after - before,
+        "peak_bytes": peak - before,
+        "retained_per_article": round((after - before) / len(results), 1),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Memory used per article by the pipeline's article representation")
+    parser.add_argument("--articles", type=int, default=10000, help="Articles in the batch")
+    parser.add_argument("--publishers", type=int, default=300, help="Distinct publisher names")
+    parser.add_argument("--content-chars", type=int, default=3000, help="Fetched page text per article")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=str, default="memory_results.json", help="Results file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from src.utils.logging_setup import configure_logging
+    configure_logging(level="WARNING", log_file="")
+
+    results, pages = synthetic_results(args.articles, args.publishers, args.content_chars, args.seed)
+    measured = {
+        "dicts": measure(build_dicts, results, pages),
+        "records": measure(build_records, results, pages),
+    }
+    saved = 1 - measured["records"]["retained_bytes"] / measured["dicts"]["retained_bytes"]
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, "memory", config, {**measured, "retained_saving": round(saved, 4)})
+
+    print(f"\nArticle representation overhead for {args.articles} articles (page text excluded)")
+    for name, stats in measured.items():
+        print(f"  {name:<8}{stats['retained_bytes'] / 1e6:>9.2f} MB retained  "
+              f"{stats['peak_bytes'] / 1e6:>9.2f} MB peak  {stats['retained_per_article']:>8.1f} B/article")
+    print(f"  records retain {saved:.1%} less than dicts")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
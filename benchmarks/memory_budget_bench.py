@@ -0,0 +1,210 @@
+"""
+Stress test of the in-flight memory budget.
+
+Sends a burst of multi-topic user digests through the pipeline
+(search_news -> process_news_results -> summarize_with_llm for every topic of
+every user at once) against local stand-ins serving large publisher pages,
+and samples the worker's resident set size throughout. Each run happens in a
+fresh interpreter, since the budget is read from the environment, while the
+stand-ins stay in the parent. It is warmed up with one digest before the
+baseline RSS is taken.
+
+- budgeted: NEWSAROO_MEMORY_BUDGET_MB=--budget-mb
+- unbounded: NEWSAROO_MEMORY_BUDGET_MB=0, for comparison
+
+The budgeted run passes when its peak RSS rises no more than the budget above
+the baseline.
+
+Usage:
+    python -m benchmarks.memory_budget_bench --users 8 --topics-per-user 5 --budget-mb 64
+    python -m benchmarks.memory_budget_bench --output memory_budget_results.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .report import write_results
+from .stubs import LocalUpstreams
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    """Current resident set size of this process (Linux), or its peak elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakSampler:
+    """Samples RSS and the reserved budget on a thread, keeping the peaks
+
+    Args:
+        interval (float): Seconds between samples
+    """
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_reserved = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        from src.utils.memory_budget import get_memory_budget
+        budget = get_memory_budget()
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, rss_bytes())
+            if budget is not None:
+                self.peak_reserved = max(self.peak_reserved, budget.in_use)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def digest(topics, max_articles):
+    """One user's digest: every topic through the pipeline at once"""
+    from src.news.content import process_news_results
+    from src.news.search import search_news
+    from src.news.summary import summarize_with_llm
+
+    async def one(topic):
+        records = await search_news(topic)
+        processed = await process_news_results(records, max_articles=max_articles)
+        return await summarize_with_llm(processed, topic)
+
+    return await asyncio.gather(*(one(topic) for topic in topics), return_exceptions=True)
+
+
+def upstream_profile(page_kb):
+    """Fast upstreams serving pages of about page_kb each"""
+    return {
+        "serp_latency_ms": 20, "serp_latency_sigma": 0, "serp_results": 10,
+        "publishers": 10, "page_latency_ms": 30, "page_latency_sigma": 0.3,
+        "page_size_kb": page_kb, "page_size_sigma": 0.2, "page_error_rate": 0,
+        "llm_ttft_ms": 50, "llm_tokens_per_sec": 2000, "llm_completion_tokens": 100,
+    }
+
+
+def run_burst(args):
+    """Warm up, then run the burst in this process and measure it
+
+    The environment must already point at the stand-ins (see run_child).
+    """
+    from src.utils.logging_setup import configure_logging
+    configure_logging(level="ERROR", log_file="")
+    import logging
+    logging.getLogger("LiteLLM").setLevel(logging.ERROR)
+
+    async def burst():
+        # Imports, connection setup and the first parse happen before the baseline
+        await digest(["warm up"], args.max_articles)
+        gc.collect()
+        baseline = rss_bytes()
+        users = [
+            [f"user {user} topic {topic}" for topic in range(args.topics_per_user)]
+            for user in range(args.users)
+        ]
+        start = time.perf_counter()
+        with PeakSampler() as sampler:
+            outcomes = await asyncio.gather(*(digest(topics, args.max_articles) for topics in users))
+        elapsed = time.perf_counter() - start
+        errors = sum(isinstance(outcome, BaseException) for results in outcomes for outcome in results)
+        return baseline, sampler, elapsed, errors
+
+    baseline, sampler, elapsed, errors = asyncio.run(burst())
+    growth = sampler.peak_rss - baseline
+    budget = args.budget_mb * 1024 * 1024
+    return {
+        "budget_mb": args.budget_mb,
+        "baseline_rss_mb": round(baseline / 2**20, 1),
+        "peak_rss_mb": round(sampler.peak_rss / 2**20, 1),
+        "rss_growth_mb": round(growth / 2**20, 1),
+        "peak_reserved_mb": round(sampler.peak_reserved / 2**20, 1),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "within_budget": growth <= budget if budget else None,
+    }
+
+
+def run_child(args, budget_mb):
+    """Run one burst in a fresh interpreter and return its measurements
+
+    The stand-ins run in this process, so the pages they generate and send
+    are not counted in the measured worker's RSS.
+    """
+    with LocalUpstreams(upstream_profile(args.page_kb)) as upstreams:
+        environ = {
+            **os.environ,
+            **upstreams.environ(),
+            "NEWSAROO_MEMORY_BUDGET_MB": str(budget_mb),
+            # Connections are bounded by the budget here, not per host
+            "NEWSAROO_FETCH_MAX_PER_HOST": "1000",
+        }
+        command = [
+            sys.executable, "-m", "benchmarks.memory_budget_bench", "--child",
+            "--users", str(args.users), "--topics-per-user", str(args.topics_per_user),
+            "--max-articles", str(args.max_articles), "--budget-mb", str(budget_mb),
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True, env=environ,
+                                   cwd=Path(__file__).resolve().parent.parent)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Burst failed: {completed.stderr[-2000:]}")
+        pages = upstreams.farm.requests
+    return {**json.loads(completed.stdout.strip().splitlines()[-1]), "pages_fetched": pages}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Peak RSS of a burst of user digests with and without the memory budget")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent user digests")
+    parser.add_argument("--topics-per-user", type=int, default=5, help="Topics in each digest")
+    parser.add_argument("--max-articles", type=int, default=5, help="Articles summarized per topic")
+    parser.add_argument("--page-kb", type=int, default=256, help="Median publisher page size")
+    parser.add_argument("--budget-mb", type=float, default=64, help="Memory budget of the budgeted run")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", type=str, default="memory_budget_results.json", help="Results file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(run_burst(args)))
+        return
+
+    results = {"budgeted": run_child(args, args.budget_mb), "unbounded": run_child(args, 0)}
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "child")}
+    write_results(args.output, "memory_budget", config, results)
+
+    print(f"\n{args.users} digests of {args.topics_per_user} topics, ~{args.page_kb} KB pages")
+    for name, stats in results.items():
+        print(f"  {name:<10}{stats['rss_growth_mb']:>8.1f} MB RSS growth  {stats['peak_reserved_mb']:>7.1f} MB reserved  "
+              f"{stats['elapsed_s']:>6.2f} s  {stats['pages_fetched']} pages")
+    verdict = "within" if results["budgeted"]["within_budget"] else "OVER"
+    print(f"  budgeted run stayed {verdict} its {args.budget_mb:g} MB budget")
+    print(f"Results written to {args.output}")
+    if not results["budgeted"]["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Offline end-to-end benchmark of the Newsaroo pipeline.
+
+Starts local stand-ins for SerpAPI, publisher sites and the LLM, then drives
+search_news -> process_news_results -> summarize_with_llm directly and through
+the FastAPI `/api/v1/news/summarize` route. Reports throughput and p50/p95/p99
+for every stage and writes the results as JSON for comparison across commits.
+
+Usage:
+    python -m benchmarks.pipeline_bench --iterations 40 --concurrency 4
+    python -m benchmarks.pipeline_bench --output bench.json --baseline previous.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from .report import compare_results, print_table, summarize_latencies, write_results
+from .stubs import DEFAULT_PROFILE, LocalUpstreams
+
+DEFAULT_TOPICS = ["artificial intelligence", "climate", "elections", "markets", "football"]
+
+
+def _collect(samples, trace, total_ms, name):
+    """Group the spans of one request by span name"""
+    samples.setdefault(name, []).append(total_ms)
+    for entry in trace:
+        samples.setdefault(entry["span"], []).append(entry["duration_ms"])
+
+
+async def _run_bounded(jobs, concurrency):
+    """Run coroutine factories with bounded concurrency, each in its own task"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def guarded(job):
+        async with semaphore:
+            return await job()
+
+    return await asyncio.gather(*(asyncio.create_task(guarded(job)) for job in jobs), return_exceptions=True)
+
+
+async def bench_pipeline(topics, iterations, concurrency, max_articles):
+    """Drive the pipeline functions directly"""
+    from src.news.search import search_news
+    from src.news.content import process_news_results
+    from src.news.summary import summarize_with_llm
+    from src.utils.metrics import start_trace
+
+    samples = {}
+
+    async def one(topic):
+        trace = start_trace()
+        start = time.perf_counter()
+        news_results = await search_news(topic)
+        processed = await process_news_results(news_results, max_articles=max_articles)
+        await summarize_with_llm(processed, topic)
+        _collect(samples, trace, (time.perf_counter() - start) * 1000, "pipeline")
+
+    jobs = [lambda topic=topics[i % len(topics)]: one(topic) for i in range(iterations)]
+    start = time.perf_counter()
+    outcomes = await _run_bounded(jobs, concurrency)
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for outcome in outcomes if isinstance(outcome, BaseException))
+    stages = {name: summarize_latencies(values, elapsed) for name, values in sorted(samples.items())}
+    return {"stages": stages, "errors": errors, "elapsed_s": round(elapsed, 3)}
+
+
+async def bench_routes(topics, iterations, concurrency, max_articles):
+    """Drive the FastAPI summarize route in-process through an ASGI transport"""
+    import httpx
+    from src.main import app
+
+    samples = {}
+    statuses = {}
+
+    async def one(topic):
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/v1/news/summarize",
+            json={"topic": topic, "max_articles": max_articles, "include_timings": True},
+        )
+        total_ms = (time.perf_counter() - start) * 1000
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        # Failed requests are counted in statuses but kept out of the latency samples
+        if response.status_code == 200:
+            _collect(samples, response.json()["metadata"].get("timings", []), total_ms, "route.news_summarize")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        jobs = [lambda topic=topics[i % len(topics)]: one(topic) for i in range(iterations)]
+        start = time.perf_counter()
+        await _run_bounded(jobs, concurrency)
+        elapsed = time.perf_counter() - start
+
+    stages = {f"route:{name}" if not name.startswith("route.") else name: summarize_latencies(values, elapsed)
+              for name, values in sorted(samples.items())}
+    return {"stages": stages, "statuses": statuses, "elapsed_s": round(elapsed, 3)}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Newsaroo pipeline benchmark")
+    parser.add_argument("--iterations", type=int, default=20, help="Pipeline runs per mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent pipeline runs")
+    parser.add_argument("--max-articles", type=int, default=5, help="Articles passed to the summarizer")
+    parser.add_argument("--topics", type=str, default=",".join(DEFAULT_TOPICS), help="Comma-separated topics")
+    parser.add_argument("--mode", choices=["pipeline", "routes", "both"], default="both")
+    parser.add_argument("--html-dir", type=str, help="Directory of recorded publisher HTML pages")
+    parser.add_argument("--profile", type=str, help="JSON object overriding the upstream simulation profile")
+    parser.add_argument("--output", type=str, default="bench_results.json", help="Results file")
+    parser.add_argument("--baseline", type=str, help="Previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profile = {**DEFAULT_PROFILE, **(json.loads(args.profile) if args.profile else {})}
+    topics = [topic.strip() for topic in args.topics.split(",") if topic.strip()]
+
+    with LocalUpstreams(profile, args.html_dir) as upstreams:
+        # The application reads its configuration at import time, so point it at the
+        # stand-ins before importing anything from src
+        os.environ.update(upstreams.environ())
+        import src.main  # noqa: F401  (import the app before configuring logging so ours wins)
+        from src.utils.logging_setup import configure_logging
+        configure_logging(level="WARNING", log_file="")
+        logging.getLogger("LiteLLM").setLevel(logging.WARNING)
+
+        results = {"stages": {}}
+        if args.mode in ("pipeline", "both"):
+            pipeline = asyncio.run(bench_pipeline(topics, args.iterations, args.concurrency, args.max_articles))
+            results["stages"].update(pipeline.pop("stages"))
+            results["pipeline"] = pipeline
+        if args.mode in ("routes", "both"):
+            routes = asyncio.run(bench_routes(topics, args.iterations, args.concurrency, args.max_articles))
+            results["stages"].update(routes.pop("stages"))
+            results["routes"] = routes
+        results["upstream_requests"] = {
+            "serpapi": upstreams.serp.requests,
+            "publishers": upstreams.farm.requests,
+            "llm": upstreams.llm.requests,
+        }
+
+    config = {
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "max_articles": args.max_articles,
+        "topics": topics,
+        "mode": args.mode,
+        "profile": profile,
+    }
+    document = write_results(args.output, "pipeline", config, results)
+    print_table("Stage latencies", results["stages"])
+    print(f"\nUpstream requests: {results['upstream_requests']}")
+    print(f"Results written to {args.output}")
+    if args.baseline:
+        compare_results(args.baseline, document)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Polling benchmark for the Newsaroo summary endpoints.
+
+Clients poll `/api/v1/users/{mobile}/summaries` and `/api/v1/news/summarize`
+for summaries that rarely change between polls. This benchmark warms the
+shared cache against the local upstream stand-ins, then polls each endpoint
+in-process in three ways and reports bytes sent and CPU time per poll:
+
+- full: no validators, uncompressed (how clients polled before ETags)
+- compressed: Accept-Encoding gzip/br, still a full body every time
+- conditional: compressed, sending the last ETag in If-None-Match (304s)
+
+CPU time is the whole process's (server and the in-process client), so the
+modes differ only by what the server does per poll.
+
+Usage:
+    python -m benchmarks.poll_bench --polls 500
+    python -m benchmarks.poll_bench --output poll_results.json
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from .report import write_results
+from .stubs import LocalUpstreams
+
+MODES = {
+    "full": {"Accept-Encoding": "identity"},
+    "compressed": {"Accept-Encoding": "gzip, br"},
+    "conditional": {"Accept-Encoding": "gzip, br"},
+}
+
+
+def _wire_bytes(response):
+    """Body bytes as sent (before decompression) plus the response headers"""
+    headers = sum(len(name) + len(value) + 4 for name, value in response.headers.raw)
+    return response.num_bytes_downloaded + headers
+
+
+async def bench_polls(request, polls):
+    """Poll one endpoint in every mode
+
+    Args:
+        request (dict): httpx request arguments (method, url and optionally json)
+        polls (int): Polls per mode
+
+    Returns:
+        dict: Mode -> bytes, CPU time and status counts per poll
+    """
+    import httpx
+    from src.main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        # The first request fills the cache; every poll after it is served from there
+        warm = await client.request(**request)
+        if warm.status_code != 200:
+            raise RuntimeError(f"Warm-up request failed with {warm.status_code}: {warm.text[:200]}")
+
+        for mode, headers in MODES.items():
+            etag = None
+            sent = 0
+            statuses = {}
+            cpu_start, start = time.process_time(), time.perf_counter()
+            for _ in range(polls):
+                poll_headers = dict(headers)
+                if mode == "conditional" and etag:
+                    poll_headers["If-None-Match"] = etag
+                response = await client.request(**request, headers=poll_headers)
+                etag = response.headers.get("etag", etag)
+                sent += _wire_bytes(response)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            cpu, elapsed = time.process_time() - cpu_start, time.perf_counter() - start
+            results[mode] = {
+                "bytes_per_poll": round(sent / polls, 1),
+                "cpu_ms_per_poll": round(cpu * 1000 / polls, 3),
+                "wall_ms_per_poll": round(elapsed * 1000 / polls, 3),
+                "statuses": statuses,
+            }
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bytes sent and CPU time per poll of the summary endpoints")
+    parser.add_argument("--polls", type=int, default=300, help="Polls per endpoint and mode")
+    parser.add_argument("--topic", type=str, default="artificial intelligence", help="Topic polled")
+    parser.add_argument("--max-articles", type=int, default=10, help="Articles per summary")
+    parser.add_argument("--output", type=str, default="poll_results.json", help="Results file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mobile = "9000000000"
+
+    with LocalUpstreams() as upstreams, tempfile.TemporaryDirectory() as cache_dir:
+        # Polls are meant to hit the summary cache, as they do in production
+        os.environ.update(upstreams.environ())
+        os.environ["NEWSAROO_CACHE_ENABLED"] = "true"
+        os.environ["NEWSAROO_CACHE_PATH"] = os.path.join(cache_dir, "cache.sqlite3")
+        import src.main  # noqa: F401  (import the app before configuring logging so ours wins)
+        from src.utils.logging_setup import configure_logging
+        from .stubs import InMemorySupabaseClient, install_in_memory_supabase
+        configure_logging(level="WARNING", log_file="")
+        logging.getLogger("LiteLLM").setLevel(logging.WARNING)
+        install_in_memory_supabase(InMemorySupabaseClient().seed_users([(mobile, [args.topic])]))
+
+        endpoints = {
+            "user_summaries": {"method": "GET", "url": f"/api/v1/users/{mobile}/summaries"},
+            "news_summarize": {"method": "POST", "url": "/api/v1/news/summarize",
+                               "json": {"topic": args.topic, "max_articles": args.max_articles}},
+        }
+        results = {name: asyncio.run(bench_polls(request, args.polls)) for name, request in endpoints.items()}
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, "poll", config, results)
+
+    for name, modes in results.items():
+        print(f"\n{name}: {args.polls} polls per mode")
+        for mode, stats in modes.items():
+            print(f"  {mode:<12}{stats['bytes_per_poll']:>10.1f} B/poll  {stats['cpu_ms_per_poll']:>8.3f} ms CPU/poll  "
+                  f"statuses {stats['statuses']}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
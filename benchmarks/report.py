@@ -0,0 +1,104 @@
+"""
+Result aggregation and reporting shared by the benchmark tools.
+"""
+
+import json
+import math
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize_latencies(samples_ms, elapsed_s=None):
+    """Summarize latency samples (milliseconds) as count/mean/p50/p95/p99
+
+    Args:
+        samples_ms (list): Latency samples in milliseconds
+        elapsed_s (float, optional): Wall-clock duration used for throughput
+
+    Returns:
+        dict: Summary statistics
+    """
+    summary = {
+        "count": len(samples_ms),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 2) if samples_ms else None,
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "max_ms": max(samples_ms) if samples_ms else None,
+    }
+    if elapsed_s:
+        summary["throughput_per_s"] = round(len(samples_ms) / elapsed_s, 3)
+    return summary
+
+
+def git_revision():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def write_results(path, benchmark, config, results):
+    """Write benchmark results as JSON so runs can be compared across commits
+
+    Args:
+        path (str): Output file
+        benchmark (str): Benchmark name
+        config (dict): Parameters the benchmark ran with
+        results (dict): Measured results
+    """
+    document = {
+        "benchmark": benchmark,
+        "commit": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "config": config,
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(document, indent=2, sort_keys=True))
+    return document
+
+
+def compare_results(baseline_path, current):
+    """Print p50/p95/p99 changes of each stage against a previous results file"""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nComparison against {baseline.get('commit')} ({baseline_path}):")
+    for name, stats in current["results"].get("stages", {}).items():
+        before = baseline["results"].get("stages", {}).get(name)
+        if not before:
+            print(f"  {name:<24} (new)")
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if before.get(key) and stats.get(key) is not None:
+                change = (stats[key] - before[key]) / before[key] * 100
+                deltas.append(f"{key[:-3]} {before[key]:.1f}->{stats[key]:.1f}ms ({change:+.1f}%)")
+        print(f"  {name:<24} " + "  ".join(deltas))
+
+
+def print_table(title, stages):
+    """Print stage statistics as a table"""
+    print(f"\n{title}")
+    print(f"  {'stage':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'per s':>9}")
+    for name, stats in stages.items():
+        def fmt(value):
+            return f"{value:.1f}" if isinstance(value, (int, float)) else "-"
+        print(
+            f"  {name:<24}{stats['count']:>7}{fmt(stats['p50_ms']):>10}{fmt(stats['p95_ms']):>10}"
+            f"{fmt(stats['p99_ms']):>10}{fmt(stats.get('throughput_per_s')):>9}"
+        )
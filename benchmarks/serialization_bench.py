@@ -0,0 +1,164 @@
+"""
+Micro-benchmark of /news/summarize response serialization.
+
+Serializes one synthetic NewsResponse body (10 articles by default)
+repeatedly in each of the ways the API has produced it:
+
+- models: Article and NewsResponse models, then FastAPI's response_model
+  validation and JSONResponse rendering (the original route)
+- validated: the body dict validated once against NewsResponse and encoded by
+  Pydantic (NEWSAROO_FAST_JSON=false)
+- fast: the body dict encoded directly, with orjson when installed (default)
+- cached: a hit in the shared response cache, which stores the serialized
+  body; the SQLite read itself is not included
+
+Usage:
+    python -m benchmarks.serialization_bench --articles 10 --iterations 5000
+    python -m benchmarks.serialization_bench --output serialization_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from .report import write_results
+
+
+def synthetic_articles(count, content_chars):
+    """Processed ArticleRecords shaped like the pipeline's output"""
+    from src.news.records import ArticleRecord
+
+    return [
+        ArticleRecord(
+            f"Story {i}: markets react to the latest policy report",
+            link=f"https://publisher{i % 7}.example/news/{i}",
+            source={"name": f"Publisher {i % 7}", "icon": f"https://publisher{i % 7}.example/icon.png"},
+            full_content=("Officials said the report would shape next year's policy. " * 100)[:content_chars],
+        )
+        for i in range(count)
+    ]
+
+
+def _metadata(articles):
+    return {"time_period": "1d", "articles_found": len(articles), "total_results": len(articles),
+            "degraded": False, "model": "gpt-4", "model_reason": "preferred"}
+
+
+def _summary():
+    return "\n".join(f"{n}. Headline {n}\n   A sentence about what happened and why it matters." for n in range(1, 6))
+
+
+async def serialize_models(articles):
+    """The original route: models, then FastAPI's response_model handling"""
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from src.api.models import Article, NewsResponse
+
+    field = _response_field()
+    response = NewsResponse(
+        topic="markets",
+        summary=_summary(),
+        articles=[
+            Article(title=a.title, source_name=a.source, source_details=a.source_details or {}, summary=a.preview)
+            for a in articles
+        ],
+        timestamp=datetime.now().isoformat(),
+        metadata=_metadata(articles),
+    )
+    content = await serialize_response(field=field, response_content=response)
+    return JSONResponse(content).body
+
+
+async def serialize_validated(articles):
+    """The body dict validated once and encoded by Pydantic"""
+    from src.api.models import NewsResponse
+    from src.api.serialization import news_response
+
+    body = news_response("markets", _summary(), articles, datetime.now().isoformat(), _metadata(articles))
+    return NewsResponse.model_validate(body).model_dump_json().encode("utf-8")
+
+
+async def serialize_fast(articles):
+    """The body dict encoded directly"""
+    from src.api.serialization import dumps, news_response
+
+    return dumps(news_response("markets", _summary(), articles, datetime.now().isoformat(), _metadata(articles)))
+
+
+_field = None
+
+
+def _response_field():
+    # The response field FastAPI built for the route, so validation matches the real one
+    global _field
+    if _field is None:
+        from src.api.routes import router
+        route = next(route for route in router.routes if route.path == "/news/summarize")
+        _field = route.response_field
+    return _field
+
+
+async def measure(serialize, articles, iterations):
+    """Microseconds per response and the body size"""
+    body = await serialize(articles)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await serialize(articles)
+    elapsed = time.perf_counter() - start
+    return {"us_per_response": round(elapsed / iterations * 1e6, 2), "body_bytes": len(body)}
+
+
+async def measure_cached(articles, iterations):
+    """A response cache hit: the stored entry is decoded and its body sent as is"""
+    stored = json.dumps({"body": (await serialize_fast(articles)).decode("utf-8"), "etag": '"tag"', "degraded": False})
+    start = time.perf_counter()
+    for _ in range(iterations):
+        entry = json.loads(stored)
+        body = entry["body"].encode("utf-8")
+    elapsed = time.perf_counter() - start
+    return {"us_per_response": round(elapsed / iterations * 1e6, 2), "body_bytes": len(body)}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CPU time per /news/summarize response serialization")
+    parser.add_argument("--articles", type=int, default=10, help="Articles per response")
+    parser.add_argument("--content-chars", type=int, default=3000, help="Extracted text per article")
+    parser.add_argument("--iterations", type=int, default=3000, help="Responses serialized per mode")
+    parser.add_argument("--output", type=str, default="serialization_results.json", help="Results file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from src.api import serialization
+    from src.utils.logging_setup import configure_logging
+    configure_logging(level="WARNING", log_file="")
+
+    articles = synthetic_articles(args.articles, args.content_chars)
+
+    async def run():
+        return {
+            "models": await measure(serialize_models, articles, args.iterations),
+            "validated": await measure(serialize_validated, articles, args.iterations),
+            "fast": await measure(serialize_fast, articles, args.iterations),
+            "cached": await measure_cached(articles, args.iterations),
+        }
+
+    results = asyncio.run(run())
+    for stats in results.values():
+        stats["speedup"] = round(results["models"]["us_per_response"] / stats["us_per_response"], 1)
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    config["orjson"] = serialization.orjson is not None
+    write_results(args.output, "serialization", config, results)
+
+    print(f"\nSerializing one response with {args.articles} articles (orjson: {config['orjson']})")
+    for name, stats in results.items():
+        print(f"  {name:<10}{stats['us_per_response']:>10.2f} us/response  {stats['body_bytes']:>7} B  "
+              f"{stats['speedup']:>6.1f}x")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
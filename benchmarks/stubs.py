@@ -0,0 +1,456 @@
+"""
+Local stand-ins for the upstream services used by the Newsaroo pipeline.
+
+- FakeSerpApi: a `google_news` endpoint returning links into the publisher farm
+- PublisherFarm: publisher sites serving recorded (or generated) HTML with
+  configurable latency, size and error distributions
+- FakeCompletionServer: an OpenAI-compatible `/v1/chat/completions` endpoint
+  with a configurable time-to-first-token and token rate
+
+Every server runs in a daemon thread on 127.0.0.1 with an ephemeral port.
+"""
+
+import collections
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Default shape of the simulated upstreams
+DEFAULT_PROFILE = {
+    "serp_latency_ms": 400,        # Median SerpAPI response time
+    "serp_latency_sigma": 0.3,     # Log-normal spread of the SerpAPI latency
+    "serp_results": 10,            # Articles returned per search
+    "publishers": 5,               # Number of distinct publisher domains
+    "page_latency_ms": 250,        # Median publisher response time
+    "page_latency_sigma": 0.8,     # Log-normal spread (heavy tail) of page latency
+    "page_size_kb": 80,            # Median HTML page size
+    "page_size_sigma": 0.6,        # Log-normal spread of the page size
+    "page_error_rate": 0.05,       # Fraction of page requests answered with a 503
+    "llm_ttft_ms": 300,            # Time to first token
+    "llm_tokens_per_sec": 200,     # Completion token rate
+    "llm_completion_tokens": 200,  # Tokens generated per completion
+    # Per-model overrides of the llm_* settings, e.g. {"gpt-4o-mini": {"llm_ttft_ms": 50}};
+    # "llm_status" (e.g. 500) makes a model fail
+    "llm_models": {},
+    "seed": 1234,
+}
+
+_WORDS = (
+    "market policy government research company launch report growth data model "
+    "court league season climate energy investors election analysts startup "
+    "regulators technology shares quarter record announced"
+).split()
+
+
+def lognormal(rng, median, sigma):
+    """Sample a log-normal value with the given median"""
+    if median <= 0:
+        return 0.0
+    return rng.lognormvariate(math.log(median), sigma) if sigma > 0 else float(median)
+
+
+def generate_html(rng, size_bytes, title):
+    """Generate an article-like HTML page of roughly size_bytes"""
+    head = f"<html><head><title>{title}</title><style>p{{margin:0}}</style>" \
+           f"<script>var tracking = {{'id': {rng.randint(1, 10**6)}}};</script></head><body>"
+    parts = [head, f"<h1>{title}</h1>"]
+    size = len(head)
+    while size < size_bytes:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+        paragraph = f"<div class='c'><p>{sentence}</p></div>\n"
+        parts.append(paragraph)
+        size += len(paragraph)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+class _StubServer:
+    """Base class running a ThreadingHTTPServer in a background thread"""
+
+    def __init__(self):
+        self._server = None
+        self._thread = None
+
+    def _handler(self):
+        raise NotImplementedError
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _quiet_handler(base):
+    class Handler(base):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type="application/json"):
+            data = body.encode() if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    return Handler
+
+
+class PublisherFarm:
+    """Publisher sites serving article pages
+
+    Each publisher is a separate server so it shows up as its own domain.
+    Pages come from `html_dir` (recorded *.html files) when given, otherwise
+    they are generated with the configured size distribution.
+
+    Args:
+        profile (dict): Simulation profile, see DEFAULT_PROFILE
+        html_dir (str, optional): Directory of recorded HTML pages
+    """
+
+    def __init__(self, profile=None, html_dir=None):
+        self.profile = {**DEFAULT_PROFILE, **(profile or {})}
+        self._rng = random.Random(self.profile["seed"])
+        self._lock = threading.Lock()
+        self._recorded = [p.read_text(errors="ignore") for p in sorted(Path(html_dir).glob("*.html"))] if html_dir else []
+        self._pages = {}
+        self._publishers = []
+        self.requests = 0
+
+    def _page(self, path):
+        with self._lock:
+            if path not in self._pages:
+                if self._recorded:
+                    self._pages[path] = self._recorded[len(self._pages) % len(self._recorded)]
+                else:
+                    size = int(lognormal(self._rng, self.profile["page_size_kb"] * 1024, self.profile["page_size_sigma"]))
+                    self._pages[path] = generate_html(self._rng, size, f"Article {path}")
+            return self._pages[path]
+
+    def _sample(self):
+        with self._lock:
+            self.requests += 1
+            delay = lognormal(self._rng, self.profile["page_latency_ms"], self.profile["page_latency_sigma"]) / 1000
+            failed = self._rng.random() < self.profile["page_error_rate"]
+        return delay, failed
+
+    def _handler(self):
+        farm = self
+
+        class Handler(_quiet_handler(BaseHTTPRequestHandler)):
+            def do_GET(self):
+                delay, failed = farm._sample()
+                time.sleep(delay)
+                if failed:
+                    self._send(503, "unavailable", "text/plain")
+                else:
+                    self._send(200, farm._page(self.path), "text/html; charset=utf-8")
+        return Handler
+
+    def start(self):
+        self._publishers = []
+        for _ in range(self.profile["publishers"]):
+            server = _StubServer()
+            server._handler = self._handler
+            self._publishers.append(server.start())
+        return self
+
+    def stop(self):
+        for server in self._publishers:
+            server.stop()
+        self._publishers = []
+
+    def article_url(self, index, slug):
+        publisher = self._publishers[index % len(self._publishers)]
+        return f"{publisher.base_url}/news/{slug}-{index}"
+
+
+class FakeSerpApi(_StubServer):
+    """Stand-in for the SerpAPI `google_news` engine
+
+    Args:
+        farm (PublisherFarm): Publisher farm the result links point into
+        profile (dict): Simulation profile, see DEFAULT_PROFILE
+    """
+
+    def __init__(self, farm, profile=None):
+        super().__init__()
+        self.farm = farm
+        self.profile = {**DEFAULT_PROFILE, **(profile or {})}
+        self._rng = random.Random(self.profile["seed"] + 1)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def results_for(self, query, start=0, num=None):
+        num = num or self.profile["serp_results"]
+        slug = "-".join(query.lower().split()) or "news"
+        results = []
+        for i in range(start, start + num):
+            results.append({
+                "position": i + 1,
+                "title": f"{query.title()} story {i + 1}",
+                "link": self.farm.article_url(i, slug),
+                "source": {"name": f"Publisher {i % self.profile['publishers'] + 1}"},
+                "snippet": f"Latest developments on {query}: item {i + 1}.",
+                "date": "1 hour ago",
+            })
+        return results
+
+    def _handler(self):
+        serp = self
+
+        class Handler(_quiet_handler(BaseHTTPRequestHandler)):
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                with serp._lock:
+                    serp.requests += 1
+                    delay = lognormal(serp._rng, serp.profile["serp_latency_ms"], serp.profile["serp_latency_sigma"]) / 1000
+                time.sleep(delay)
+                if query.get("engine") != "google_news":
+                    self._send(400, json.dumps({"error": "Unsupported engine"}))
+                    return
+                start = int(query.get("start", 0))
+                num = int(query.get("num", serp.profile["serp_results"]))
+                body = {
+                    "search_metadata": {"status": "Success"},
+                    "search_parameters": query,
+                    "news_results": serp.results_for(query.get("q", ""), start, num),
+                }
+                self._send(200, json.dumps(body))
+        return Handler
+
+
+class FakeCompletionServer(_StubServer):
+    """OpenAI-compatible chat completion endpoint
+
+    Latency is the time-to-first-token plus completion tokens / token rate,
+    set per model with the profile's llm_models overrides.
+
+    Args:
+        profile (dict): Simulation profile, see DEFAULT_PROFILE
+    """
+
+    def __init__(self, profile=None):
+        super().__init__()
+        self.profile = {**DEFAULT_PROFILE, **(profile or {})}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.models = collections.Counter()  # Requests per model
+
+    @property
+    def api_base(self):
+        return f"{self.base_url}/v1"
+
+    def _handler(self):
+        llm = self
+
+        class Handler(_quiet_handler(BaseHTTPRequestHandler)):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with llm._lock:
+                    llm.requests += 1
+                    llm.models[request.get("model")] += 1
+                profile = {**llm.profile, **llm.profile["llm_models"].get(request.get("model"), {})}
+                prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+                completion_tokens = min(profile["llm_completion_tokens"], request.get("max_tokens") or 10**6)
+                time.sleep(profile["llm_ttft_ms"] / 1000 + completion_tokens / profile["llm_tokens_per_sec"])
+                if profile.get("llm_status", 200) != 200:
+                    self._send(profile["llm_status"], json.dumps({"error": {"message": "Model unavailable"}}))
+                    return
+                items = "\n".join(
+                    f"{i}. Development {i} in the news - why it matters." for i in range(1, 4)
+                )
+                body = {
+                    "id": f"chatcmpl-bench-{llm.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "gpt-4"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": items},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_chars // 4,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_chars // 4 + completion_tokens,
+                    },
+                }
+                self._send(200, json.dumps(body))
+        return Handler
+
+
+class LocalUpstreams:
+    """Start all stand-ins together and expose the environment pointing at them
+
+    Args:
+        profile (dict, optional): Overrides for DEFAULT_PROFILE
+        html_dir (str, optional): Directory of recorded publisher HTML
+    """
+
+    def __init__(self, profile=None, html_dir=None):
+        self.profile = {**DEFAULT_PROFILE, **(profile or {})}
+        self.farm = PublisherFarm(self.profile, html_dir)
+        self.serp = FakeSerpApi(self.farm, self.profile)
+        self.llm = FakeCompletionServer(self.profile)
+
+    def start(self):
+        self.farm.start()
+        self.serp.start()
+        self.llm.start()
+        return self
+
+    def stop(self):
+        self.llm.stop()
+        self.serp.stop()
+        self.farm.stop()
+
+    def environ(self):
+        """Environment variables that point the application at the stand-ins"""
+        return {
+            "SERP_API_KEY": "bench-serpapi-key",
+            "OPENAI_API_KEY": "bench-openai-key",
+            "SERPAPI_BASE_URL": self.serp.base_url,
+            "OPENAI_API_BASE": self.llm.api_base,
+            "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+            # Measure the pipeline itself, not hits on a cache left by an earlier run
+            "NEWSAROO_CACHE_ENABLED": "false",
+            "NEWSAROO_ARTICLE_STORE_ENABLED": "false",
+            "NEWSAROO_FEEDS": "",
+            "NEWSAROO_FETCH_STATS_PATH": "",
+            "NEWSAROO_SERP_USAGE_PATH": "",
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _InMemoryQuery:
+    """Minimal fluent query builder mirroring the supabase-py table API we use"""
+
+    def __init__(self, store, table):
+        self._store = store
+        self._table = table
+        self._op = "select"
+        self._payload = None
+        self._filters = []
+
+    def select(self, *columns):
+        self._op = "select"
+        return self
+
+    def insert(self, data):
+        self._op, self._payload = "insert", data
+        return self
+
+    def update(self, data):
+        self._op, self._payload = "update", data
+        return self
+
+    def upsert(self, data, on_conflict=""):
+        self._op, self._payload = "upsert", data
+        self._conflict = [column for column in on_conflict.split(",") if column]
+        return self
+
+    def eq(self, column, value):
+        self._filters.append((column, str(value)))
+        return self
+
+    def execute(self):
+        return self._store._execute(self)
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class InMemorySupabaseClient:
+    """In-memory stand-in for the supabase `Client`
+
+    Calls block for `latency_ms` like the real synchronous client does, so
+    event-loop stalls caused by Supabase access show up in load tests.
+
+    Args:
+        latency_ms (float): Simulated round-trip time per query
+    """
+
+    def __init__(self, latency_ms=0):
+        self.latency_ms = latency_ms
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def table(self, name):
+        return _InMemoryQuery(self, name)
+
+    def _execute(self, query):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        with self._lock:
+            rows = self._tables.setdefault(query._table, [])
+            matches = [row for row in rows if all(str(row.get(c)) == v for c, v in query._filters)]
+            if query._op == "insert":
+                row = {"id": self._next_id, **query._payload}
+                self._next_id += 1
+                rows.append(row)
+                return _Result([dict(row)])
+            if query._op == "upsert":
+                key = [(column, str(query._payload.get(column))) for column in query._conflict]
+                existing = [row for row in rows if all(str(row.get(c)) == v for c, v in key)]
+                for row in existing:
+                    row.update(query._payload)
+                if not existing:
+                    rows.append(dict(query._payload))
+                return _Result([dict(query._payload)])
+            if query._op == "update":
+                for row in matches:
+                    row.update(query._payload)
+            return _Result([dict(row) for row in matches])
+
+    def seed_users(self, users):
+        """Insert users as (mobile_number, topics) pairs"""
+        for mobile, topics in users:
+            self.table("newsroom_users").insert({
+                "mobile_number": mobile,
+                "topics_of_interest": list(topics),
+                "created_at": "2024-01-01T00:00:00",
+            }).execute()
+        return self
+
+
+def install_in_memory_supabase(client):
+    """Make get_supabase_client() use the in-memory client in this process"""
+    from src.db.supabase_client import SupabaseManager
+    SupabaseManager._client = client
+    return client
@@ -0,0 +1,81 @@
+"""
+Topic canonicalization report for Newsaroo.
+
+Reads topics as users entered them (one per line, e.g. exported with
+`SELECT jsonb_array_elements_text(topics_of_interest) FROM newsroom_users`)
+and reports how many distinct searches and summaries they need with raw
+keys versus canonical topics. The cache hit ratio is the best case within one
+TTL window: every repeat of a key is a hit.
+
+Usage:
+    python -m benchmarks.topic_dedup topics.txt
+    python -m benchmarks.topic_dedup topics.txt --aliases aliases.json --output topic_results.json
+"""
+
+import argparse
+import os
+import sys
+
+from .report import write_results
+
+
+def analyze(topics):
+    """Compare raw and canonical topic keys
+
+    Args:
+        topics (list): Topics as entered, repeats included
+
+    Returns:
+        dict: Counts, best-case hit ratios and the largest merged groups
+    """
+    from src.news.topics import canonical_topic
+
+    groups = {}
+    for topic in topics:
+        groups.setdefault(canonical_topic(topic), set()).add(topic)
+    raw_keys = len(set(topics))
+    canonical_keys = len(groups)
+    merged = sorted(
+        ([key, sorted(spellings)] for key, spellings in groups.items() if len(spellings) > 1),
+        key=lambda group: len(group[1]), reverse=True
+    )
+    return {
+        "topics": len(topics),
+        "raw_keys": raw_keys,
+        "canonical_keys": canonical_keys,
+        "searches_saved": raw_keys - canonical_keys,
+        "raw_hit_ratio": round(1 - raw_keys / len(topics), 4) if topics else 0.0,
+        "canonical_hit_ratio": round(1 - canonical_keys / len(topics), 4) if topics else 0.0,
+        "largest_groups": merged[:20],
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how much topic canonicalization deduplicates")
+    parser.add_argument("topics", type=str, help="File with one topic per line ('-' for stdin)")
+    parser.add_argument("--aliases", type=str, help="JSON alias file (sets NEWSAROO_TOPIC_ALIASES_FILE)")
+    parser.add_argument("--output", type=str, default="topic_results.json", help="Results file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.aliases:
+        # Settings are read on first use, so this still takes effect
+        os.environ["NEWSAROO_TOPIC_ALIASES_FILE"] = args.aliases
+    source = sys.stdin if args.topics == "-" else open(args.topics)
+    with source:
+        topics = [line.strip() for line in source if line.strip()]
+
+    results = analyze(topics)
+    write_results(args.output, "topic_dedup", {"source": args.topics, "aliases": args.aliases}, results)
+    print(f"{results['topics']} topics: {results['raw_keys']} raw keys -> {results['canonical_keys']} canonical "
+          f"({results['searches_saved']} fewer searches and summaries per cache window)")
+    print(f"Best-case cache hit ratio: {results['raw_hit_ratio']:.1%} -> {results['canonical_hit_ratio']:.1%}")
+    for key, spellings in results["largest_groups"][:10]:
+        print(f"  {key:<32} {', '.join(spellings)}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
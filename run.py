@@ -1,12 +1,18 @@
-import uvicorn
-import os
+import argparse
+from src.server import run_development, run_production
+from src.utils.logging_setup import configure_logging
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the Newsaroo API server')
+    parser.add_argument('--prod', action='store_true', help='Run multiple worker processes without auto-reload')
+    parser.add_argument('--workers', type=int, help='Number of worker processes in production mode')
+    parser.add_argument('--host', type=str, help='Bind address')
+    parser.add_argument('--port', type=int, help='Bind port')
+    args = parser.parse_args()
+    configure_logging()
+    
     # Run the server
-    uvicorn.run(
-        "src.main:app",
-        host="0.0.0.0",
-        port=8080,
-        reload=True,  # Enable auto-reload during development
-        log_level="info"
-    ) 
\ No newline at end of file
+    if args.prod:
+        run_production(host=args.host, port=args.port, workers=args.workers)
+    else:
+        run_development(host=args.host, port=args.port)
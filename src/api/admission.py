@@ -0,0 +1,193 @@
+"""
+Admission control for the Newsaroo API.
+Bounds how many expensive pipeline requests run at once per route. Excess
+requests wait in a bounded FIFO queue for a limited time; once the queue is
+full (or the wait times out) they are rejected with 429 and Retry-After so
+admitted requests keep their latency under overload.
+"""
+
+import asyncio
+import collections
+import functools
+import logging
+import math
+import time
+from fastapi import HTTPException
+from ..config import ADMISSION_CONFIG
+from ..utils.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Weight of the latest request in the running average of service time
+_SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted
+
+    Args:
+        reason (str): "queue_full" or "queue_timeout"
+        retry_after (int): Seconds the client should wait before retrying
+    """
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded wait queue for one route
+
+    Args:
+        route (str): Route name used in metrics
+        max_concurrent (int): Requests allowed to run at once
+        max_queue (int): Requests allowed to wait for a slot
+        queue_timeout (float): Seconds a request may wait before it is rejected
+    """
+
+    def __init__(self, route, max_concurrent, max_queue, queue_timeout):
+        self.route = route
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters = collections.deque()
+        self._service_time = None
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def retry_after(self):
+        """Estimate when a slot is likely to be free, from the average service time"""
+        service_time = self._service_time if self._service_time is not None else self.queue_timeout
+        return max(1, math.ceil(service_time * (len(self._waiters) + 1) / self.max_concurrent))
+
+    def _reject(self, reason):
+        ADMISSION_REJECTED.inc(route=self.route, reason=reason)
+        return Overloaded(reason, self.retry_after())
+
+    async def acquire(self):
+        """Wait for a slot
+
+        Raises:
+            Overloaded: If the queue is full or the wait timed out
+        """
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            ADMISSION_ACTIVE.set(self.active, route=self.route)
+            ADMISSION_WAIT.observe(0.0, route=self.route)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters), route=self.route)
+        start = time.perf_counter()
+        try:
+            # release() hands its slot straight to the waiter, so active is unchanged on wake-up
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as the client went away: pass it on
+                self._release_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters), route=self.route)
+        ADMISSION_WAIT.observe(time.perf_counter() - start, route=self.route)
+
+    def release(self, service_time=None):
+        """Free a slot, handing it to the oldest waiter if there is one
+
+        Args:
+            service_time (float, optional): Seconds the finished request ran, used for Retry-After
+        """
+        if service_time is not None:
+            if self._service_time is None:
+                self._service_time = service_time
+            else:
+                self._service_time += _SERVICE_TIME_ALPHA * (service_time - self._service_time)
+        self._release_slot()
+
+    def _release_slot(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiters), route=self.route)
+                return
+        self.active -= 1
+        ADMISSION_ACTIVE.set(self.active, route=self.route)
+
+
+_controllers = {}
+
+
+def get_controller(route):
+    """Get the admission controller for a route configured in ADMISSION_CONFIG["routes"]"""
+    controller = _controllers.get(route)
+    if controller is None:
+        controller = _controllers[route] = AdmissionController(route, **ADMISSION_CONFIG["routes"][route])
+    return controller
+
+
+async def admit(route):
+    """Wait for an admission slot on route
+
+    Args:
+        route (str): Key in ADMISSION_CONFIG["routes"]
+
+    Returns:
+        callable: Releases the slot; safe to call more than once
+
+    Raises:
+        HTTPException: 429 with a Retry-After header if the request is rejected
+    """
+    if not ADMISSION_CONFIG["enabled"]:
+        return lambda: None
+    controller = get_controller(route)
+    try:
+        await controller.acquire()
+    except Overloaded as e:
+        logger.warning("Rejected %s request (%s, %s queued)", route, e.reason, controller.queue_depth)
+        raise HTTPException(
+            status_code=429,
+            detail="Server is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    start = time.perf_counter()
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            controller.release(time.perf_counter() - start)
+    return release
+
+
+def admitted(route):
+    """Decorator that runs an endpoint under the route's admission controller
+
+    Rejected requests get 429 with a Retry-After header.
+
+    Args:
+        route (str): Key in ADMISSION_CONFIG["routes"]
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            release = await admit(route)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                release()
+        return wrapper
+    return decorator
@@ -0,0 +1,174 @@
+"""
+Conditional responses for the Newsaroo API.
+Summary endpoints are polled by clients that mostly get the same summary back.
+Their responses carry a strong ETag derived from the summary and the content
+hashes of the articles behind it, so a poll that sends the tag in
+If-None-Match gets a bodyless 304 and the response is never serialized.
+Cache-Control follows the summary cache TTL, and bodies above a size
+threshold are compressed with brotli (when installed) or gzip.
+"""
+
+import gzip
+import hashlib
+import logging
+from fastapi.responses import Response
+from ..config import CACHE_CONFIG, RESPONSE_CONFIG
+from ..news.delta import content_hash
+from ..utils.metrics import HTTP_CONDITIONAL_RESPONSES, HTTP_RESPONSE_BYTES
+from .serialization import encode
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None  # Optional: responses fall back to gzip
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Content codings this server can produce, most preferred first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def summary_etag(parts, articles=()):
+    """Strong ETag for a summary response
+
+    The tag covers what the body says, not when it was produced: response
+    timestamps are left out, so repeated polls of an unchanged summary match.
+
+    Args:
+        parts (list): Strings that make up the response, e.g. topics, summaries and metadata
+        articles (iterable): Processed ArticleRecords the summaries were made from
+
+    Returns:
+        str: Quoted entity tag
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    for article in articles:
+        digest.update(f"{article.link or ''}\0{article.source}\0{content_hash(article)}\0".encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _opaque(tag):
+    """The tag's value without the weak prefix, quotes or a content-coding suffix"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    value, _, coding = tag.strip('"').rpartition("-")
+    return value if value and coding in ("br", "gzip") else tag.strip('"')
+
+
+def matching_tag(if_none_match, etag):
+    """The tag in an If-None-Match header that matches etag
+
+    Uses the weak comparison If-None-Match calls for, and ignores the
+    content-coding suffix compressed responses add to the tag.
+
+    Args:
+        if_none_match (str): Header value, may be None
+        etag (str): Current entity tag
+
+    Returns:
+        str: The client's matching tag, or None
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    current = _opaque(etag)
+    for tag in if_none_match.split(","):
+        if tag.strip() and _opaque(tag) == current:
+            return tag.strip()
+    return None
+
+
+def negotiate_encoding(accept_encoding):
+    """The best content coding the client accepts
+
+    Args:
+        accept_encoding (str): Accept-Encoding header, may be None
+
+    Returns:
+        str: "br" or "gzip", or None to send the body uncompressed
+    """
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    for coding in ENCODINGS:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(body, encoding):
+    """Compress a response body with "br" or "gzip" """
+    if encoding == "br":
+        return brotli.compress(body, quality=RESPONSE_CONFIG["brotli_quality"])
+    # A fixed mtime keeps the bytes of identical bodies identical
+    return gzip.compress(body, compresslevel=RESPONSE_CONFIG["gzip_level"], mtime=0)
+
+
+def cache_control():
+    """Cache-Control for summary responses
+
+    Clients may reuse a summary for as long as the server would serve it from
+    its own summary cache; without that cache they revalidate every time.
+    """
+    ttl = CACHE_CONFIG["ttl"]["summary"]
+    if CACHE_CONFIG["enabled"] and ttl > 0:
+        return f"private, max-age={ttl}"
+    return "private, no-cache"
+
+
+def conditional_response(request, route, etag, content, model=None):
+    """A 304 if the client already has the current summary, else the body
+
+    Args:
+        request (Request): Incoming request; If-None-Match and Accept-Encoding are honoured
+        route (str): Route name for metrics
+        etag (str): From summary_etag(), or None to always send the body without a tag
+        content (dict or bytes): Response body, serialized only when it is sent, or
+            already serialized JSON
+        model (type, optional): Response model the body is validated against outside fast mode
+
+    Returns:
+        Response: The 304 or the JSON body, compressed above the size threshold
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if etag is not None and RESPONSE_CONFIG["etags"]:
+        headers["Cache-Control"] = cache_control()
+        matched = matching_tag(request.headers.get("if-none-match"), etag)
+        if matched is not None:
+            HTTP_CONDITIONAL_RESPONSES.inc(route=route, result="not_modified")
+            # The client's tag names the (possibly compressed) representation it holds
+            headers["ETag"] = matched
+            return Response(status_code=304, headers=headers)
+        HTTP_CONDITIONAL_RESPONSES.inc(route=route, result="full")
+        headers["ETag"] = etag
+
+    body = content if isinstance(content, bytes) else encode(content, model)
+    encoding = None
+    threshold = RESPONSE_CONFIG["compress_min_bytes"]
+    if threshold and len(body) >= threshold:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is not None:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+        if "ETag" in headers:
+            # Each coding is a different representation, so it gets its own strong tag
+            headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+    HTTP_RESPONSE_BYTES.inc(len(body), route=route, encoding=encoding or "identity")
+    return Response(content=body, media_type="application/json", headers=headers)
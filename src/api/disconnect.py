@@ -0,0 +1,64 @@
+"""
+Client disconnect handling for the Newsaroo API.
+Cancels the handler of a long-running request as soon as its client goes
+away, so page fetches, searches and LLM calls nobody will read are not run.
+"""
+
+import asyncio
+import logging
+import re
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class CancelOnDisconnectMiddleware:
+    """ASGI middleware that cancels matching requests when the client disconnects
+
+    Incoming messages are read by a watcher task and handed to the application
+    through a queue, so the disconnect is noticed even while the handler is
+    busy and no longer reading the request.
+
+    Args:
+        app: The ASGI application
+        paths (list): Regular expressions matched against the request path
+    """
+
+    def __init__(self, app, paths):
+        self.app = app
+        self.paths = [re.compile(path) for path in paths]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(path.match(scope["path"]) for path in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        messages = asyncio.Queue()
+        disconnected = asyncio.Event()
+
+        async def watch():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        watcher = asyncio.ensure_future(watch())
+        handler = asyncio.ensure_future(self.app(scope, messages.get, send))
+        disconnect = asyncio.ensure_future(disconnected.wait())
+        try:
+            await asyncio.wait({handler, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done():
+                logger.info("Client disconnected, cancelling %s %s", scope["method"], scope["path"])
+                handler.cancel()
+                try:
+                    await handler
+                except asyncio.CancelledError:
+                    pass
+                return
+            handler.result()
+        finally:
+            for task in (watcher, disconnect, handler):
+                if not task.done():
+                    task.cancel()
@@ -34,6 +34,26 @@ class NewsRequest(BaseModel):
         le=20,  # less than or equal to 20
         example=3
     )
+    include_timings: bool = Field(
+        default=False,
+        description="Include per-stage timings in the response metadata"
+    )
+    latency_target_ms: Optional[int] = Field(
+        default=None,
+        description="How long the summary may take; a faster model is chosen (or raced) to meet it",
+        ge=500,
+        le=120000,
+        example=5000
+    )
+
+class BatchNewsRequest(BaseModel):
+    """Request model for summarizing several topics in one call"""
+    requests: List[NewsRequest] = Field(
+        ...,
+        description="Topics to summarize; results are streamed back as NDJSON in completion order",
+        min_length=1,
+        max_length=20
+    )
 
 class Article(BaseModel):
     """Model for processed article information"""
@@ -113,4 +133,8 @@ class UserNewsSummaryResponse(BaseModel):
             {"topic": "technology", "summary": "Latest tech developments..."},
             {"topic": "sports", "summary": "Recent sports updates..."}
         ]
+    )
+    metadata: dict = Field(
+        default_factory=dict,
+        description="Additional information about the request"
     ) 
\ No newline at end of file
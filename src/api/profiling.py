@@ -0,0 +1,77 @@
+"""
+Admin access and on-demand request profiling for the Newsaroo API.
+A request sent with "X-Profile: 1" and the admin token in "X-Admin-Token" is
+sampled while it runs. Its response carries "X-Profile-Id", and the folded
+stacks can be fetched from /api/v1/admin/profiles/{id}. Without an admin
+token configured, every request passes straight through.
+"""
+
+import asyncio
+import hmac
+import logging
+from fastapi import Header, HTTPException
+from ..config import PROFILING_CONFIG
+from ..utils.profiling import finish_profile, save_profile, start_profile
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def is_admin(token):
+    """Whether token is the configured admin token (never true when none is configured)"""
+    expected = PROFILING_CONFIG["admin_token"]
+    return bool(expected and token) and hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
+
+
+async def require_admin(x_admin_token: str = Header(None)):
+    """Dependency for admin endpoints: 404 unless an admin token is configured, 403 if it does not match"""
+    if not PROFILING_CONFIG["admin_token"]:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+class ProfileRequestMiddleware:
+    """ASGI middleware that profiles requests asking for it with the admin token
+
+    Args:
+        app: The ASGI application
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILING_CONFIG["admin_token"]:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile", b"").lower() not in (b"1", b"true") or \
+                not is_admin(headers.get(b"x-admin-token", b"").decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        profile = start_profile(scope["method"], scope["path"])
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]}
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Saved before the response completes, so the profile is there once the client has it
+                await finish(profile)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            await finish(profile)
+
+
+async def finish(profile):
+    """Stop sampling profile and save it, once"""
+    if profile.duration is not None:
+        return
+    finish_profile(profile)
+    logger.info("Profiled %s %s as %s (%d samples)", profile.method, profile.path, profile.id, profile.samples)
+    await asyncio.get_running_loop().run_in_executor(None, save_profile, profile)
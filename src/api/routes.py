@@ -2,14 +2,33 @@
 API routes for the Newsaroo application.
 """
 
-from fastapi import APIRouter, HTTPException, Query, Path, Depends
-from src.api.models import NewsResponse, UserRegistration, UserResponse, UpdateTopicsRequest, NewsRequest, Article, ErrorResponse, UserNewsSummaryResponse
-from src.config import SERPAPI_KEY, OPENAI_API_KEY, DEFAULT_CONFIG, SUPABASE_API_URL, SUPABASE_API_KEY
-from ..news.search import search_news
+from fastapi import APIRouter, HTTPException, Query, Path, Depends, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from src.api.models import NewsResponse, UserRegistration, UserResponse, UpdateTopicsRequest, NewsRequest, BatchNewsRequest, ErrorResponse, UserNewsSummaryResponse
+from src.config import SERPAPI_KEY, OPENAI_API_KEY, DEFAULT_CONFIG, SUPABASE_API_URL, SUPABASE_API_KEY, BATCH_CONFIG, DEGRADED_CONFIG, PROFILING_CONFIG
+from ..news.search import search_news, FetchPool, use_fetch_pool
+from ..news.serp_keys import get_key_pool
 from ..news.content import process_news_results
-from ..news.summary import summarize_with_llm
+from ..news.summary import summarize_with_llm, summarize_within
+from ..news.model_router import track_route
+from ..news.delta import delta_digest
+from ..news.topics import canonical_topic, dedupe_topics
 from src.db.supabase_client import get_supabase_client, SupabaseManager
+from src.db.article_store import get_article_store
+from ..utils.cache import cached, get_cache
+from ..utils.metrics import start_trace
+from ..utils.profiling import get_loop_monitor, list_profiles, read_profile
+from .admission import admit, admitted
+from .conditional import conditional_response, summary_etag
+from .profiling import require_admin
+from .serialization import dumps, encode, news_response
+import asyncio
+import contextlib
+import json
 import logging
+import os
+import time
 from datetime import datetime
 from typing import List
 
@@ -24,7 +43,8 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 @router.post("/news/summarize", response_model=NewsResponse, tags=["News"])
-async def summarize_news(request: NewsRequest):
+@admitted("news_summarize")
+async def summarize_news(request: NewsRequest, http_request: Request):
     """
     Get a summary of news articles for a specific topic
     
@@ -32,77 +52,206 @@ async def summarize_news(request: NewsRequest):
     - topic: The news topic to search for
     - time_period: Time period for news (1d to 7d, default: 1d)
     - max_articles: Number of articles to process (1-20, default: 5)
+    - include_timings: Return per-stage timings in metadata (default: false)
+    
+    Responses carry an ETag; sending it back in If-None-Match returns 304 while the summary is unchanged.
     """
     try:
-        # Check API keys first
-        if not SERPAPI_KEY or not OPENAI_API_KEY:
-            raise HTTPException(
-                status_code=500,
-                detail="API keys not found. Please check your configuration."
-            )
-
-        # Search for news with custom time period
-        news_results = await search_news(
-            topic=request.topic,
-            api_key=SERPAPI_KEY,
-            time_period=request.time_period
+        content, etag = await _topic_response(request)
+        return conditional_response(http_request, "news_summarize", etag, content, NewsResponse)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred: {str(e)}"
         )
-        if not news_results:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No news found for topic: {request.topic}"
-            )
 
-        # Process articles with custom limit
-        processed_articles = await process_news_results(
-            news_results=news_results,
-            max_articles=request.max_articles
-        )
-        if not processed_articles:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to process news articles"
-            )
+@router.post("/news/summarize/batch", tags=["News"])
+async def summarize_news_batch(batch: BatchNewsRequest):
+    """
+    Summarize several topics in one request
+    
+    Topics run in parallel and share one pool of page fetches (articles found
+    for several topics are fetched once) and a bounded number of LLM calls.
+    Requests for equivalent topics ("AI" and "artificial intelligence") with
+    the same options are computed once and reported under each spelling.
+    Results are streamed as NDJSON in completion order, one line per topic:
+    `{"index": ..., "topic": ..., "status": 200, "result": {...}}` or
+    `{"index": ..., "topic": ..., "status": 404, "error": "..."}`, followed by
+    a final `{"done": true, ...}` line.
+    """
+    release = await admit("news_summarize_batch")
+    
+    async def stream():
+        start = time.perf_counter()
+        pool = FetchPool(BATCH_CONFIG["max_parallel_fetches"])
+        use_fetch_pool(pool)
+        topic_slots = asyncio.Semaphore(BATCH_CONFIG["max_parallel_topics"])
+        llm_slots = asyncio.Semaphore(BATCH_CONFIG["max_parallel_llm"])
+        
+        work = {}
+        
+        async def summarize(item):
+            async with topic_slots:
+                response, _ = await _summarize_topic(item, llm_slot=llm_slots)
+                return response
+        
+        async def run(index, item):
+            key = (canonical_topic(item.topic), item.time_period, item.max_articles, item.include_timings,
+                   item.latency_target_ms)
+            if key not in work:
+                work[key] = asyncio.ensure_future(summarize(item))
+            try:
+                response = await asyncio.shield(work[key])
+                line = {"status": 200, "result": {**response, "topic": item.topic}}
+            except HTTPException as he:
+                line = {"status": he.status_code, "error": he.detail}
+            except Exception as e:
+                logger.error("Batch item %s (%s) failed: %s", index, item.topic, e)
+                line = {"status": 500, "error": f"An error occurred: {str(e)}"}
+            return {"index": index, "topic": item.topic, **line}
+        
+        tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(batch.requests)]
+        failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                line = await finished
+                failed += line["status"] != 200
+                yield dumps(line) + b"\n"
+            yield dumps({
+                "done": True,
+                "count": len(tasks),
+                "failed": failed,
+                "duplicate_topics": len(tasks) - len(work),
+                "duplicate_fetches_avoided": pool.duplicates,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+            }) + b"\n"
+        finally:
+            for task in [*tasks, *work.values()]:
+                task.cancel()
+            pool.close()
+            release()
+    
+    # The slot is held while streaming; the background task also frees it if the stream never ran
+    return StreamingResponse(stream(), media_type="application/x-ndjson", background=BackgroundTask(release))
 
-        # Generate summary
-        summary = await summarize_with_llm(processed_articles, request.topic)
-        if summary.startswith("Error:"):
-            raise HTTPException(
-                status_code=500,
-                detail=summary
-            )
+async def _summarize_topic(request, llm_slot=None):
+    """Search, process and summarize news for one NewsRequest
+    
+    Args:
+        request (NewsRequest): The topic and options
+        llm_slot (asyncio.Semaphore, optional): Bounds concurrent LLM calls across topics
+        
+    Returns:
+        tuple: (response, etag): the NewsResponse body as a dict; etag identifies the
+            summary, or is None when timings were requested and every response differs
+        
+    Raises:
+        HTTPException: If the keys are missing, nothing was found or summarization failed
+    """
+    trace = start_trace() if request.include_timings else None
+    started = time.perf_counter()
+    
+    # Check API keys first
+    if not SERPAPI_KEY or not OPENAI_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="API keys not found. Please check your configuration."
+        )
 
-        # Create response
-        articles = [
-            Article(
-                title=article["title"],
-                source_name=article["source"]["name"] if isinstance(article["source"], dict) else str(article["source"]),
-                source_details=article["source"] if isinstance(article["source"], dict) else {},
-                summary=article.get("snippet") or article.get("description") or "No preview available"
-            )
-            for article in processed_articles
-        ]
+    # Search for news with custom time period
+    news_results = await search_news(
+        topic=request.topic,
+        api_key=SERPAPI_KEY,
+        time_period=request.time_period,
+        max_articles=request.max_articles
+    )
+    if not news_results:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No news found for topic: {request.topic}"
+        )
 
-        return NewsResponse(
-            topic=request.topic,
-            summary=summary,
-            articles=articles,
-            timestamp=datetime.now().isoformat(),
-            metadata={
-                "time_period": request.time_period,
-                "articles_found": len(articles),
-                "total_results": len(news_results)
-            }
+    # Process articles with custom limit
+    processed_articles = await process_news_results(
+        news_results=news_results,
+        max_articles=request.max_articles
+    )
+    if not processed_articles:
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to process news articles"
         )
 
-    except HTTPException as he:
-        raise he
-    except Exception as e:
+    # Generate summary
+    routing = track_route()
+    latency_target = request.latency_target_ms / 1000 if request.latency_target_ms else None
+    degraded = None
+    async with llm_slot or contextlib.nullcontext():
+        if DEGRADED_CONFIG["enabled"]:
+            # Whatever is left of the SLO after search; past it, an extractive summary is returned
+            summary, degraded = await summarize_within(
+                processed_articles, request.topic,
+                DEGRADED_CONFIG["slo"] - (time.perf_counter() - started), latency_target=latency_target
+            )
+        else:
+            summary = await summarize_with_llm(processed_articles, request.topic, latency_target=latency_target)
+    if summary.startswith("Error:"):
         raise HTTPException(
             status_code=500,
-            detail=f"An error occurred: {str(e)}"
+            detail=summary
         )
 
+    metadata = {
+        "time_period": request.time_period,
+        "articles_found": len(processed_articles),
+        "total_results": len(news_results),
+        "degraded": degraded is not None
+    }
+    if degraded:
+        metadata["degraded_reason"] = degraded
+    else:
+        metadata.update(routing)
+    etag = None
+    if trace is None:
+        etag = summary_etag([request.topic, summary, json.dumps(metadata, sort_keys=True)], processed_articles)
+    else:
+        metadata["timings"] = trace
+
+    # Create response
+    response = news_response(request.topic, summary, processed_articles, datetime.now().isoformat(), metadata)
+    return response, etag
+
+async def _topic_response(request):
+    """The response for one NewsRequest, served pre-serialized from the shared cache when possible
+    
+    Args:
+        request (NewsRequest): The topic and options
+        
+    Returns:
+        tuple: (content, etag): the serialized body (or, uncached, the body as a dict) and its ETag
+        
+    Raises:
+        HTTPException: If the keys are missing, nothing was found or summarization failed
+    """
+    # Timings describe one request, so those responses are never stored
+    if request.include_timings or get_cache() is None:
+        return await _summarize_topic(request)
+    
+    async def compute():
+        response, etag = await _summarize_topic(request)
+        return {
+            "body": encode(response, NewsResponse).decode("utf-8"),
+            "etag": etag,
+            "degraded": response["metadata"]["degraded"]
+        }
+    
+    key = json.dumps([request.topic, request.time_period, request.max_articles, request.latency_target_ms])
+    # Degraded responses are not stored, so the next request tries the LLM again
+    entry = await cached("response", key, compute, cacheable=lambda entry: not entry["degraded"])
+    return entry["body"].encode("utf-8"), entry["etag"]
+
 @router.post("/users", response_model=UserResponse)
 async def register_user(user: UserRegistration):
     """Register a new user with their topics of interest"""
@@ -137,12 +286,60 @@ async def register_user(user: UserRegistration):
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error registering user: {str(e)}")
+        logger.error("Error registering user: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error registering user: {str(e)}"
         )
 
+@router.get("/articles/search", tags=["News"])
+async def search_articles(
+    q: str = Query(..., min_length=1, description="Words that must all appear in the article"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results")
+):
+    """Full-text search over articles fetched recently, without calling any upstream"""
+    store = get_article_store()
+    if store is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Article store is disabled. Set NEWSAROO_ARTICLE_STORE_ENABLED=true."
+        )
+    return {"query": q, "results": await store.search(q, limit)}
+
+@router.get("/search/keys", tags=["News"])
+async def serpapi_key_usage():
+    """This month's searches, quota and backoff for each SerpAPI key in the pool (keys are not shown)"""
+    pool = get_key_pool()
+    if pool is None:
+        raise HTTPException(status_code=503, detail="No SerpAPI keys configured")
+    return {"period": pool.period, "keys": pool.usage()}
+
+@router.get("/admin/profiles", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def profiles():
+    """Saved request profiles, newest first (send X-Profile: 1 with the admin token to take one)"""
+    return {"profiles": await asyncio.to_thread(list_profiles)}
+
+@router.get("/admin/profiles/{profile_id}", tags=["Admin"], dependencies=[Depends(require_admin)],
+            response_class=PlainTextResponse)
+async def profile_stacks(profile_id: str):
+    """A request profile as folded stacks, for flamegraph.pl, speedscope or inferno"""
+    stacks = await asyncio.to_thread(read_profile, profile_id)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail=f"No profile {profile_id}")
+    return PlainTextResponse(stacks)
+
+@router.get("/admin/loop-stalls", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def loop_stalls():
+    """Event-loop stalls this worker recorded, with the stack the loop was running"""
+    monitor = get_loop_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=503, detail="Event-loop monitor is disabled. Set NEWSAROO_LOOP_MONITOR=true.")
+    return {
+        "pid": os.getpid(),
+        "threshold_ms": PROFILING_CONFIG["stall_threshold"] * 1000,
+        "stalls": list(monitor.stalls)
+    }
+
 @router.get("/debug/config")
 async def debug_config():
     """Debug endpoint to check configuration"""
@@ -154,6 +351,7 @@ async def debug_config():
     }
 
 @router.get("/user_news_summary/{mobile_no}")
+@admitted("user_summaries")
 async def get_user_news_summary(
     mobile_no: int = Path(
         ..., 
@@ -189,27 +387,28 @@ async def get_user_news_summary(
                 detail="No topics of interest found for this user"
             )
             
-        logger.info(f"Found topics for user {user_name}: {topics}")
+        logger.info("Found topics for user %s: %s", user_name, topics)
         
         # 3. Generate summaries for each topic
         all_summaries = []
-        for topic in topics:
-            logger.info(f"Searching for news on topic: {topic}")
+        # Equivalent spellings of one topic are summarized once
+        for topic in dedupe_topics(topics):
+            logger.info("Searching for news on topic: %s", topic)
             # Search for news with enhanced content fetching
             news_results = await search_news(topic)
             
             if news_results:
                 # Check if we got enhanced content
-                articles_with_full_content = [article for article in news_results if "full_content" in article]
-                logger.info(f"Topic '{topic}': Found {len(articles_with_full_content)} articles with full content out of {len(news_results)} total")
+                with_full_content = sum(1 for article in news_results if article.has_full_content)
+                logger.info("Topic '%s': Found %s articles with full content out of %s total", topic, with_full_content, len(news_results))
                 
                 # Process the news results
                 processed_articles = await process_news_results(news_results)
                 
                 if processed_articles:
                     # Calculate average content length for logging
-                    avg_content_length = sum(len(article["content"]) for article in processed_articles) / len(processed_articles)
-                    logger.info(f"Topic '{topic}': Average content length: {avg_content_length:.2f} characters")
+                    avg_content_length = sum(len(article.content) for article in processed_articles) / len(processed_articles)
+                    logger.info("Topic '%s': Average content length: %.2f characters", topic, avg_content_length)
                     
                     # Generate summary
                     summary = await summarize_with_llm(processed_articles, topic)
@@ -233,21 +432,36 @@ async def get_user_news_summary(
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error generating news summary: {str(e)}")
+        logger.error("Error generating news summary: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error generating news summary: {str(e)}"
         )
 
 @router.get("/users/{mobile}/summaries", response_model=UserNewsSummaryResponse, tags=["Users"])
+@admitted("user_summaries")
 async def get_user_news_summaries(
+    http_request: Request,
     mobile: str = Path(
         ..., 
         description="User's mobile number",
         regex="^[0-9]{10}$"  # Ensure 10-digit mobile number
+    ),
+    include_timings: bool = Query(
+        False,
+        description="Include per-stage timings in the response metadata"
+    ),
+    delta: bool = Query(
+        False,
+        description="Only summarize articles not sent to this user before; topics without new articles "
+                    "return the previous digest with status 'no_new_developments'"
     )
 ):
-    """Get news summaries for user's topics of interest"""
+    """Get news summaries for user's topics of interest
+    
+    Responses carry an ETag; sending it back in If-None-Match returns 304 while the summaries are unchanged.
+    """
+    trace = start_trace() if include_timings else None
     try:
         # Get Supabase client
         supabase = get_supabase_client()
@@ -267,27 +481,35 @@ async def get_user_news_summaries(
                 detail="No topics of interest found for this user"
             )
         
-        logger.info(f"Generating summaries for user with mobile {mobile} and topics: {topics}")
+        logger.info("Generating summaries for user with mobile %s and topics: %s", mobile, topics)
         
         # Generate summaries for each topic
         summaries = []
-        for topic in topics:
+        summarized_articles = []
+        # Equivalent spellings of one topic are summarized once
+        for topic in dedupe_topics(topics):
+            if delta:
+                digest = await delta_digest(supabase, mobile, topic)
+                if digest:
+                    summaries.append(digest)
+                continue
+            
             # Search for news with enhanced content fetching
-            logger.info(f"Searching for news on topic: {topic}")
+            logger.info("Searching for news on topic: %s", topic)
             news_results = await search_news(topic)
             
             if news_results:
                 # Check if we got enhanced content
-                articles_with_full_content = [article for article in news_results if "full_content" in article]
-                logger.info(f"Topic '{topic}': Found {len(articles_with_full_content)} articles with full content out of {len(news_results)} total")
+                with_full_content = sum(1 for article in news_results if article.has_full_content)
+                logger.info("Topic '%s': Found %s articles with full content out of %s total", topic, with_full_content, len(news_results))
                 
                 # Process the news results
                 processed_articles = await process_news_results(news_results)
                 
                 if processed_articles:
                     # Calculate average content length for logging
-                    avg_content_length = sum(len(article["content"]) for article in processed_articles) / len(processed_articles)
-                    logger.info(f"Topic '{topic}': Average content length: {avg_content_length:.2f} characters")
+                    avg_content_length = sum(len(article.content) for article in processed_articles) / len(processed_articles)
+                    logger.info("Topic '%s': Average content length: %.2f characters", topic, avg_content_length)
                     
                     # Generate summary
                     summary = await summarize_with_llm(processed_articles, topic)
@@ -295,6 +517,7 @@ async def get_user_news_summaries(
                         "topic": topic,
                         "summary": summary
                     })
+                    summarized_articles.extend(processed_articles)
         
         if not summaries:
             raise HTTPException(
@@ -302,12 +525,20 @@ async def get_user_news_summaries(
                 detail="Could not generate summaries for any topics"
             )
             
-        return {"summaries": summaries}
+        if trace is not None:
+            return conditional_response(
+                http_request, "user_summaries", None, {"summaries": summaries, "metadata": {"timings": trace}},
+                UserNewsSummaryResponse
+            )
+        etag = summary_etag([json.dumps(summaries, sort_keys=True)], summarized_articles)
+        return conditional_response(
+            http_request, "user_summaries", etag, {"summaries": summaries, "metadata": {}}, UserNewsSummaryResponse
+        )
         
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error generating news summaries: {str(e)}")
+        logger.error("Error generating news summaries: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error generating news summaries: {str(e)}"
@@ -345,7 +576,7 @@ async def update_user_topics(
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error updating topics: {str(e)}")
+        logger.error("Error updating topics: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error updating topics: {str(e)}"
@@ -0,0 +1,74 @@
+"""
+Response serialization for the Newsaroo API.
+Summary responses are assembled as plain dicts shaped like their response
+models and encoded once, with orjson when it is installed, instead of being
+built as Pydantic models that FastAPI then validates and encodes again.
+"""
+
+import json
+import logging
+from ..config import RESPONSE_CONFIG
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional: the standard json module is used without it
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def dumps(value):
+    """Encode a JSON-compatible value as compact UTF-8 JSON bytes"""
+    if orjson is not None and RESPONSE_CONFIG["fast_json"]:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def encode(content, model=None):
+    """Serialize a response body
+
+    In fast mode the dict is encoded as is: it is assembled from the
+    pipeline's own records, and the request was already validated on the way
+    in. Otherwise it is validated once against model and Pydantic encodes it.
+
+    Args:
+        content (dict): Response body shaped like model
+        model (type, optional): Pydantic response model used when fast mode is off
+
+    Returns:
+        bytes: JSON body
+    """
+    if RESPONSE_CONFIG["fast_json"] or model is None:
+        return dumps(content)
+    return model.model_validate(content).model_dump_json().encode("utf-8")
+
+
+def news_response(topic, summary, articles, timestamp, metadata):
+    """A NewsResponse body as a plain dict
+
+    Args:
+        topic (str): Requested topic
+        summary (str): The summary
+        articles (list): Processed ArticleRecords
+        timestamp (str): ISO timestamp of the response
+        metadata (dict): Response metadata
+
+    Returns:
+        dict: Same fields as NewsResponse
+    """
+    return {
+        "topic": topic,
+        "summary": summary,
+        "articles": [
+            {
+                "title": article.title,
+                "source_name": article.source,
+                "source_details": article.source_details or {},
+                "summary": article.preview,
+            }
+            for article in articles
+        ],
+        "timestamp": timestamp,
+        "metadata": metadata,
+    }
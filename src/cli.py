@@ -4,23 +4,20 @@ Command-line interface for the Newsaroo application.
 
 import argparse
 import logging
-import sys
 import asyncio
-from .news.search import search_news
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from .news.search import search_news, FetchPool, use_fetch_pool
 from .news.content import process_news_results
 from .news.summary import summarize_with_llm
+from .news.topics import canonical_topic, dedupe_topics
 from .utils.display import display_summary, get_user_topic
-from .config import SERPAPI_KEY, OPENAI_API_KEY
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("newsaroo.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from .utils.logging_setup import configure_logging
+from .utils.metrics import start_trace
+from .config import SERPAPI_KEY, OPENAI_API_KEY, BATCH_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +30,7 @@ async def news_summarizer(topic=None):
     if topic is None:
         topic = get_user_topic()
     
-    logger.info(f"Starting news summarization for topic: {topic}")
+    logger.info("Starting news summarization for topic: %s", topic)
     print(f"Searching for news on: {topic}")
     
     news_results = await search_news(topic, SERPAPI_KEY)
@@ -49,12 +46,174 @@ async def news_summarizer(topic=None):
     
     return summary
 
+async def summarize_topic_record(topic, time_period=None, max_articles=None):
+    """Run the pipeline for one topic and describe the outcome as a JSON-serializable record
+    
+    Args:
+        topic (str): The news topic
+        time_period (str, optional): Time period for news, e.g. "1d"
+        max_articles (int, optional): Number of articles to summarize
+        
+    Returns:
+        dict: Topic, status ("ok", "no_results" or "error"), summary, article count,
+            per-stage timings and elapsed time
+    """
+    trace = start_trace()
+    start = time.perf_counter()
+    record = {"topic": topic, "status": "ok", "summary": None, "articles": 0}
+    try:
+        news_results = await search_news(topic, SERPAPI_KEY, time_period, max_articles=max_articles)
+        processed_articles = await process_news_results(news_results, max_articles=max_articles) if news_results else []
+        if processed_articles:
+            record["summary"] = await summarize_with_llm(processed_articles, topic)
+            record["articles"] = len(processed_articles)
+        else:
+            record["status"] = "no_results"
+    except Exception as e:
+        logger.error("Topic '%s' failed: %s", topic, e)
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    record["timings"] = trace
+    record["timestamp"] = datetime.now().isoformat()
+    return record
+
+def read_topics(source):
+    """Read topics, one per line, skipping blank lines, # comments and repeats
+    
+    Topics equivalent to an earlier one ("AI" after "artificial intelligence")
+    count as repeats.
+    
+    Args:
+        source (file): Open text file or stdin
+        
+    Returns:
+        list: Topics in file order
+    """
+    topics = []
+    for line in source:
+        topic = line.strip()
+        if topic and not topic.startswith("#"):
+            topics.append(topic)
+    return dedupe_topics(topics)
+
+def completed_topics(path):
+    """Canonical topics already written to a JSONL output file (for --resume)"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                done.add(canonical_topic(json.loads(line)["topic"]))
+            except (ValueError, KeyError, TypeError):
+                continue  # Partial line from an interrupted run
+    return done
+
+async def run_batch(topics, output, concurrency=4, time_period=None, max_articles=None):
+    """Summarize topics concurrently, writing one JSON line per topic as each finishes
+    
+    Topics share one page fetch pool, so an article found for several topics
+    is fetched once. Each line is flushed as soon as it is written so an
+    interrupted run can be resumed.
+    
+    Args:
+        topics (list): Topics to summarize
+        output (file): Open text file the JSON lines are appended to
+        concurrency (int): Topics processed at once
+        time_period (str, optional): Time period for news
+        max_articles (int, optional): Number of articles per summary
+        
+    Returns:
+        int: Number of topics that did not produce a summary
+    """
+    pool = FetchPool(BATCH_CONFIG["max_parallel_fetches"])
+    use_fetch_pool(pool)
+    slots = asyncio.Semaphore(concurrency)
+    failed = 0
+    
+    async def run(topic):
+        async with slots:
+            return await summarize_topic_record(topic, time_period, max_articles)
+    
+    tasks = [asyncio.create_task(run(topic)) for topic in topics]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            failed += record["status"] != "ok"
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            logger.info("Finished '%s' (%s) in %.0f ms", record["topic"], record["status"], record["elapsed_ms"])
+    finally:
+        for task in tasks:
+            task.cancel()
+        pool.close()
+    return failed
+
+def batch_main(args):
+    """Run --batch mode and return the process exit code"""
+    if not SERPAPI_KEY or not OPENAI_API_KEY:
+        logger.error("API keys not found. Please check your .env file.")
+        return 2
+    
+    if args.batch == "-":
+        topics = read_topics(sys.stdin)
+    else:
+        with open(args.batch) as f:
+            topics = read_topics(f)
+    
+    to_stdout = args.output == "-"
+    if args.resume:
+        if to_stdout:
+            logger.error("--resume needs --output to name a file")
+            return 2
+        done = completed_topics(args.output)
+        skipped = [topic for topic in topics if canonical_topic(topic) in done]
+        topics = [topic for topic in topics if canonical_topic(topic) not in done]
+        if skipped:
+            logger.info("Resuming: skipping %s topics already written to %s", len(skipped), args.output)
+    
+    if not topics:
+        logger.info("No topics to summarize")
+        return 0
+    
+    output = sys.stdout if to_stdout else open(args.output, "a" if args.resume else "w")
+    try:
+        if args.resume and output.tell() > 0:
+            with open(args.output, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    output.write("\n")  # Terminate a line cut off by an interrupted run
+        failed = asyncio.run(run_batch(topics, output, args.concurrency, args.time_period, args.max_articles))
+    finally:
+        if not to_stdout:
+            output.close()
+    return 1 if failed else 0
+
 def main():
     """Entry point for CLI"""
     parser = argparse.ArgumentParser(description='Newsaroo - A daily news summarizer')
     parser.add_argument('--topic', type=str, help='The news topic to search for')
+    parser.add_argument('--batch', type=str, metavar='FILE',
+                        help='Summarize every topic in FILE (one per line, "-" for stdin) and write JSON lines')
+    parser.add_argument('--output', type=str, default='-', help='JSONL output file for --batch (default: stdout)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Topics processed at once in --batch mode')
+    parser.add_argument('--resume', action='store_true', help='Skip topics already present in --output')
+    parser.add_argument('--time-period', type=str, help='Time period for news, 1d to 7d')
+    parser.add_argument('--max-articles', type=int, help='Articles per summary')
     args = parser.parse_args()
     
+    if args.batch:
+        # Keep stdout for the JSON lines
+        configure_logging(stream=sys.stderr)
+        try:
+            sys.exit(batch_main(args))
+        except KeyboardInterrupt:
+            print("\nBatch interrupted; rerun with --resume to continue", file=sys.stderr)
+            sys.exit(130)
+    
+    configure_logging()
+    
     try:
         asyncio.run(news_summarizer(args.topic))
     except KeyboardInterrupt:
@@ -1,54 +1,386 @@
 """
 Configuration module for the Newsaroo application.
 Handles loading environment variables and setting up configuration.
+
+Settings are read from the environment (and the .env file) the first time
+one is used rather than at import, so importing the package stays cheap and
+tools can adjust the environment before anything reads it. Module-level
+names such as CACHE_CONFIG keep working and resolve through `settings`.
 """
 
 import os
-from dotenv import load_dotenv
 import logging
+import threading
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Load environment variables from .env file
-load_dotenv()
-
-# API Keys
-SERPAPI_KEY = os.environ.get("SERP_API_KEY")
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-SUPABASE_API_URL = os.environ.get("SUPABASE_API_URL")
-SUPABASE_API_KEY = os.environ.get("SUPABASE_API_KEY")
-
-# Check if keys are available
-if not SERPAPI_KEY:
-    logger.warning("SERP_API_KEY not found in environment variables. Please check your .env file.")
-
-if not OPENAI_API_KEY:
-    logger.warning("OPENAI_API_KEY not found in environment variables. Please check your .env file.")
-
-if not SUPABASE_API_URL or not SUPABASE_API_KEY:
-    logger.warning("Supabase configuration not found. Please check SUPABASE_API_URL and SUPABASE_API_KEY in your .env file.")
-
-# Set the OpenAI API key for litellm
-os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY if OPENAI_API_KEY else ""
-
-# Default configuration
-DEFAULT_CONFIG = {
-    "max_articles": 10,  # Maximum number of articles to process
-    "time_period": "1d",  # Default time period for news search (1 day)
-    "llm_model": "gpt-4",  # Default LLM model to use
-    "max_tokens": 1000,  # Maximum tokens for LLM response
-}
-
-# LLM Configuration
-LLM_CONFIG = {
-    "model": DEFAULT_CONFIG["llm_model"],
-    "max_tokens": DEFAULT_CONFIG["max_tokens"],
-    "system_message": "You are a helpful news summarization assistant that provides concise, accurate summaries of recent news."
-}
-
-# Log configuration status
-logger.info("Configuration loaded - API Keys status:")
-logger.info(f"SERP API Key: {'Present' if SERPAPI_KEY else 'Missing'}")
-logger.info(f"OpenAI API Key: {'Present' if OPENAI_API_KEY else 'Missing'}")
-logger.info(f"Supabase Configuration: {'Present' if (SUPABASE_API_URL and SUPABASE_API_KEY) else 'Missing'}") 
\ No newline at end of file
+def _load():
+    """Read every setting from the environment
+
+    Returns:
+        dict: Setting name -> value
+    """
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env file
+    load_dotenv()
+
+    # API Keys
+    SERPAPI_KEY = os.environ.get("SERP_API_KEY")
+    OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+    SUPABASE_API_URL = os.environ.get("SUPABASE_API_URL")
+    SUPABASE_API_KEY = os.environ.get("SUPABASE_API_KEY")
+
+    # Upstream endpoints (overridable to point at local stand-ins, e.g. for benchmarks)
+    SERPAPI_BASE_URL = os.environ.get("SERPAPI_BASE_URL", "https://serpapi.com")
+    OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE")
+
+    # SerpAPI key pool, e.g. SERP_API_KEYS="key1,key2:5000" (":5000" sets that key's monthly quota).
+    # Defaults to SERP_API_KEY alone; SERP_API_KEY defaults to the first key of the pool.
+    SERPAPI_KEYS = [entry.strip() for entry in os.environ.get("SERP_API_KEYS", SERPAPI_KEY or "").split(",") if entry.strip()]
+    if not SERPAPI_KEY and SERPAPI_KEYS:
+        key, _, quota = SERPAPI_KEYS[0].rpartition(":")
+        SERPAPI_KEY = key if quota.isdigit() else SERPAPI_KEYS[0]
+
+    # Check if keys are available
+    if not SERPAPI_KEY:
+        logger.warning("SERP_API_KEY not found in environment variables. Please check your .env file.")
+
+    if not OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY not found in environment variables. Please check your .env file.")
+
+    if not SUPABASE_API_URL or not SUPABASE_API_KEY:
+        logger.warning("Supabase configuration not found. Please check SUPABASE_API_URL and SUPABASE_API_KEY in your .env file.")
+
+    # Set the OpenAI API key for litellm
+    os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY if OPENAI_API_KEY else ""
+
+    # Default configuration
+    DEFAULT_CONFIG = {
+        "max_articles": 10,  # Maximum number of articles to process
+        "time_period": "1d",  # Default time period for news search (1 day)
+        "llm_model": "gpt-4",  # Default LLM model to use
+        "max_tokens": 1000,  # Maximum tokens for LLM response
+    }
+
+    # LLM Configuration
+    LLM_CONFIG = {
+        "model": DEFAULT_CONFIG["llm_model"],
+        "max_tokens": DEFAULT_CONFIG["max_tokens"],
+        "system_message": "You are a helpful news summarization assistant that provides concise, accurate summaries of recent news.",
+        "api_base": OPENAI_API_BASE,  # None uses the provider default
+    }
+
+    # LLM model routing: each summary uses the first of `models` (preferred first) whose
+    # context fits the prompt and whose observed latency meets the request's latency
+    # target. With `fallback`, a primary that misses the target is raced against the
+    # fastest other model.
+    LLM_ROUTER_CONFIG = {
+        "models": [name.strip() for name in os.environ.get(
+            "NEWSAROO_LLM_MODELS", DEFAULT_CONFIG["llm_model"]
+        ).split(",") if name.strip()],
+        # Prompt plus completion tokens each model accepts; unlisted models are not limited
+        "context_tokens": {
+            "gpt-4": 8192,
+            "gpt-4-turbo": 128000,
+            "gpt-4o": 128000,
+            "gpt-4o-mini": 128000,
+            "gpt-3.5-turbo": 16385,
+        },
+        # Seconds per completion assumed until a model has min_samples observations
+        "expected_latency": {
+            "gpt-4": 12.0,
+            "gpt-4-turbo": 6.0,
+            "gpt-4o": 4.0,
+            "gpt-4o-mini": 2.0,
+            "gpt-3.5-turbo": 2.0,
+        },
+        "latency_target": float(os.environ.get("NEWSAROO_LLM_LATENCY_TARGET", "0")),  # Default target in seconds, 0 for none
+        "fallback": os.environ.get("NEWSAROO_LLM_FALLBACK", "true").lower() in ("1", "true", "yes"),
+        "percentile": 90,  # Observed latency percentile compared with the target
+        "max_error_rate": 0.5,  # Models failing more often than this are skipped while others work
+        "min_samples": 5,
+        "window": 50,  # Latest calls kept per model
+    }
+
+    # Degraded mode for /news/summarize: if the LLM has not answered by the time a
+    # request has run for `slo` seconds, or it fails, a locally built extractive
+    # Top 3 is returned instead, marked degraded in the response metadata
+    DEGRADED_CONFIG = {
+        "enabled": os.environ.get("NEWSAROO_DEGRADED_MODE", "true").lower() in ("1", "true", "yes"),
+        "slo": float(os.environ.get("NEWSAROO_SUMMARY_SLO", "30")),  # Seconds per request
+        "min_llm_seconds": 0.5,  # Below this much time left, the LLM is not called at all
+        # Let an LLM call that missed the SLO finish in the background, so later requests
+        # for the same articles get its summary from the shared cache (requires the cache)
+        "upgrade": os.environ.get("NEWSAROO_DEGRADED_UPGRADE", "true").lower() in ("1", "true", "yes"),
+    }
+
+    # Shared cache configuration (SQLite in WAL mode, shared by all worker processes)
+    CACHE_CONFIG = {
+        "enabled": os.environ.get("NEWSAROO_CACHE_ENABLED", "false").lower() in ("1", "true", "yes"),  # run.py --prod turns it on
+        "path": os.environ.get("NEWSAROO_CACHE_PATH", ".newsaroo_cache.sqlite3"),
+        "ttl": {  # Seconds each kind of entry stays fresh
+            "serp": int(os.environ.get("NEWSAROO_CACHE_TTL_SERP", "600")),
+            "article": int(os.environ.get("NEWSAROO_CACHE_TTL_ARTICLE", "21600")),
+            "summary": int(os.environ.get("NEWSAROO_CACHE_TTL_SUMMARY", "900")),
+            # Serialized /news/summarize responses, returned without running the pipeline
+            "response": int(os.environ.get("NEWSAROO_CACHE_TTL_RESPONSE", "300")),
+        },
+        "busy_timeout": 1.0,  # Seconds a write waits for another worker's lock before giving up
+        "lease_ttl": 60,  # Seconds one worker may hold a single-flight lease
+        "lease_poll_interval": 0.05,  # Seconds between checks while another worker computes
+        "purge_probability": 0.002,  # Chance per write of purging expired entries
+        # Namespaces computed to completion even if every caller disconnects: SerpAPI
+        # searches and LLM completions run in threads and are billed once sent
+        "finish_abandoned": ("serp", "summary"),
+    }
+
+    # Conditional responses for the summary endpoints: strong ETags with 304s for
+    # polls of unchanged summaries, Cache-Control from the summary TTL, compression
+    RESPONSE_CONFIG = {
+        "etags": os.environ.get("NEWSAROO_ETAGS", "true").lower() in ("1", "true", "yes"),
+        # Bodies at least this large are compressed (brotli if installed, else gzip); 0 disables
+        "compress_min_bytes": int(os.environ.get("NEWSAROO_COMPRESS_MIN_BYTES", "1024")),
+        "gzip_level": 6,
+        "brotli_quality": 5,
+        # Encode summary responses from plain dicts (with orjson if installed) instead of
+        # validating them through their Pydantic models
+        "fast_json": os.environ.get("NEWSAROO_FAST_JSON", "true").lower() in ("1", "true", "yes"),
+    }
+
+    # On-demand profiling: a request sent with "X-Profile: 1" and a matching
+    # "X-Admin-Token" is sampled, and its folded stacks are saved to `dir`.
+    # Profiling and the admin endpoints are off unless an admin token is set.
+    PROFILING_CONFIG = {
+        "admin_token": os.environ.get("NEWSAROO_ADMIN_TOKEN", ""),
+        "sample_interval": float(os.environ.get("NEWSAROO_PROFILE_INTERVAL_MS", "5")) / 1000,
+        "max_seconds": 120,  # Sampling stops after this long even if the request has not finished
+        "dir": os.environ.get("NEWSAROO_PROFILE_DIR", ".newsaroo_profiles"),
+        "keep": 50,  # Latest profiles kept on disk
+        # Event-loop lag monitor: records stalls with the stack the loop was running
+        "loop_monitor": os.environ.get("NEWSAROO_LOOP_MONITOR", "false").lower() in ("1", "true", "yes"),
+        "stall_threshold": float(os.environ.get("NEWSAROO_LOOP_STALL_MS", "100")) / 1000,
+        "loop_interval": 0.05,  # Seconds between the monitor's check-ins
+        "keep_stalls": 100,  # Latest stalls kept per worker
+    }
+
+    # Local article store: extracted text with a full-text index, reused across topics
+    ARTICLE_STORE_CONFIG = {
+        "enabled": os.environ.get("NEWSAROO_ARTICLE_STORE_ENABLED", "false").lower() in ("1", "true", "yes"),  # run.py --prod turns it on
+        "path": os.environ.get("NEWSAROO_ARTICLE_STORE_PATH", ".newsaroo_articles.sqlite3"),
+        "retention_days": float(os.environ.get("NEWSAROO_ARTICLE_RETENTION_DAYS", "14")),  # Older articles are compacted away
+        "max_articles": int(os.environ.get("NEWSAROO_ARTICLE_STORE_MAX", "100000")),  # Oldest articles beyond this are removed
+        "compact_probability": 0.002,  # Chance per write of compacting
+    }
+
+    # Article page fetching: per-domain timeouts follow each host's observed p95
+    # and hosts that keep failing are skipped for a while (circuit breaker)
+    FETCH_CONFIG = {
+        "default_timeout": 10.0,  # Seconds, until a host has min_samples successful fetches
+        "min_timeout": 1.0,
+        "max_timeout": 10.0,
+        "timeout_multiplier": 1.5,  # Headroom over the host's p95
+        "min_samples": 5,
+        "window": 50,  # Latest successful fetches kept per host
+        "max_per_host": int(os.environ.get("NEWSAROO_FETCH_MAX_PER_HOST", "4")),  # Concurrent connections per host
+        "failure_threshold": 5,  # Consecutive failures that open a host's circuit
+        "open_seconds": 60,  # Seconds a circuit stays open before a probe fetch
+        "stats_path": os.environ.get("NEWSAROO_FETCH_STATS_PATH", ".newsaroo_fetch_stats.json"),  # Empty keeps stats in memory
+        "save_interval": 30,  # Seconds between saves of the per-domain statistics
+    }
+
+    # Byte budget for article content in flight in a worker: page bodies being
+    # fetched, pages being parsed and prompts being built or sent. Work waits for
+    # room in the budget; a budget of 0 turns it off.
+    MEMORY_CONFIG = {
+        "budget_bytes": int(float(os.environ.get("NEWSAROO_MEMORY_BUDGET_MB", "256")) * 1024 * 1024),
+        "max_page_bytes": int(os.environ.get("NEWSAROO_MAX_PAGE_KB", "1024")) * 1024,  # Longer pages are cut off
+        "parse_factor": 20,  # Bytes of parse tree and text per byte of HTML while a page is extracted
+        "prompt_factor": 4,  # Copies of a prompt alive during a completion (prompt, cache key, request body)
+    }
+
+    # Hedged requests for SerpAPI searches and LLM completions: if a call is slower
+    # than the given percentile of its recent latencies, a second identical call is
+    # sent and the first to finish wins. At most `budget` of calls are hedged.
+    HEDGE_CONFIG = {
+        "enabled": os.environ.get("NEWSAROO_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes"),
+        "percentile": float(os.environ.get("NEWSAROO_HEDGE_PERCENTILE", "95")),
+        "budget": float(os.environ.get("NEWSAROO_HEDGE_BUDGET", "0.05")),  # Hedges per call
+        "burst": 2,  # Hedges that may be sent back to back when budget has accumulated
+        "min_samples": 20,  # Latencies observed before hedging starts
+        "min_delay": 0.05,  # Seconds
+        "window": 200,  # Latest latencies kept per call
+    }
+
+    # Admission control for the expensive pipeline routes: at most max_concurrent
+    # requests run, up to max_queue wait (each for at most queue_timeout seconds),
+    # and the rest are rejected with 429 and Retry-After
+    ADMISSION_CONFIG = {
+        "enabled": os.environ.get("NEWSAROO_ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes"),
+        "routes": {
+            "news_summarize": {
+                "max_concurrent": int(os.environ.get("NEWSAROO_SUMMARIZE_MAX_CONCURRENT", "8")),
+                "max_queue": int(os.environ.get("NEWSAROO_SUMMARIZE_MAX_QUEUE", "16")),
+                "queue_timeout": float(os.environ.get("NEWSAROO_SUMMARIZE_QUEUE_TIMEOUT", "5")),
+            },
+            "news_summarize_batch": {  # Each batch runs several topics itself (see BATCH_CONFIG)
+                "max_concurrent": int(os.environ.get("NEWSAROO_BATCH_MAX_CONCURRENT", "2")),
+                "max_queue": int(os.environ.get("NEWSAROO_BATCH_MAX_QUEUE", "4")),
+                "queue_timeout": float(os.environ.get("NEWSAROO_BATCH_QUEUE_TIMEOUT", "5")),
+            },
+            "user_summaries": {  # Runs the pipeline once per topic, so fewer run at once
+                "max_concurrent": int(os.environ.get("NEWSAROO_USER_SUMMARIES_MAX_CONCURRENT", "4")),
+                "max_queue": int(os.environ.get("NEWSAROO_USER_SUMMARIES_MAX_QUEUE", "8")),
+                "queue_timeout": float(os.environ.get("NEWSAROO_USER_SUMMARIES_QUEUE_TIMEOUT", "5")),
+            },
+        },
+    }
+
+    # Parallelism inside one /news/summarize/batch request
+    BATCH_CONFIG = {
+        "max_parallel_topics": int(os.environ.get("NEWSAROO_BATCH_PARALLEL_TOPICS", "4")),
+        "max_parallel_fetches": int(os.environ.get("NEWSAROO_BATCH_PARALLEL_FETCHES", "8")),  # Shared page fetch pool
+        "max_parallel_llm": int(os.environ.get("NEWSAROO_BATCH_PARALLEL_LLM", "2")),  # Concurrent LLM completions
+    }
+
+    # Production server configuration (see run.py --prod)
+    SERVER_CONFIG = {
+        "host": os.environ.get("NEWSAROO_HOST", "0.0.0.0"),
+        "port": int(os.environ.get("NEWSAROO_PORT", "8080")),
+        "workers": int(os.environ.get("NEWSAROO_WORKERS", str(os.cpu_count() or 1))),
+        "max_requests": int(os.environ.get("NEWSAROO_MAX_REQUESTS", "5000")),  # Recycle a worker after this many requests (0 disables)
+        "max_requests_jitter": int(os.environ.get("NEWSAROO_MAX_REQUESTS_JITTER", "500")),  # Random extra requests per worker so recycles are staggered
+        "graceful_timeout": int(os.environ.get("NEWSAROO_GRACEFUL_TIMEOUT", "30")),  # Seconds to drain in-flight requests on shutdown
+        "keep_alive": int(os.environ.get("NEWSAROO_KEEP_ALIVE", "5")),
+        # Import slow client libraries and open connections in the background at startup
+        "warmup": os.environ.get("NEWSAROO_WARMUP", "true").lower() in ("1", "true", "yes"),
+    }
+
+    # SerpAPI result paging: requests for more articles than one page holds fetch
+    # the extra pages concurrently (each page is cached separately)
+    SERP_CONFIG = {
+        "page_size": int(os.environ.get("NEWSAROO_SERP_PAGE_SIZE", "10")),  # Results per SerpAPI request
+        "max_pages": int(os.environ.get("NEWSAROO_SERP_MAX_PAGES", "3")),  # Pages fetched per search at most
+    }
+
+    # Searches are spread over the SerpAPI key pool: each key has a token bucket
+    # (rate/burst), a monthly quota, and backs off on its own after a 429
+    SERP_KEYS_CONFIG = {
+        "keys": SERPAPI_KEYS,
+        "monthly_quota": int(os.environ.get("NEWSAROO_SERP_KEY_QUOTA", "0")),  # Searches per key per month, 0 for no limit
+        "rate": float(os.environ.get("NEWSAROO_SERP_KEY_RATE", "5")),  # Searches per second per key
+        "burst": int(os.environ.get("NEWSAROO_SERP_KEY_BURST", "10")),  # Searches a key may send back to back
+        "max_wait": float(os.environ.get("NEWSAROO_SERP_KEY_MAX_WAIT", "30")),  # Seconds a search waits for a free key
+        "backoff_initial": 5.0,  # Seconds a key rests after its first 429, doubling on each further 429
+        "backoff_max": 300.0,
+        "usage_path": os.environ.get("NEWSAROO_SERP_USAGE_PATH", ".newsaroo_serp_usage.json"),  # Empty keeps usage in memory
+        "save_interval": 30,  # Seconds between saves of the usage counts
+    }
+
+    # News sources: providers queried for each topic, in priority order
+    FEED_URLS = [url.strip() for url in os.environ.get("NEWSAROO_FEEDS", "").split(",") if url.strip()]
+    SOURCES_CONFIG = {
+        # Defaults to the feed index (when feeds are configured) ahead of SerpAPI
+        "providers": [name.strip() for name in os.environ.get(
+            "NEWSAROO_SOURCES", "feeds,serpapi" if FEED_URLS else "serpapi"
+        ).split(",") if name.strip()],
+        # Ask local providers first and only call SerpAPI when they return too few articles
+        "local_first": os.environ.get("NEWSAROO_SOURCES_LOCAL_FIRST", "true").lower() in ("1", "true", "yes"),
+    }
+
+    # RSS/Atom feeds polled into a local full-text index
+    FEEDS_CONFIG = {
+        "urls": FEED_URLS,  # Feed URLs or local file paths
+        "poll_interval": float(os.environ.get("NEWSAROO_FEED_POLL_INTERVAL", "300")),  # Seconds
+        "timeout": 10.0,  # Seconds per feed request
+        "index_path": os.environ.get("NEWSAROO_FEED_INDEX_PATH", ".newsaroo_feeds.sqlite3"),
+        "retention_days": float(os.environ.get("NEWSAROO_FEED_RETENTION_DAYS", "7")),
+        "max_entries": int(os.environ.get("NEWSAROO_FEED_MAX_ENTRIES", "50000")),
+    }
+
+    # Topic canonicalization: equivalent spellings share searches, caches and summaries
+    TOPIC_CONFIG = {
+        # JSON object of extra aliases, e.g. {"gen ai": "generative artificial intelligence"}
+        "aliases_file": os.environ.get("NEWSAROO_TOPIC_ALIASES_FILE", ""),
+        "aliases": {
+            "ai": "artificial intelligence",
+            "ml": "machine learning",
+            "genai": "generative ai",
+            "gen ai": "generative ai",
+            "llm": "large language models",
+            "llms": "large language models",
+            "ev": "electric vehicles",
+            "evs": "electric vehicles",
+            "crypto": "cryptocurrency",
+            "us politics": "united states politics",
+            "usa politics": "united states politics",
+            "stock market": "stocks",
+            "stock markets": "stocks",
+        },
+    }
+
+    # Delta digest Configuration (per user and topic, only articles the user has not seen are summarized)
+    DELTA_CONFIG = {
+        "max_seen": int(os.environ.get("NEWSAROO_DELTA_MAX_SEEN", "500")),  # Seen articles remembered per user and topic
+    }
+
+    # Logging Configuration
+    LOGGING_CONFIG = {
+        "level": os.environ.get("NEWSAROO_LOG_LEVEL", "INFO").upper(),
+        "file": os.environ.get("NEWSAROO_LOG_FILE", "newsaroo.log"),  # Empty string disables the file handler
+        "json": os.environ.get("NEWSAROO_LOG_JSON", "").lower() in ("1", "true", "yes"),
+        # Fraction of DEBUG records kept for loggers emitting per-article payloads
+        "sample_rates": {
+            "src.news.search": float(os.environ.get("NEWSAROO_LOG_SAMPLE_RATE", "0.1")),
+            "src.news.content": float(os.environ.get("NEWSAROO_LOG_SAMPLE_RATE", "0.1")),
+        },
+    }
+
+    # Log configuration status
+    logger.info("Configuration loaded - API Keys status:")
+    logger.info("SERP API Key: %s", "Present" if SERPAPI_KEY else "Missing")
+    logger.info("OpenAI API Key: %s", "Present" if OPENAI_API_KEY else "Missing")
+    logger.info("Supabase Configuration: %s", "Present" if (SUPABASE_API_URL and SUPABASE_API_KEY) else "Missing")
+
+    return {name: value for name, value in locals().items() if name.isupper()}
+
+
+class Settings:
+    """Lazily initialized application settings
+
+    The environment is read on first attribute access; attribute names match
+    the module-level setting names, e.g. ``settings.CACHE_CONFIG``.
+    """
+
+    def __init__(self):
+        self._values = None
+        self._lock = threading.Lock()
+
+    def _loaded(self):
+        if self._values is None:
+            with self._lock:
+                if self._values is None:
+                    self._values = _load()
+        return self._values
+
+    def __getattr__(self, name):
+        try:
+            return self._loaded()[name]
+        except KeyError:
+            raise AttributeError(f"No setting named {name!r}") from None
+
+    def reload(self):
+        """Read the environment again on next access"""
+        with self._lock:
+            self._values = None
+
+
+settings = Settings()
+
+
+def __getattr__(name):
+    # `from src.config import CACHE_CONFIG` and friends load the settings on first use
+    if name.isupper():
+        return getattr(settings, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,240 @@
+"""
+Local article store for the Newsaroo application.
+Keeps extracted article text in a SQLite database with an FTS5 full-text
+index, keyed by canonical URL, so an article returned for several topics is
+fetched once and stays searchable locally until it ages out.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from ..config import ARTICLE_STORE_CONFIG
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT,
+    source TEXT,
+    published TEXT,
+    published_at REAL,
+    content TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_fetched_at ON articles (fetched_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, content, content='articles', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO articles_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+"""
+
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ocid", "cmpid", "ref", "taid")
+
+
+def canonical_url(url):
+    """Normalize a URL so links to the same article compare equal
+
+    Lowercases the scheme and host, drops "www.", the fragment, tracking
+    parameters and a trailing slash, and sorts the remaining query.
+
+    Args:
+        url (str): Article link
+
+    Returns:
+        str: Canonical URL
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, urlencode(query), ""))
+
+
+def _fts_query(text):
+    # Quote every term so free text (hyphens, colons, quotes) is never parsed as FTS syntax
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+class ArticleStore:
+    """SQLite-backed article store with full-text search, shared by all worker processes
+
+    Like the shared cache, all database access runs on one dedicated thread.
+
+    Args:
+        path (str): Database file path
+        retention_days (float, optional): Age after which articles are compacted away.
+            Defaults to ARTICLE_STORE_CONFIG["retention_days"].
+        max_articles (int, optional): Articles kept at most. Defaults to ARTICLE_STORE_CONFIG["max_articles"].
+    """
+
+    def __init__(self, path, retention_days=None, max_articles=None):
+        self.path = path
+        self.retention_days = retention_days or ARTICLE_STORE_CONFIG["retention_days"]
+        self.max_articles = max_articles or ARTICLE_STORE_CONFIG["max_articles"]
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="newsaroo-articles")
+
+    def _connection(self):
+        # Only called on the executor thread
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            # Must be set before the first table exists for compaction to return space to the OS
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def get(self, url):
+        """Get a stored article
+
+        Args:
+            url (str): Article link (any spelling of it)
+
+        Returns:
+            dict: url, title, source, published, content, content_hash and fetched_at, or None
+        """
+        return await self._run(self._get, canonical_url(url))
+
+    async def put(self, url, content, title=None, source=None, published=None, published_at=None):
+        """Store an article's extracted text, replacing any earlier version
+
+        published is the date as the source reported it; published_at, if known,
+        is the same as a Unix timestamp and is what search(since=...) filters on.
+        """
+        await self._run(self._put, canonical_url(url), content, title, source, published, published_at)
+
+    async def search(self, query, limit=10, since=None, with_content=False):
+        """Full-text search over stored titles and content
+
+        Args:
+            query (str): Free-text query; every term must match
+            limit (int): Maximum results
+            since (float, optional): Only articles published (or, if the date is unknown, stored)
+                after this Unix timestamp
+            with_content (bool): Include the full stored text of each result
+
+        Returns:
+            list: Best matches first, each with url, title, source, published and a highlighted snippet
+        """
+        return await self._run(self._search, query, limit, since, with_content)
+
+    async def compact(self):
+        """Remove articles past the retention period or beyond the size limit
+
+        Returns:
+            int: Number of articles removed
+        """
+        return await self._run(self._compact)
+
+    def _get(self, url):
+        try:
+            row = self._connection().execute(
+                "SELECT url, title, source, published, content, content_hash, fetched_at FROM articles "
+                "WHERE url = ? AND fetched_at > ?",
+                (url, time.time() - self.retention_days * 86400)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Article store read failed: %s", e)
+            return None
+        if row is None:
+            return None
+        return dict(zip(("url", "title", "source", "published", "content", "content_hash", "fetched_at"), row))
+
+    def _put(self, url, content, title, source, published, published_at):
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        try:
+            # Unchanged articles (e.g. a feed entry seen on every poll) are not rewritten or reindexed
+            self._connection().execute(
+                "INSERT INTO articles (url, title, source, published, published_at, content, content_hash, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET title = excluded.title, source = excluded.source, "
+                "published = excluded.published, published_at = excluded.published_at, content = excluded.content, "
+                "content_hash = excluded.content_hash, fetched_at = excluded.fetched_at "
+                "WHERE content_hash != excluded.content_hash OR title IS NOT excluded.title",
+                (url, title, source, published, published_at, content, content_hash, time.time())
+            )
+            if random.random() < ARTICLE_STORE_CONFIG["compact_probability"]:
+                self._compact()
+        except sqlite3.Error as e:
+            logger.warning("Article store write failed: %s", e)
+
+    def _search(self, query, limit, since, with_content):
+        match = _fts_query(query)
+        if not match:
+            return []
+        columns = ["url", "title", "source", "published", "snippet"] + (["content"] if with_content else [])
+        sql = (
+            "SELECT a.url, a.title, a.source, a.published, snippet(articles_fts, 1, '[', ']', '...', 24)"
+            + (", a.content" if with_content else "")
+            + " FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid WHERE articles_fts MATCH ?"
+        )
+        params = [match]
+        if since is not None:
+            sql += " AND coalesce(a.published_at, a.fetched_at) >= ?"
+            params.append(since)
+        sql += " ORDER BY bm25(articles_fts) LIMIT ?"
+        params.append(limit)
+        try:
+            rows = self._connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Article search failed: %s", e)
+            return []
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _compact(self):
+        conn = self._connection()
+        cutoff = time.time() - self.retention_days * 86400
+        removed = conn.execute("DELETE FROM articles WHERE fetched_at <= ?", (cutoff,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM articles WHERE id IN (SELECT id FROM articles ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_articles,)
+        ).rowcount
+        if removed:
+            conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+            conn.execute("PRAGMA incremental_vacuum")
+            logger.info("Article store compacted: %s articles removed", removed)
+        return removed
+
+
+_store = None
+
+
+def get_article_store():
+    """Get the process-wide article store, or None when it is disabled"""
+    global _store
+    if not ARTICLE_STORE_CONFIG["enabled"]:
+        return None
+    if _store is None:
+        _store = ArticleStore(ARTICLE_STORE_CONFIG["path"])
+    return _store
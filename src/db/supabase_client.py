@@ -4,16 +4,20 @@ Supabase client configuration for the Newsaroo application.
 
 import os
 import logging
-from typing import Optional, Dict, Any
-from supabase import create_client, Client
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from ..config import SUPABASE_API_URL, SUPABASE_API_KEY
+from ..utils.metrics import span
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 class SupabaseManager:
     _instance: Optional['SupabaseManager'] = None
-    _client: Optional[Client] = None
+    _client: Optional['Client'] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -32,6 +36,9 @@ class SupabaseManager:
             raise ValueError(error_msg)
         
         try:
+            # Imported here: the supabase client library is slow to import
+            from supabase import create_client
+            
             # Initialize with service role key
             self._client = create_client(SUPABASE_API_URL, SUPABASE_API_KEY)
             logger.info("Supabase client created successfully with service role")
@@ -41,7 +48,7 @@ class SupabaseManager:
             raise Exception(error_msg)
 
     @property
-    def client(self) -> Client:
+    def client(self) -> 'Client':
         """Get the Supabase client instance"""
         if not self._client:
             self._initialize_client()
@@ -60,7 +67,8 @@ class SupabaseManager:
             Exception: If insertion fails
         """
         try:
-            result = self.client.table('newsroom_users').insert(user_data).execute()
+            with span("supabase.insert_user", kind="outbound"):
+                result = self.client.table('newsroom_users').insert(user_data).execute()
             if not result.data:
                 raise Exception("No data returned from insert operation")
             logger.info(f"Successfully inserted user: {user_data.get('mobile_number')}")
@@ -80,10 +88,11 @@ class SupabaseManager:
             Dict containing user data or None if not found
         """
         try:
-            result = self.client.table('newsroom_users')\
-                .select("*")\
-                .eq('mobile_number', mobile_number)\
-                .execute()
+            with span("supabase.get_user", kind="outbound"):
+                result = self.client.table('newsroom_users')\
+                    .select("*")\
+                    .eq('mobile_number', mobile_number)\
+                    .execute()
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Failed to get user: {str(e)}")
@@ -103,10 +112,11 @@ class SupabaseManager:
             Exception: If update fails
         """
         try:
-            result = self.client.table('newsroom_users')\
-                .update({'topics_of_interest': topics})\
-                .eq('mobile_number', mobile_number)\
-                .execute()
+            with span("supabase.update_user_topics", kind="outbound"):
+                result = self.client.table('newsroom_users')\
+                    .update({'topics_of_interest': topics})\
+                    .eq('mobile_number', mobile_number)\
+                    .execute()
             if not result.data:
                 raise Exception("No data returned from update operation")
             return result.data[0]
@@ -115,6 +125,56 @@ class SupabaseManager:
             logger.error(error_msg)
             raise Exception(error_msg)
 
+    async def get_digest_state(self, mobile_number: str, topic: str) -> Optional[Dict[str, Any]]:
+        """Get what a user has already been sent for a topic
+        
+        Args:
+            mobile_number: User's mobile number
+            topic: Topic of interest
+            
+        Returns:
+            Dict with seen_articles (link -> content hash) and last_summary, or None if no digest was sent yet
+        """
+        try:
+            with span("supabase.get_digest_state", kind="outbound"):
+                result = self.client.table('newsroom_digest_state')\
+                    .select("*")\
+                    .eq('mobile_number', mobile_number)\
+                    .eq('topic', topic)\
+                    .execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Failed to get digest state: {str(e)}")
+            return None
+
+    async def save_digest_state(self, mobile_number: str, topic: str, seen_articles: Dict[str, str], last_summary: str) -> None:
+        """Record the articles and summary sent to a user for a topic
+        
+        Args:
+            mobile_number: User's mobile number
+            topic: Topic of interest
+            seen_articles: Article link -> content hash
+            last_summary: The digest that was returned
+            
+        Raises:
+            Exception: If the write fails
+        """
+        try:
+            with span("supabase.save_digest_state", kind="outbound"):
+                self.client.table('newsroom_digest_state')\
+                    .upsert({
+                        'mobile_number': mobile_number,
+                        'topic': topic,
+                        'seen_articles': seen_articles,
+                        'last_summary': last_summary,
+                        'updated_at': datetime.now(timezone.utc).isoformat()
+                    }, on_conflict='mobile_number,topic')\
+                    .execute()
+        except Exception as e:
+            error_msg = f"Failed to save digest state: {str(e)}"
+            logger.error(error_msg)
+            raise Exception(error_msg)
+
 def get_supabase_client() -> SupabaseManager:
     """Get the Supabase manager instance with service role"""
     return SupabaseManager() 
\ No newline at end of file
@@ -2,28 +2,46 @@
 Main module for the Newsaroo API application.
 """
 
+import asyncio
 import logging
-import sys
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from .api.routes import router
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("newsaroo.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from .api.disconnect import CancelOnDisconnectMiddleware
+from .api.profiling import ProfileRequestMiddleware
+from .utils.logging_setup import ensure_logging
+from .utils.warmup import warm_up
+from .news.feeds import start_feed_poller
+from .utils.profiling import start_loop_monitor
+from .config import SERVER_CONFIG
+from .utils.metrics import render_metrics, HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
 
 logger = logging.getLogger(__name__)
 
+API_PREFIX = "/api/v1"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Configure logging in each server process (uvicorn workers import this module fresh)
+    ensure_logging()
+    background = [start_feed_poller(), start_loop_monitor()]
+    if SERVER_CONFIG["warmup"]:
+        background.append(asyncio.create_task(warm_up()))
+    try:
+        yield
+    finally:
+        for task in background:
+            if task is not None:
+                task.cancel()
+
 # Create FastAPI app
 app = FastAPI(
     title="Newsaroo API",
-    description="News summarization API"
+    description="News summarization API",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -35,10 +53,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record latency and in-flight requests per route
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    except asyncio.CancelledError:
+        status = 499  # Client closed the request
+        raise
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=_route_template(request),
+            status=status
+        )
+
+def _route_template(request: Request):
+    """Route template of the matched endpoint, e.g. /api/v1/users/{mobile}/summaries
+    
+    Templates keep path parameters out of metric labels. Depending on the FastAPI
+    version the matched route may or may not carry the router prefix, so the
+    prefix is recovered from the leading segments of the request path.
+    """
+    matched = request.scope.get("route")
+    template = getattr(matched, "path", None)
+    if not template:
+        return "unmatched"
+    template_segments = template.strip("/").split("/") if template.strip("/") else []
+    path_segments = request.url.path.strip("/").split("/") if request.url.path.strip("/") else []
+    prefix_segments = path_segments[:max(0, len(path_segments) - len(template_segments))]
+    prefix = "/" + "/".join(prefix_segments) if prefix_segments else ""
+    return prefix + template
+
+# Stop the pipeline routes' work when their client goes away (added last so it wraps everything)
+app.add_middleware(
+    CancelOnDisconnectMiddleware,
+    paths=[
+        rf"^{API_PREFIX}/news/summarize",
+        rf"^{API_PREFIX}/users/[^/]+/summaries$",
+        rf"^{API_PREFIX}/user_news_summary/",
+    ]
+)
+
+# Profile requests that ask for it with the admin token (outermost, so the whole request is sampled)
+app.add_middleware(ProfileRequestMiddleware)
+
 # Include our router
-app.include_router(router, prefix="/api/v1")
+app.include_router(router, prefix=API_PREFIX)
 
 # Root endpoint
 @app.get("/")
 async def root():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -5,62 +5,39 @@ Processes article snippets from SERP API.
 
 import logging
 from ..config import DEFAULT_CONFIG
+from ..utils.metrics import traced
+from .records import ArticleRecord
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+@traced("process")
 async def process_news_results(news_results, max_articles=None):
     """Process the news results using snippets from SERP API
     
     Args:
-        news_results (list): List of news results from SERP API
+        news_results (list): ArticleRecords from search_news (raw SERP result dicts are converted)
         max_articles (int, optional): Maximum number of articles to process.
             
     Returns:
-        list: List of processed articles
+        list: List of ArticleRecords
     """
     max_articles = max_articles or DEFAULT_CONFIG["max_articles"]
-    processed_articles = []
     
     if not news_results:
         logger.warning("No news results to process.")
-        return processed_articles
+        return []
     
     articles_to_process = news_results[:max_articles]
-    logger.info(f"Processing {len(articles_to_process)} articles...")
+    logger.info("Processing %s articles...", len(articles_to_process))
     
+    processed_articles = []
     for article in articles_to_process:
-        # Log raw article data to debug
-        logger.info(f"Raw article data: {article}")
-        
-        # Extract content - prioritize full_content if available
-        content = None
-        if "full_content" in article:
-            content = article["full_content"]
-            logger.info(f"Using full content for article: {article.get('title', 'Untitled')}")
-        else:
-            # Extract snippet - SERP API returns it as 'snippet' or 'description'
-            content = article.get("snippet") or article.get("description")
-        
-        # If we still don't have content, use a placeholder
-        if not content:
-            content = "No content available"
-            
-        # Create a summary snippet (shorter version of content)
-        snippet = content[:200] + "..." if len(content) > 200 else content
-        
-        article_info = {
-            "title": article.get("title", "Untitled"),
-            "source": article.get("source", "Unknown Source"),
-            "content": content,
-            "snippet": snippet
-        }
-        processed_articles.append(article_info)
-        
-        # Log processed article (truncate content for logging)
-        log_info = article_info.copy()
-        if len(log_info["content"]) > 100:
-            log_info["content"] = log_info["content"][:100] + "..."
-        logger.info(f"Processed article: {log_info}")
+        record = ArticleRecord.coerce(article)
+        if not record.has_full_content:
+            logger.debug("No full content for article, using snippet: %s", record.title)
+        # Records truncate their content in repr, and only when the record is emitted
+        logger.debug("Processed article: %r", record)
+        processed_articles.append(record)
     
-    return processed_articles 
\ No newline at end of file
+    return processed_articles
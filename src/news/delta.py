@@ -0,0 +1,113 @@
+"""
+Delta digests for the Newsaroo application.
+Remembers which articles each user has been sent per topic so repeat requests
+only summarize what is new, and skip the LLM entirely when nothing is.
+"""
+
+import hashlib
+import logging
+import re
+from ..config import DELTA_CONFIG
+from ..utils.metrics import DELTA_DIGESTS, span
+from .search import search_news
+from .content import process_news_results
+from .summary import summarize_with_llm
+from .topics import canonical_topic
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+NO_NEW_DEVELOPMENTS = "no_new_developments"
+NEW_DEVELOPMENTS = "new"
+
+
+def content_hash(article):
+    """Hash of an article's text, insensitive to case and whitespace
+
+    Catches the same story syndicated under different links.
+
+    Args:
+        article (ArticleRecord): Processed article
+
+    Returns:
+        str: Hex digest
+    """
+    text = re.sub(r"\s+", " ", f"{article.title} {article.content}").strip().lower()
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def select_new_articles(articles, seen):
+    """Articles whose link and content the user has not been sent before
+
+    Args:
+        articles (list): Processed ArticleRecords
+        seen (dict): Link -> content hash of articles already sent
+
+    Returns:
+        list: (article, content hash) pairs, duplicates within the batch removed
+    """
+    seen_hashes = set(seen.values())
+    fresh = []
+    for article in articles:
+        digest = content_hash(article)
+        if article.link in seen or digest in seen_hashes:
+            continue
+        seen_hashes.add(digest)
+        fresh.append((article, digest))
+    return fresh
+
+
+def remember(seen, fresh, limit):
+    """Add newly sent articles to the seen map, keeping the most recent `limit` entries"""
+    updated = dict(seen)
+    for article, digest in fresh:
+        # Articles without a link are still remembered by content
+        updated[article.link or f"hash:{digest}"] = digest
+    if len(updated) > limit:
+        updated = dict(list(updated.items())[-limit:])
+    return updated
+
+
+async def delta_digest(supabase, mobile_number, topic, time_period=None):
+    """Summarize only the news on a topic that a user has not been sent yet
+
+    Args:
+        supabase (SupabaseManager): Holds the per user and topic digest state
+        mobile_number (str): User's mobile number
+        topic (str): Topic of interest
+        time_period (str, optional): Search window
+
+    Returns:
+        dict: topic, summary and status. The status is "new" when new articles were summarized,
+            or "no_new_developments" with the previous digest as summary.
+            None if nothing was found for a topic never summarized before.
+    """
+    with span("delta", topic=topic) as delta_span:
+        # State is shared by every spelling of the topic
+        state = await supabase.get_digest_state(mobile_number, canonical_topic(topic)) or {}
+        seen = state.get("seen_articles") or {}
+        last_summary = state.get("last_summary") or ""
+
+        # Seen links are dropped before their content is fetched
+        news_results = await search_news(topic, time_period=time_period, skip_urls=seen)
+        processed = await process_news_results(news_results) if news_results else []
+        fresh = select_new_articles(processed, seen)
+        delta_span.set(new_articles=len(fresh), seen=len(seen))
+
+        if not fresh:
+            if not state:
+                return None
+            DELTA_DIGESTS.inc(outcome="unchanged")
+            logger.info("No new articles on '%s' for %s, skipping summarization", topic, mobile_number)
+            return {"topic": topic, "summary": last_summary, "status": NO_NEW_DEVELOPMENTS}
+
+        summary = await summarize_with_llm([article for article, _ in fresh], topic)
+        if summary.startswith("Error:"):
+            # Leave the state alone so these articles are retried next time
+            return {"topic": topic, "summary": summary, "status": NEW_DEVELOPMENTS}
+
+        DELTA_DIGESTS.inc(outcome="new")
+        await supabase.save_digest_state(
+            mobile_number, canonical_topic(topic), remember(seen, fresh, DELTA_CONFIG["max_seen"]), summary
+        )
+        return {"topic": topic, "summary": summary, "status": NEW_DEVELOPMENTS}
@@ -0,0 +1,80 @@
+"""
+Extractive summaries for the Newsaroo application.
+Builds a "Top 3" digest from article titles and their most relevant
+sentences without any model call, used when the LLM cannot answer in time.
+"""
+
+import re
+from .records import NO_CONTENT, ArticleRecord
+from .topics import canonical_topic
+
+_SENTENCES = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'])")
+_WORDS = re.compile(r"\w+")
+
+# Sentences shorter than this are usually captions, bylines or navigation
+MIN_SENTENCE_CHARS = 40
+MAX_SENTENCE_CHARS = 280
+
+
+def _words(text):
+    return set(_WORDS.findall(text.casefold()))
+
+
+def key_sentence(text, title, topic_words):
+    """The sentence of text that best explains the article
+
+    Sentences are scored by the topic and title words they contain, with a
+    preference for earlier sentences (news leads carry the key facts).
+
+    Args:
+        text (str): Article text
+        title (str): Article headline
+        topic_words (set): Words of the topic
+
+    Returns:
+        str: The sentence, shortened to MAX_SENTENCE_CHARS, or "" if none qualifies
+    """
+    title_words = _words(title)
+    best, best_score = "", 0.0
+    for position, sentence in enumerate(_SENTENCES.split(text)):
+        sentence = " ".join(sentence.split())
+        if len(sentence) < MIN_SENTENCE_CHARS or sentence.casefold() == title.casefold():
+            continue
+        words = _words(sentence)
+        score = 2 * len(words & topic_words) + len(words & title_words) + 1 / (1 + position)
+        if score > best_score:
+            best, best_score = sentence, score
+    if len(best) > MAX_SENTENCE_CHARS:
+        best = best[:MAX_SENTENCE_CHARS].rsplit(" ", 1)[0] + "..."
+    return best
+
+
+def extractive_summary(articles, topic, items=3):
+    """Top items for a topic from the articles themselves
+
+    Takes the highest-ranked articles with distinct headlines, in search
+    order, and pairs each headline with its key sentence.
+
+    Args:
+        articles (list): ArticleRecords (or article dicts), best first
+        topic (str): The search topic
+        items (int): Number of items
+
+    Returns:
+        str: A numbered list in the same shape as the LLM summaries
+    """
+    topic_words = _words(canonical_topic(topic))
+    lines, seen = [], set()
+    for article in articles:
+        article = ArticleRecord.coerce(article)
+        title_key = " ".join(sorted(_words(article.title)))
+        if title_key in seen:
+            continue
+        seen.add(title_key)
+        content = article.content if article.content != NO_CONTENT else ""
+        sentence = key_sentence(content, article.title, topic_words)
+        line = f"{len(lines) + 1}. {article.title} ({article.source})"
+        lines.append(f"{line}\n   {sentence}" if sentence else line)
+        if len(lines) == items:
+            break
+    return "\n".join(lines)
@@ -0,0 +1,241 @@
+"""
+RSS/Atom feed ingestion for the Newsaroo application.
+Polls a configured list of feeds into a local full-text index and answers
+topic queries from it without any remote call.
+"""
+
+import asyncio
+import html
+import logging
+import re
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from ..config import FEEDS_CONFIG
+from ..db.article_store import ArticleStore
+from .records import ArticleRecord
+from .sources import SourceProvider
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+
+
+def _local(tag):
+    # "{http://www.w3.org/2005/Atom}entry" -> "entry"
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child(element, *names):
+    for child in element:
+        if _local(child.tag) in names:
+            return child
+    return None
+
+
+def _text(element, *names):
+    child = _child(element, *names)
+    return (child.text or "").strip() if child is not None else ""
+
+
+def _plain(markup):
+    """Feed descriptions are often HTML: reduce them to plain text"""
+    return _SPACES.sub(" ", html.unescape(_TAGS.sub(" ", markup))).strip()
+
+
+def _timestamp(value):
+    """Parse an RFC 822 (RSS) or ISO 8601 (Atom) date into a Unix timestamp"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _entry_link(entry):
+    link = _child(entry, "link")
+    if link is None:
+        return ""
+    if link.get("href"):
+        # Atom: prefer the alternate (article) link
+        for candidate in entry:
+            if _local(candidate.tag) == "link" and candidate.get("rel", "alternate") == "alternate":
+                return candidate.get("href", "").strip()
+        return link.get("href").strip()
+    return (link.text or "").strip()
+
+
+def parse_feed(data, feed_url):
+    """Parse an RSS 2.0, RSS 1.0 (RDF) or Atom document
+
+    Args:
+        data (bytes): Feed document
+        feed_url (str): Where it came from, used as the source name if the feed has no title
+
+    Returns:
+        list: Entries as dicts with title, link, summary, source, published and published_at
+    """
+    root = ET.fromstring(data)
+    channel = _child(root, "channel")
+    source = _text(channel if channel is not None else root, "title") or urlparse(feed_url).netloc or feed_url
+    entries = []
+    for element in root.iter():
+        if _local(element.tag) not in ("item", "entry"):
+            continue
+        link = _entry_link(element)
+        title = _plain(_text(element, "title"))
+        if not link or not title:
+            continue
+        published = _text(element, "pubDate", "published", "updated", "date")
+        entries.append({
+            "title": title,
+            "link": link,
+            "summary": _plain(_text(element, "description", "summary", "content", "encoded")),
+            "source": source,
+            "published": published,
+            "published_at": _timestamp(published),
+        })
+    return entries
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class FeedPoller:
+    """Polls feeds on a schedule and indexes their entries
+
+    HTTP feeds are fetched with conditional requests, so unchanged feeds cost a
+    304. Local files (a path or file:// URL) are read directly, which is how
+    feeds are served in tests and offline runs.
+
+    Args:
+        urls (list): Feed URLs or file paths
+        index (ArticleStore): Where entries are indexed
+        interval (float): Seconds between polls
+    """
+
+    def __init__(self, urls, index, interval):
+        self.urls = list(urls)
+        self.index = index
+        self.interval = interval
+        self._validators = {}
+
+    async def poll_once(self):
+        """Poll every feed once
+
+        Returns:
+            int: Entries indexed
+        """
+        counts = await asyncio.gather(*(self._poll(url) for url in self.urls))
+        return sum(counts)
+
+    async def run(self):
+        """Poll forever (until cancelled)"""
+        while True:
+            start = time.perf_counter()
+            indexed = await self.poll_once()
+            logger.info("Polled %s feeds, %s entries indexed in %.0f ms",
+                        len(self.urls), indexed, (time.perf_counter() - start) * 1000)
+            await asyncio.sleep(self.interval)
+
+    async def _poll(self, url):
+        try:
+            data = await self._read(url)
+            if data is None:
+                return 0
+            loop = asyncio.get_running_loop()
+            entries = await loop.run_in_executor(None, parse_feed, data, url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Failed to poll feed %s: %s", url, e)
+            return 0
+        for entry in entries:
+            await self.index.put(
+                entry["link"], entry["summary"] or entry["title"],
+                title=entry["title"], source=entry["source"],
+                published=entry["published"], published_at=entry["published_at"]
+            )
+        return len(entries)
+
+    async def _read(self, url):
+        """Feed document, or None if it has not changed since the last poll"""
+        scheme = urlparse(url).scheme
+        if scheme not in ("http", "https"):
+            path = urlparse(url).path if scheme == "file" else url
+            return await asyncio.get_running_loop().run_in_executor(None, _read_file, path)
+
+        import httpx
+        headers = {}
+        etag, last_modified = self._validators.get(url, (None, None))
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url, headers=headers, timeout=FEEDS_CONFIG["timeout"], follow_redirects=True)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self._validators[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response.content
+
+
+class FeedProvider(SourceProvider):
+    """Answers topic queries from the local feed index (no remote call)"""
+
+    name = "feeds"
+    local = True
+
+    def __init__(self, index=None):
+        self.index = index or get_feed_index()
+
+    async def search(self, query, time_period, limit):
+        days = int(time_period.rstrip("d")) if time_period and time_period.rstrip("d").isdigit() else 1
+        rows = await self.index.search(query, limit, since=time.time() - days * 86400, with_content=True)
+        return [
+            ArticleRecord(
+                row["title"], link=row["url"], source=row["source"], date=row["published"], snippet=row["content"]
+            )
+            for row in rows
+        ]
+
+
+_index = None
+
+
+def get_feed_index():
+    """Get the process-wide feed index"""
+    global _index
+    if _index is None:
+        _index = ArticleStore(
+            FEEDS_CONFIG["index_path"],
+            retention_days=FEEDS_CONFIG["retention_days"],
+            max_articles=FEEDS_CONFIG["max_entries"]
+        )
+    return _index
+
+
+def start_feed_poller():
+    """Start polling the configured feeds in the background
+
+    Returns:
+        asyncio.Task: The polling task, or None when no feeds are configured
+    """
+    if not FEEDS_CONFIG["urls"]:
+        return None
+    poller = FeedPoller(FEEDS_CONFIG["urls"], get_feed_index(), FEEDS_CONFIG["poll_interval"])
+    return asyncio.create_task(poller.run())
@@ -0,0 +1,205 @@
+"""
+Per-domain fetch scheduling for article pages.
+Tracks latency and failures for each publisher host to pick a timeout from
+the host's observed p95, limit concurrent connections per host, and open a
+circuit breaker for hosts that keep failing so their snippets are used
+without waiting. Statistics are persisted to a JSON file across restarts.
+"""
+
+import asyncio
+import atexit
+import collections
+import json
+import logging
+import math
+import os
+import time
+from ..config import FETCH_CONFIG
+from ..utils.metrics import FETCH_CIRCUIT_OPEN, FETCH_SKIPPED
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class DomainStats:
+    """Rolling latency window and circuit breaker state for one host"""
+
+    __slots__ = ("latencies", "requests", "failures", "consecutive_failures", "opened_at", "probing")
+
+    def __init__(self, window):
+        self.latencies = collections.deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.opened_at = None  # Wall-clock time the breaker opened, None when closed
+        self.probing = False
+
+    def p95(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def to_dict(self):
+        return {
+            "latencies": list(self.latencies),
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_at": self.opened_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data, window):
+        stats = cls(window)
+        stats.latencies.extend(data.get("latencies", []))
+        stats.requests = data.get("requests", 0)
+        stats.failures = data.get("failures", 0)
+        stats.consecutive_failures = data.get("consecutive_failures", 0)
+        stats.opened_at = data.get("opened_at")
+        return stats
+
+
+class FetchScheduler:
+    """Adaptive timeouts, per-host connection limits and circuit breaking for page fetches
+
+    Args:
+        stats_path (str, optional): JSON file the statistics are loaded from and saved to.
+            Empty or None keeps them in memory only.
+    """
+
+    def __init__(self, stats_path=None):
+        self.stats_path = stats_path
+        self._domains = {}
+        self._semaphores = {}
+        self._last_save = time.monotonic()
+        self._saving = False
+        if stats_path:
+            self.load()
+
+    def stats(self, domain):
+        stats = self._domains.get(domain)
+        if stats is None:
+            stats = self._domains[domain] = DomainStats(FETCH_CONFIG["window"])
+        return stats
+
+    def timeout_for(self, domain):
+        """Timeout for the next fetch from domain: its p95 with headroom, within the configured bounds"""
+        stats = self._domains.get(domain)
+        if stats is None or len(stats.latencies) < FETCH_CONFIG["min_samples"]:
+            return FETCH_CONFIG["default_timeout"]
+        timeout = stats.p95() * FETCH_CONFIG["timeout_multiplier"]
+        return min(FETCH_CONFIG["max_timeout"], max(FETCH_CONFIG["min_timeout"], timeout))
+
+    def allow(self, domain):
+        """Whether a fetch from domain should be attempted
+
+        An open breaker rejects fetches until open_seconds have passed, then
+        lets a single probe through; its outcome closes or re-opens the breaker.
+        """
+        stats = self._domains.get(domain)
+        if stats is None or stats.opened_at is None:
+            return True
+        if stats.probing or time.time() - stats.opened_at < FETCH_CONFIG["open_seconds"]:
+            FETCH_SKIPPED.inc(domain=domain, reason="circuit_open")
+            return False
+        stats.probing = True
+        return True
+
+    def slot(self, domain):
+        """Semaphore bounding concurrent connections to domain"""
+        semaphore = self._semaphores.get(domain)
+        if semaphore is None:
+            semaphore = self._semaphores[domain] = asyncio.Semaphore(FETCH_CONFIG["max_per_host"])
+        return semaphore
+
+    def record(self, domain, latency, ok):
+        """Record the outcome of a fetch
+
+        Args:
+            domain (str): Publisher host
+            latency (float): Seconds until the response (or failure)
+            ok (bool): Whether the host answered usefully; timeouts, connection
+                errors, 429 and 5xx responses count as failures
+        """
+        stats = self.stats(domain)
+        stats.requests += 1
+        stats.probing = False
+        if ok:
+            stats.latencies.append(latency)
+            stats.consecutive_failures = 0
+            if stats.opened_at is not None:
+                logger.info("Circuit closed for %s", domain)
+                stats.opened_at = None
+                FETCH_CIRCUIT_OPEN.set(0, domain=domain)
+        else:
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.opened_at is not None or stats.consecutive_failures >= FETCH_CONFIG["failure_threshold"]:
+                if stats.opened_at is None:
+                    logger.warning("Circuit opened for %s after %s consecutive failures",
+                                   domain, stats.consecutive_failures)
+                stats.opened_at = time.time()
+                FETCH_CIRCUIT_OPEN.set(1, domain=domain)
+        self._maybe_save()
+
+    def load(self):
+        """Load persisted statistics, ignoring a missing or unreadable file"""
+        try:
+            with open(self.stats_path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load fetch statistics from %s: %s", self.stats_path, e)
+            return
+        for domain, entry in data.get("domains", {}).items():
+            stats = self._domains[domain] = DomainStats.from_dict(entry, FETCH_CONFIG["window"])
+            if stats.opened_at is not None:
+                FETCH_CIRCUIT_OPEN.set(1, domain=domain)
+
+    def snapshot(self):
+        return {"domains": {domain: stats.to_dict() for domain, stats in self._domains.items()}}
+
+    def save(self):
+        """Write the statistics to stats_path (atomically, via a temporary file)"""
+        if not self.stats_path:
+            return
+        self._write(self.snapshot())
+
+    def _write(self, snapshot):
+        tmp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.stats_path)
+        except OSError as e:
+            logger.warning("Could not save fetch statistics to %s: %s", self.stats_path, e)
+
+    def _maybe_save(self):
+        # Periodic save on a worker thread so file I/O never blocks the event loop
+        if not self.stats_path or self._saving:
+            return
+        if time.monotonic() - self._last_save < FETCH_CONFIG["save_interval"]:
+            return
+        self._last_save = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        self._saving = True
+        future = loop.run_in_executor(None, self._write, self.snapshot())
+        future.add_done_callback(lambda _: setattr(self, "_saving", False))
+
+
+_scheduler = None
+
+
+def get_fetch_scheduler():
+    """Get the process-wide fetch scheduler, loading persisted statistics on first use"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FetchScheduler(FETCH_CONFIG["stats_path"])
+        atexit.register(_scheduler.save)
+    return _scheduler
@@ -0,0 +1,231 @@
+"""
+LLM model routing for the Newsaroo application.
+Picks the summary model for each request from the prompt size and the
+request's latency target, using each model's observed latency and error
+rate, and falls back to a faster model when the chosen one misses the target.
+"""
+
+import asyncio
+import collections
+import contextvars
+import logging
+import math
+from ..config import LLM_ROUTER_CONFIG
+from ..utils.metrics import LLM_ROUTES, LLM_FALLBACKS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Routing decision of the summary being made in the current request, if collected
+_report = contextvars.ContextVar("llm_route", default=None)
+
+
+class ModelStats:
+    """Recent latencies and outcomes of one model's completions"""
+
+    __slots__ = ("latencies", "outcomes")
+
+    def __init__(self, window):
+        self.latencies = collections.deque(maxlen=window)
+        self.outcomes = collections.deque(maxlen=window)
+
+    def percentile(self, percentile):
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+    def error_rate(self):
+        if len(self.outcomes) < LLM_ROUTER_CONFIG["min_samples"]:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class Route:
+    """The model chosen for a summary and why
+
+    Args:
+        model (str): Model name
+        reason (str): Why it was chosen: requested, preferred, prompt_size, error_rate,
+            latency_target, fastest, fallback_deadline or fallback_error
+        fallback (str, optional): Faster model to race against it if it misses the latency target
+    """
+
+    __slots__ = ("model", "reason", "fallback")
+
+    def __init__(self, model, reason, fallback=None):
+        self.model = model
+        self.reason = reason
+        self.fallback = fallback
+
+    def metadata(self):
+        return {"model": self.model, "model_reason": self.reason}
+
+
+def estimate_tokens(messages):
+    """Rough prompt size in tokens (about four characters per token)"""
+    return sum(len(message.get("content") or "") for message in messages) // 4
+
+
+class ModelRouter:
+    """Chooses summary models and tracks how each one performs
+
+    Args:
+        models (list): Model names, preferred first
+    """
+
+    def __init__(self, models):
+        self.models = list(models)
+        self._stats = {}
+
+    def stats(self, model):
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats(LLM_ROUTER_CONFIG["window"])
+        return stats
+
+    def estimate(self, model):
+        """Expected seconds per completion: the observed percentile, else the configured guess (or None)"""
+        stats = self._stats.get(model)
+        if stats is not None and len(stats.latencies) >= LLM_ROUTER_CONFIG["min_samples"]:
+            return stats.percentile(LLM_ROUTER_CONFIG["percentile"])
+        return LLM_ROUTER_CONFIG["expected_latency"].get(model)
+
+    def record(self, model, latency, ok=None):
+        """Record a completion
+
+        Args:
+            model (str): Model used
+            latency (float): Seconds the call took (or ran before it was abandoned)
+            ok (bool, optional): Whether it succeeded; None for calls abandoned before finishing
+        """
+        stats = self.stats(model)
+        if ok is not False:
+            stats.latencies.append(latency)
+        if ok is not None:
+            stats.outcomes.append(ok)
+
+    def choose(self, prompt_tokens, max_tokens, latency_target=None):
+        """Pick the model for a summary
+
+        Args:
+            prompt_tokens (int): Estimated prompt size
+            max_tokens (int): Completion token limit
+            latency_target (float, optional): Seconds the caller is willing to wait
+
+        Returns:
+            Route: The model, the reason and, with a target, a fallback model
+        """
+        windows = LLM_ROUTER_CONFIG["context_tokens"]
+        fits = [model for model in self.models if prompt_tokens + max_tokens <= windows.get(model, math.inf)]
+        if not fits:
+            # Nothing fits: the largest context truncates least
+            model = max(self.models, key=lambda name: windows.get(name, math.inf))
+            return self._chosen(Route(model, "prompt_size"))
+        reason = "preferred" if fits[0] == self.models[0] else "prompt_size"
+
+        # Skip models that keep failing, unless every candidate does
+        candidates = [model for model in fits if self.stats(model).error_rate() <= LLM_ROUTER_CONFIG["max_error_rate"]]
+        if not candidates:
+            candidates = fits
+        elif candidates[0] != fits[0]:
+            reason = "error_rate"
+
+        if not latency_target:
+            return self._chosen(Route(candidates[0], reason))
+
+        # Untried models without a configured guess are given the benefit of the doubt
+        fast = [model for model in candidates if (self.estimate(model) or 0) <= latency_target]
+        if fast:
+            model = fast[0]
+            if model != candidates[0]:
+                reason = "latency_target"
+        else:
+            model = min(candidates, key=lambda name: self.estimate(name) or math.inf)
+            reason = "fastest"
+
+        fallback = None
+        if LLM_ROUTER_CONFIG["fallback"]:
+            expected = self.estimate(model) or math.inf
+            faster = [name for name in candidates if name != model and (self.estimate(name) or math.inf) < expected]
+            fallback = min(faster, key=self.estimate) if faster else None
+        return self._chosen(Route(model, reason, fallback))
+
+    def _chosen(self, route):
+        LLM_ROUTES.inc(model=route.model, reason=route.reason)
+        return route
+
+    async def run(self, route, call, latency_target=None):
+        """Run call with the route's model, cascading to its fallback if needed
+
+        The fallback starts when the primary misses the latency target (the
+        primary keeps running and whichever succeeds first is used) or fails.
+
+        Args:
+            route (Route): From choose()
+            call (callable): Takes a model name, returns an awaitable completion
+            latency_target (float, optional): Seconds before the fallback starts
+
+        Returns:
+            tuple: (result, Route actually used)
+        """
+        if route.fallback is None or not latency_target:
+            return await call(route.model), route
+
+        primary = asyncio.ensure_future(call(route.model))
+        attempts = [primary]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=latency_target)
+            if done and primary.exception() is None:
+                return primary.result(), route
+            if done:
+                cause = "error"
+                logger.warning("Model %s failed (%s), falling back to %s", route.model, primary.exception(), route.fallback)
+            else:
+                cause = "deadline"
+                logger.info("Model %s missed the %.1fs latency target, falling back to %s",
+                            route.model, latency_target, route.fallback)
+            LLM_FALLBACKS.inc(primary=route.model, fallback=route.fallback, cause=cause)
+            fallback = asyncio.ensure_future(call(route.fallback))
+            attempts.append(fallback)
+
+            pending = {attempt for attempt in attempts if not attempt.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in sorted(done, key=attempts.index):
+                    if attempt.exception() is None:
+                        if attempt is primary:
+                            return attempt.result(), route
+                        return attempt.result(), Route(route.fallback, f"fallback_{cause}")
+            raise primary.exception()
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+
+_router = None
+
+
+def get_model_router():
+    """Get the process-wide model router"""
+    global _router
+    if _router is None:
+        _router = ModelRouter(LLM_ROUTER_CONFIG["models"])
+    return _router
+
+
+def track_route():
+    """Collect the routing decision of the summary made in the current request
+
+    Returns:
+        dict: Filled with model and model_reason once the summary is made
+    """
+    report = {}
+    _report.set(report)
+    return report
+
+
+def report_route(route):
+    """Record route as the current request's routing decision, if one is being collected"""
+    report = _report.get()
+    if report is not None:
+        report.update(route.metadata())
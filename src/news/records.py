@@ -0,0 +1,93 @@
+"""
+Article records for the Newsaroo application.
+One compact object per article carries it through search, processing,
+summarization and the API responses instead of copies of SERP dicts.
+"""
+
+import sys
+
+NO_CONTENT = "No content available"
+PREVIEW_LENGTH = 200
+
+
+def _source_fields(source):
+    """Normalize a SERP `source` (a dict, a plain name or missing) once
+
+    Returns:
+        tuple: (interned source name, details dict or None)
+    """
+    if isinstance(source, dict):
+        name = source.get("name") or "Unknown Source"
+        # Keep the publisher details only when there is more than the name
+        details = source if len(source) > 1 or "name" not in source else None
+    else:
+        name = str(source) if source else "Unknown Source"
+        details = None
+    # Thousands of articles share a few hundred publishers
+    return sys.intern(name), details
+
+
+class ArticleRecord:
+    """A news article as it moves through the pipeline
+
+    The body is resolved when it is read: the fetched full text if there is
+    one, else the search snippet. The preview shown in API responses is
+    derived on access rather than stored.
+
+    Args:
+        title (str): Headline
+        link (str, optional): Article URL
+        source (str or dict, optional): Publisher name or SERP source object
+        date (str, optional): Publish date as reported by the search engine
+        snippet (str, optional): Search result snippet
+        full_content (str, optional): Extracted page text
+    """
+
+    __slots__ = ("title", "link", "source", "source_details", "date", "snippet", "full_content")
+
+    def __init__(self, title, link=None, source=None, date=None, snippet=None, full_content=None):
+        self.title = title or "Untitled"
+        self.link = link
+        self.source, self.source_details = _source_fields(source)
+        self.date = date
+        self.snippet = snippet
+        self.full_content = full_content
+
+    @classmethod
+    def from_serp(cls, result):
+        """Build a record from one SerpAPI news result (or an already processed article dict)"""
+        return cls(
+            title=result.get("title"),
+            link=result.get("link"),
+            source=result.get("source"),
+            date=result.get("date"),
+            snippet=result.get("snippet") or result.get("description"),
+            full_content=result.get("full_content") or result.get("content"),
+        )
+
+    @classmethod
+    def coerce(cls, article):
+        """Return article as a record, converting a dict if needed"""
+        return article if isinstance(article, cls) else cls.from_serp(article)
+
+    @property
+    def has_full_content(self):
+        return bool(self.full_content)
+
+    @property
+    def content(self):
+        """Text to summarize: full page text if fetched, else the snippet"""
+        return self.full_content or self.snippet or NO_CONTENT
+
+    @property
+    def preview(self):
+        """Short excerpt of the content for display"""
+        content = self.content
+        return content[:PREVIEW_LENGTH] + "..." if len(content) > PREVIEW_LENGTH else content
+
+    def __repr__(self):
+        # Only built when a debug record is actually emitted
+        content = self.content
+        if len(content) > 100:
+            content = content[:100] + "..."
+        return f"ArticleRecord(title={self.title!r}, source={self.source!r}, link={self.link!r}, content={content!r})"
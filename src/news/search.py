@@ -1,129 +1,443 @@
 """
 News search module for the Newsaroo application.
-Handles searching for news articles using SerpAPI.
+Handles searching for news articles using SerpAPI and the other configured sources.
 """
 
 import logging
-from serpapi.google_search import GoogleSearch
-from ..config import SERPAPI_KEY, DEFAULT_CONFIG
+from ..config import SERPAPI_KEY, SERPAPI_BASE_URL, DEFAULT_CONFIG, SERP_CONFIG, MEMORY_CONFIG
 import asyncio
-import httpx
+import contextvars
+import itertools
+import json
+import math
 import re
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse
+from ..utils.cache import cached
+from ..db.article_store import get_article_store
+from .fetch_scheduler import get_fetch_scheduler
+from .topics import canonical_topic
+from .records import ArticleRecord
+from .serp_keys import QuotaExhausted, SerpRateLimited, get_key_pool
+from .sources import SourceProvider, get_providers, merge_results, search_sources
+from ..utils.hedging import HedgePolicy
+from ..utils.memory_budget import reserve_memory
+from ..utils.metrics import span, traced, record_cache_lookup, FETCH_DURATION
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-async def fetch_article_content(url, timeout=10):
+SERP_HEDGE = HedgePolicy("serpapi")
+
+# Fetch pool shared by the topics of one batch request, if any
+_fetch_pool = contextvars.ContextVar("fetch_pool", default=None)
+
+class FetchPool:
+    """Page fetches shared by several searches, e.g. the topics of one batch
+    
+    Each URL is fetched once however many searches return it, and at most
+    max_concurrent fetches run at a time. Install it with use_fetch_pool()
+    before starting the searches.
+    
+    Args:
+        max_concurrent (int): Maximum concurrent page fetches
+    """
+    
+    def __init__(self, max_concurrent):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._fetches = {}
+        self.duplicates = 0
+    
+    async def fetch(self, url, timeout=None, article=None):
+        fetch = self._fetches.get(url)
+        if fetch is None:
+            fetch = self._fetches[url] = asyncio.ensure_future(self._fetch(url, timeout, article))
+        else:
+            self.duplicates += 1
+        # Shield so a cancelled search does not abort a fetch another search shares
+        return await asyncio.shield(fetch)
+    
+    async def _fetch(self, url, timeout, article):
+        async with self._semaphore:
+            return await _load_article(url, timeout, article)
+    
+    def close(self):
+        """Cancel fetches nobody is waiting for any more"""
+        for fetch in self._fetches.values():
+            if not fetch.done():
+                fetch.cancel()
+
+def use_fetch_pool(pool):
+    """Route page fetches in the current context (and tasks started from it) through pool"""
+    return _fetch_pool.set(pool)
+
+async def fetch_article_content(url, timeout=None, article=None):
     """Fetch article content from URL
     
     Args:
         url (str): URL of the article
-        timeout (int): Timeout in seconds
+        timeout (float, optional): Timeout in seconds. Defaults to one derived
+            from the publisher's observed latency.
+        article (ArticleRecord, optional): The article the URL belongs to; its title,
+            source and date are kept with the text in the article store
         
     Returns:
-        str: Article content or None if failed
+        str: Article content or None if failed (or the publisher is being skipped)
+    """
+    pool = _fetch_pool.get()
+    if pool is not None:
+        return await pool.fetch(url, timeout, article)
+    return await _load_article(url, timeout, article)
+
+async def _load_article(url, timeout, article):
+    """Read article text from the local article store, fetching and storing it on a miss
+    
+    article is the ArticleRecord the URL belongs to, if any.
+    """
+    store = get_article_store()
+    if store is not None:
+        stored = await store.get(url)
+        record_cache_lookup("article_store", stored is not None)
+        if stored is not None:
+            return stored["content"]
+    content = await cached("article", url, lambda: _fetch_page(url, timeout))
+    if content and store is not None:
+        if article is None:
+            await store.put(url, content)
+        else:
+            await store.put(url, content, title=article.title, source=article.source, published=article.date)
+    return content
+
+async def _fetch_page(url, timeout):
+    """Fetch and extract a page through the per-domain scheduler, timing the request per publisher domain"""
+    domain = urlparse(url).netloc or "unknown"
+    scheduler = get_fetch_scheduler()
+    if not scheduler.allow(domain):
+        logger.debug("Skipping %s: circuit open", url)
+        return None
+    async with scheduler.slot(domain):
+        timeout = timeout or scheduler.timeout_for(domain)
+        with span("fetch.page", kind="outbound", domain=domain, timeout=round(timeout, 3)) as fetch_span:
+            content = await _fetch_and_extract(url, timeout, fetch_span)
+    status = fetch_span.attrs.get("status")
+    # Time waiting for the memory budget says nothing about the publisher
+    latency = fetch_span.duration - fetch_span.attrs.get("budget_wait", 0)
+    scheduler.record(domain, latency, ok=status is not None and status != 429 and status < 500)
+    FETCH_DURATION.observe(latency, domain=domain)
+    return content
+
+_page_ssl_context = None
+
+def _ssl_context():
+    """SSL context shared by page fetches
+    
+    A client with its own context loads the CA bundle again, about 800 KB a
+    fetch, and every page being fetched at once holds one.
+    """
+    global _page_ssl_context
+    if _page_ssl_context is None:
+        import httpx
+        _page_ssl_context = httpx.create_ssl_context()
+    return _page_ssl_context
+
+async def _fetch_and_extract(url, timeout, fetch_span):
+    """Download a page and extract its readable text, recording failures on the span
+    
+    The page's bytes, and the parse tree built from them, are reserved from the
+    memory budget once the response headers arrive and released when the text
+    has been extracted. Time spent waiting for the budget is set on the span
+    as budget_wait.
     """
+    # Imported on first use to keep startup fast
+    import httpx
+    
+    max_bytes = MEMORY_CONFIG["max_page_bytes"]
+    per_byte = 1 + MEMORY_CONFIG["parse_factor"]
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=timeout, follow_redirects=True)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.extract()
-                
-                # Get text and clean it
-                text = soup.get_text(separator=' ', strip=True)
-                
-                # Clean up whitespace
-                text = re.sub(r'\s+', ' ', text).strip()
-                
-                # Truncate if too long
-                if len(text) > 3000:
-                    text = text[:3000] + "..."
-                
-                return text
-            else:
-                logger.warning(f"Failed to fetch article content: {response.status_code}")
-                return None
+        async with httpx.AsyncClient(verify=_ssl_context()) as client:
+            async with client.stream("GET", url, timeout=timeout, follow_redirects=True) as response:
+                fetch_span.set(status=response.status_code)
+                if response.status_code != 200:
+                    fetch_span.error = f"HTTP {response.status_code}"
+                    logger.warning("Failed to fetch article content: %s", response.status_code)
+                    return None
+                # A compressed body's length says little about the decoded size
+                length = response.headers.get("content-length", "")
+                if length.isdigit() and response.headers.get("content-encoding", "identity") == "identity":
+                    expected = min(int(length), max_bytes)
+                else:
+                    expected = max_bytes
+                async with reserve_memory(expected * per_byte, "fetch") as reservation:
+                    fetch_span.set(budget_wait=round(reservation.waited, 4))
+                    body = await _read_body(response, max_bytes)
+                    reservation.shrink(len(body) * per_byte, stage="extract")
+                    html = body.decode(response.charset_encoding or "utf-8", errors="replace")
+                    del body
+                    return _extract_text(html)
     except Exception as e:
-        logger.warning(f"Error fetching article content: {str(e)}")
+        fetch_span.error = type(e).__name__
+        logger.warning("Error fetching article content: %s", e)
         return None
 
-async def search_news(topic, api_key=None, time_period=None):
-    """Search for news on the given topic using SerpAPI
+async def _read_body(response, max_bytes):
+    """Read a streamed response body, keeping at most max_bytes of it"""
+    chunks = []
+    size = 0
+    async for chunk in response.aiter_bytes():
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            logger.debug("Page %s is over %s bytes; extracting the first %s", response.url, max_bytes, max_bytes)
+            break
+    body = b"".join(chunks)
+    return body[:max_bytes] if size > max_bytes else body
+
+def _extract_text(html):
+    """Readable text of an HTML page, at most 3000 characters"""
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+    
+    # Get text and clean it
+    text = soup.get_text(separator=' ', strip=True)
+    
+    # The tree is full of reference cycles: free it now rather than at the next garbage collection.
+    # Decomposing the document itself leaves them in place, its top-level elements do not.
+    for element in soup.contents[:]:
+        element.decompose()
+    
+    # Clean up whitespace
+    text = re.sub(r'\s+', ' ', text).strip()
+    
+    # Truncate if too long
+    if len(text) > 3000:
+        text = text[:3000] + "..."
+    
+    return text
+
+def _serp_cache_key(params):
+    """Cache key for a SerpAPI query (the API key does not affect results)"""
+    return json.dumps({k: v for k, v in params.items() if k != "api_key"}, sort_keys=True)
+
+def _serp_get_dict(params):
+    """Blocking SerpAPI request (the client library is imported on first use)
+    
+    Raises:
+        SerpRateLimited: If SerpAPI answered 429 for the key
+    """
+    from serpapi.google_search import GoogleSearch
+    search = GoogleSearch(params)
+    search.BACKEND = SERPAPI_BASE_URL
+    response = search.get_response()
+    if response.status_code == 429:
+        try:
+            message = response.json().get("error") or "Too many requests"
+        except ValueError:
+            message = "Too many requests"
+        raise SerpRateLimited(message)
+    return json.loads(response.text)
+
+async def _serp_request(params):
+    """One SerpAPI request, run in the executor
+    
+    Searches with a pooled (or no) key take a key from the pool. A key answered
+    with a 429 backs off and the search is retried with another one.
+    """
+    loop = asyncio.get_event_loop()
+    pool = get_key_pool()
+    if pool is None or not pool.manages(params.get("api_key")):
+        return await loop.run_in_executor(None, _serp_get_dict, params)
+    
+    for attempt in range(len(pool)):
+        key = await pool.acquire()
+        try:
+            results = await loop.run_in_executor(None, _serp_get_dict, {**params, "api_key": key.key})
+        except SerpRateLimited as e:
+            pool.release(key, rate_limited=True, out_of_searches=e.out_of_searches)
+            last_error = e
+            continue
+        except Exception:
+            pool.release(key, ok=False)
+            raise
+        pool.release(key, ok="error" not in results)
+        return results
+    raise QuotaExhausted(f"SerpAPI rate limited every key tried: {last_error}")
+
+async def _serp_search(params):
+    """Run a SerpAPI search without blocking the event loop (hedged when enabled)"""
+    with span("serpapi.search", kind="outbound", engine=params["engine"]) as serp_span:
+        results = await SERP_HEDGE.run(lambda: _serp_request(params))
+        if "error" in results:
+            serp_span.error = results["error"]
+        serp_span.set(results=len(results.get("news_results") or []))
+    return results
+
+class SerpApiProvider(SourceProvider):
+    """Google News results through SerpAPI (a paid, rate-limited remote call)
+    
+    Searches wanting more articles than one result page holds fetch the extra
+    pages concurrently, each through its own cache entry.
+    
+    Args:
+        api_key (str, optional): SerpAPI key. Defaults to the one in config.
+    """
+    
+    name = "serpapi"
+    
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+    
+    async def search(self, query, time_period, limit):
+        api_key = self.api_key or SERPAPI_KEY
+        if not api_key:
+            logger.error("No SerpAPI key provided. Cannot search for news.")
+            return []
+        
+        # Configure the search parameters
+        page_size = SERP_CONFIG["page_size"]
+        params = {
+            "engine": "google_news",
+            "q": query,
+            "time": time_period,
+            "num": page_size,
+            "api_key": api_key,
+            "gl": "us",  # Set to US results for better snippets
+            "hl": "en",   # Set language to English
+            "tbm": "nws",  # Search news tab specifically
+            "tbs": f"qdr:{time_period}",  # Time period
+        }
+        
+        # Fetch as many pages as the limit needs at once, then top up (up to max_pages)
+        # if duplicate links left the merged results short
+        found = {}
+        next_page = 0
+        while next_page < SERP_CONFIG["max_pages"]:
+            missing = limit - len(_distinct(found, limit))
+            pages = range(next_page, min(next_page + max(1, math.ceil(missing / page_size)), SERP_CONFIG["max_pages"]))
+            next_page = pages.stop
+            exhausted = await self._fetch_pages(params, pages, found, limit)
+            if exhausted or len(_distinct(found, limit)) >= limit:
+                break
+        records = _distinct(found, limit)
+        if records:
+            # Log first result to debug structure
+            logger.debug("Sample result structure: %s", records[0])
+        return records
+    
+    async def _page(self, params, page):
+        """Records on one result page (page 0 keeps the unpaged cache key)"""
+        if page:
+            params = {**params, "start": page * params["num"]}
+        # Execute the search in a non-blocking way (shared across workers via the cache)
+        results = await cached(
+            "serp",
+            _serp_cache_key(params),
+            lambda: _serp_search(params),
+            cacheable=lambda r: "error" not in r
+        )
+        return [ArticleRecord.from_serp(article) for article in results.get("news_results") or []]
+    
+    async def _fetch_pages(self, params, pages, found, limit):
+        """Fetch result pages concurrently into found (page -> records)
+        
+        Pages still in flight are cancelled once the pages before them hold
+        enough distinct articles, or once an earlier page comes back short
+        (there are no results after it).
+        
+        Returns:
+            bool: True if the results ran out
+        """
+        pending = {asyncio.ensure_future(self._page(params, page)): page for page in pages}
+        end = None
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = pending.pop(task)
+                    try:
+                        found[page] = task.result()
+                    except Exception as e:
+                        if page == 0:
+                            raise
+                        logger.warning("SerpAPI page %s failed for '%s': %s", page + 1, params["q"], e)
+                        found[page] = []
+                    if len(found[page]) < params["num"]:
+                        end = page if end is None else min(end, page)
+                
+                # Pages received so far, in rank order without gaps
+                ranked = {page: found[page] for page in itertools.takewhile(found.__contains__, itertools.count())}
+                if len(_distinct(ranked, limit)) >= limit:
+                    break
+                for task, page in list(pending.items()):
+                    if end is not None and page > end:
+                        task.cancel()
+                        del pending[task]
+        finally:
+            for task in pending:
+                task.cancel()
+        return end is not None
+
+def _distinct(found, limit):
+    """Records from result pages (page -> records) in rank order, without repeated links"""
+    return merge_results([list(itertools.chain.from_iterable(found[page] for page in sorted(found)))], limit)
+
+@traced("search")
+async def search_news(topic, api_key=None, time_period=None, skip_urls=None, providers=None, max_articles=None):
+    """Search for news on the given topic across the configured news sources
     
     Args:
         topic (str): The news topic to search for
         api_key (str, optional): SerpAPI key. Defaults to the one in config.
         time_period (str, optional): Time period for news. Defaults to "1d" for 1 day.
+        skip_urls (collection, optional): Article links to leave out before any content is fetched,
+            e.g. articles a user has already seen
+        providers (list, optional): SourceProviders to query. Defaults to SOURCES_CONFIG["providers"].
+        max_articles (int, optional): Articles the caller will use. Searches never ask for fewer
+            than DEFAULT_CONFIG["max_articles"]; more than that may take several SerpAPI pages.
         
     Returns:
-        list: List of news results
+        list: ArticleRecords, the top ones with their full page text
     """
-    # Use default API key if none provided
-    api_key = api_key or SERPAPI_KEY
-    
     # Use default time period if none provided
     time_period = time_period or DEFAULT_CONFIG["time_period"]
     
-    if not api_key:
-        logger.error("No SerpAPI key provided. Cannot search for news.")
-        return []
-    
     if not topic:
         logger.error("No topic provided for news search.")
         return []
     
-    logger.info(f"Searching for news on '{topic}' from the last {time_period}...")
-    
-    # Configure the search parameters
-    params = {
-        "engine": "google_news",
-        "q": topic,
-        "time": time_period,
-        "num": DEFAULT_CONFIG["max_articles"],
-        "api_key": api_key,
-        "gl": "us",  # Set to US results for better snippets
-        "hl": "en",   # Set language to English
-        "tbm": "nws",  # Search news tab specifically
-        "tbs": f"qdr:{time_period}",  # Time period
-    }
+    # Equivalent spellings of a topic run the same query and share its cache entry
+    query = canonical_topic(topic)
+    logger.info("Searching for news on '%s' from the last %s...", query, time_period)
     
     try:
-        # Execute the search in a non-blocking way
-        search = GoogleSearch(params)
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, search.get_dict)
+        records = await search_sources(
+            query, time_period, max(max_articles or 0, DEFAULT_CONFIG["max_articles"]),
+            providers or get_providers(api_key)
+        )
+        
+        if skip_urls and records:
+            found = len(records)
+            records = [record for record in records if record.link not in skip_urls]
+            logger.info("Skipping %s already seen articles", found - len(records))
         
         # Check if we have news results
-        if "news_results" in results and results["news_results"]:
-            num_results = len(results["news_results"])
-            logger.info(f"Found {num_results} news articles")
-            
-            # Log first result to debug structure
-            if results["news_results"]:
-                logger.info(f"Sample result structure: {results['news_results'][0]}")
+        if records:
+            logger.info("Found %s news articles", len(records))
                 
             # Enhance results with full content for top articles (limit to 5 to avoid rate limiting)
-            enhanced_results = []
-            for article in results["news_results"][:5]:
-                if "link" in article:
-                    # Try to fetch full content
-                    content = await fetch_article_content(article["link"])
-                    if content:
-                        article["full_content"] = content
-                enhanced_results.append(article)
-                
-            # Add remaining articles without fetching content
-            enhanced_results.extend(results["news_results"][5:])
+            with span("search.enrich"):
+                for record in records[:5]:
+                    if record.link:
+                        # Try to fetch full content
+                        record.full_content = await fetch_article_content(record.link, article=record)
             
-            return enhanced_results
+            return records
         else:
-            logger.warning(f"No news results found for topic: {topic}")
+            logger.warning("No news results found for topic: %s", topic)
             return []
     except Exception as e:
-        logger.error(f"Error searching for news: {str(e)}")
-        raise Exception(f"Failed to search news: {str(e)}")  # Propagate error for proper HTTP status 
\ No newline at end of file
+        logger.error("Error searching for news: %s", e)
+        raise Exception(f"Failed to search news: {str(e)}")  # Propagate error for proper HTTP status
@@ -0,0 +1,321 @@
+"""
+SerpAPI key pool for the Newsaroo application.
+Spreads searches over several API keys, each with its own token-bucket rate
+limit and monthly quota, and backs off only the key that was answered with
+a 429. Monthly usage is persisted to a JSON file so quota accounting
+survives restarts.
+"""
+
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import os
+import time
+from ..config import SERP_KEYS_CONFIG
+from ..utils.metrics import SERP_KEY_REQUESTS, SERP_KEY_QUOTA_REMAINING, SERP_KEY_WAIT
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SerpRateLimited(Exception):
+    """SerpAPI answered 429 for a key
+
+    Args:
+        message (str): SerpAPI's error message
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+        # SerpAPI also uses 429 once a plan's monthly searches are used up
+        self.out_of_searches = "run out of searches" in message.lower()
+
+
+class QuotaExhausted(Exception):
+    """No SerpAPI key can take another search: quotas are used up or every key is backing off"""
+
+
+def key_label(key):
+    """Stable, non-secret name for a key, used in metrics, logs and the usage file"""
+    return "key-" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:8]
+
+
+def _period(now=None):
+    # SerpAPI quotas reset monthly
+    return time.strftime("%Y-%m", time.gmtime(now))
+
+
+class KeyState:
+    """Token bucket, quota usage and backoff state for one key"""
+
+    __slots__ = ("key", "label", "quota", "tokens", "refilled_at", "used", "unsaved", "exhausted",
+                 "requests", "rate_limited", "backoff", "blocked_until")
+
+    def __init__(self, key, quota, burst):
+        self.key = key
+        self.label = key_label(key)
+        self.quota = quota  # Searches per month, 0 for no limit
+        self.tokens = float(burst)
+        self.refilled_at = time.monotonic()
+        self.used = 0  # Searches this month, including other processes' as of the last save
+        self.unsaved = 0  # Searches not yet added to the usage file
+        self.exhausted = False  # SerpAPI reported the key out of searches
+        self.requests = 0
+        self.rate_limited = 0
+        self.backoff = 0.0
+        self.blocked_until = 0.0  # Monotonic time the key's backoff ends
+
+    @property
+    def remaining(self):
+        """Searches left this month, or None without a quota"""
+        if self.exhausted:
+            return 0
+        return max(0, self.quota - self.used) if self.quota else None
+
+    def refill(self, now, rate, burst):
+        self.tokens = min(burst, self.tokens + (now - self.refilled_at) * rate)
+        self.refilled_at = now
+
+
+def _parse_entry(entry, default_quota):
+    # "key" or "key:quota"
+    key, _, quota = entry.rpartition(":")
+    if key and quota.isdigit():
+        return key, int(quota)
+    return entry, default_quota
+
+
+class KeyPool:
+    """Hands out SerpAPI keys within their rate limits and quotas
+
+    Args:
+        entries (list): Keys, each optionally suffixed with ":<monthly quota>"
+        usage_path (str, optional): JSON file monthly usage is loaded from and saved to.
+            Empty or None keeps it in memory only.
+    """
+
+    def __init__(self, entries, usage_path=None):
+        self.usage_path = usage_path
+        self.period = _period()
+        self._keys = {}
+        for entry in entries:
+            key, quota = _parse_entry(entry, SERP_KEYS_CONFIG["monthly_quota"])
+            self._keys[key] = KeyState(key, quota, SERP_KEYS_CONFIG["burst"])
+        self._last_save = time.monotonic()
+        self._saving = False
+        if usage_path:
+            self.load()
+        for state in self._keys.values():
+            self._report(state)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def manages(self, key):
+        """Whether searches made with key (None for the default) should go through the pool"""
+        return key is None or key in self._keys
+
+    async def acquire(self):
+        """Take a key for one search, waiting for a token if every usable key is busy
+
+        Returns:
+            KeyState: The key to use; pass it to release() with the outcome
+
+        Raises:
+            QuotaExhausted: If every key's quota is used up, or no key frees up within max_wait
+        """
+        start = time.monotonic()
+        while True:
+            state, wait = self._take()
+            if state is not None:
+                SERP_KEY_WAIT.observe(time.monotonic() - start)
+                return state
+            if wait is None:
+                raise QuotaExhausted("Every SerpAPI key has used its monthly quota")
+            if time.monotonic() + wait - start > SERP_KEYS_CONFIG["max_wait"]:
+                raise QuotaExhausted(f"No SerpAPI key available within {SERP_KEYS_CONFIG['max_wait']:.0f}s")
+            await asyncio.sleep(wait)
+
+    def _take(self):
+        """The key with the most tokens left, or None and how long to wait (None if there is no point)"""
+        if _period() != self.period:
+            self._new_period()
+        now = time.monotonic()
+        rate, burst = SERP_KEYS_CONFIG["rate"], SERP_KEYS_CONFIG["burst"]
+        usable = [state for state in self._keys.values() if state.remaining != 0]
+        if not usable:
+            return None, None
+        for state in usable:
+            state.refill(now, rate, burst)
+        ready = [state for state in usable if state.blocked_until <= now and state.tokens >= 1]
+        if not ready:
+            return None, min(max(state.blocked_until - now, (1 - state.tokens) / rate) for state in usable)
+        # Spread load: the fullest bucket first, then the most quota left
+        state = max(ready, key=lambda s: (s.tokens, s.remaining if s.remaining is not None else float("inf")))
+        state.tokens -= 1
+        state.used += 1
+        state.unsaved += 1
+        state.requests += 1
+        self._report(state)
+        self._maybe_save()
+        return state, 0
+
+    def release(self, state, ok=True, rate_limited=False, out_of_searches=False):
+        """Record the outcome of a search made with state's key
+
+        Args:
+            state (KeyState): Key returned by acquire()
+            ok (bool): Whether SerpAPI answered the search
+            rate_limited (bool): Whether it answered 429; only this key backs off
+            out_of_searches (bool): Whether the 429 said the key's monthly searches are used up
+        """
+        if rate_limited:
+            state.rate_limited += 1
+            state.backoff = min(SERP_KEYS_CONFIG["backoff_max"], state.backoff * 2 or SERP_KEYS_CONFIG["backoff_initial"])
+            state.blocked_until = time.monotonic() + state.backoff
+            if out_of_searches:
+                state.exhausted = True
+                logger.warning("SerpAPI key %s is out of searches for %s", state.label, self.period)
+            else:
+                logger.warning("SerpAPI key %s rate limited, backing off for %.0fs", state.label, state.backoff)
+            SERP_KEY_REQUESTS.inc(key=state.label, outcome="rate_limited")
+            self._report(state)
+        else:
+            if ok:
+                state.backoff = 0.0
+            SERP_KEY_REQUESTS.inc(key=state.label, outcome="ok" if ok else "error")
+
+    def usage(self):
+        """Per-key usage for this month
+
+        Returns:
+            list: One dict per key with label, quota, used, remaining, requests,
+                rate_limited and backoff_seconds (time left until the key is used again)
+        """
+        now = time.monotonic()
+        return [
+            {
+                "key": state.label,
+                "quota": state.quota or None,
+                "used": state.used,
+                "remaining": state.remaining,
+                "requests": state.requests,
+                "rate_limited": state.rate_limited,
+                "backoff_seconds": round(max(0.0, state.blocked_until - now), 1),
+            }
+            for state in self._keys.values()
+        ]
+
+    def _report(self, state):
+        if state.quota or state.exhausted:
+            SERP_KEY_QUOTA_REMAINING.set(state.remaining, key=state.label)
+
+    def _new_period(self):
+        logger.info("SerpAPI quota period %s started", _period())
+        self.period = _period()
+        for state in self._keys.values():
+            state.used = state.unsaved = 0
+            state.exhausted = False
+            self._report(state)
+
+    def load(self):
+        """Load this month's persisted usage, ignoring a missing or unreadable file"""
+        data = self._read()
+        if data.get("period") != self.period:
+            return
+        by_label = {state.label: state for state in self._keys.values()}
+        for label, entry in data.get("keys", {}).items():
+            state = by_label.get(label)
+            if state is not None:
+                state.used = entry.get("used", 0)
+                state.exhausted = entry.get("exhausted", False)
+
+    def _read(self):
+        try:
+            with open(self.usage_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load SerpAPI usage from %s: %s", self.usage_path, e)
+            return {}
+
+    def _pending(self):
+        """Searches since the last save, taken out of the unsaved counts"""
+        pending = {}
+        for state in self._keys.values():
+            pending[state.label] = (state.unsaved, state.exhausted)
+            state.unsaved = 0
+        return pending
+
+    def save(self):
+        """Add usage since the last save to usage_path"""
+        if not self.usage_path:
+            return
+        pending = self._pending()
+        self._apply(self._write(self.period, pending), pending)
+
+    def _write(self, period, pending):
+        """Merge pending counts into the file (other workers add theirs the same way)
+
+        Returns:
+            dict: Label -> saved usage entry, or None if the file could not be written
+        """
+        data = self._read()
+        keys = data.get("keys", {}) if data.get("period") == period else {}
+        for label, (searches, exhausted) in pending.items():
+            entry = keys.setdefault(label, {"used": 0, "exhausted": False})
+            entry["used"] += searches
+            entry["exhausted"] = entry["exhausted"] or exhausted
+        tmp_path = f"{self.usage_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"period": period, "keys": keys}, f)
+            os.replace(tmp_path, self.usage_path)
+        except OSError as e:
+            logger.warning("Could not save SerpAPI usage to %s: %s", self.usage_path, e)
+            return None
+        return keys
+
+    def _apply(self, saved, pending):
+        for state in self._keys.values():
+            if saved is None:
+                # Not written: keep the counts for the next save
+                state.unsaved += pending.get(state.label, (0, False))[0]
+            elif state.label in saved:
+                # The file now includes every worker's searches
+                state.used = saved[state.label]["used"] + state.unsaved
+                state.exhausted = state.exhausted or saved[state.label]["exhausted"]
+                self._report(state)
+
+    def _maybe_save(self):
+        # Periodic save on a worker thread so file I/O never blocks the event loop
+        if not self.usage_path or self._saving:
+            return
+        if time.monotonic() - self._last_save < SERP_KEYS_CONFIG["save_interval"]:
+            return
+        self._last_save = time.monotonic()
+        self._saving = True
+        pending = self._pending()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, self._write, self.period, pending)
+
+        def done(future):
+            self._saving = False
+            self._apply(None if future.exception() else future.result(), pending)
+
+        future.add_done_callback(done)
+
+
+_pool = None
+
+
+def get_key_pool():
+    """Get the process-wide SerpAPI key pool, or None when no keys are configured"""
+    global _pool
+    if _pool is None and SERP_KEYS_CONFIG["keys"]:
+        _pool = KeyPool(SERP_KEYS_CONFIG["keys"], SERP_KEYS_CONFIG["usage_path"])
+        atexit.register(_pool.save)
+    return _pool
@@ -0,0 +1,161 @@
+"""
+News source providers for the Newsaroo application.
+A provider answers a topic query with ArticleRecords; search_news fans a
+query out to the configured providers and merges their results.
+"""
+
+import asyncio
+import logging
+import re
+from ..config import SOURCES_CONFIG
+from ..db.article_store import canonical_url
+from ..utils.metrics import span
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SourceProvider:
+    """A source of news articles
+
+    Subclasses set `name`, set `local` when queries are answered without a
+    remote call, and implement search().
+    """
+
+    name = "source"
+    local = False
+
+    async def search(self, query, time_period, limit):
+        """Find recent articles on a topic
+
+        Args:
+            query (str): Canonical topic
+            time_period (str): Search window such as "1d"
+            limit (int): Maximum number of articles
+
+        Returns:
+            list: ArticleRecords, best first
+        """
+        raise NotImplementedError
+
+
+def get_providers(api_key=None):
+    """The providers named in SOURCES_CONFIG["providers"], in order
+
+    Args:
+        api_key (str, optional): SerpAPI key for the SerpAPI provider
+
+    Returns:
+        list: SourceProvider instances
+    """
+    # Imported here: the provider modules import this one
+    from .search import SerpApiProvider
+    from .feeds import FeedProvider
+
+    providers = []
+    for name in SOURCES_CONFIG["providers"]:
+        if name == "serpapi":
+            providers.append(SerpApiProvider(api_key))
+        elif name == "feeds":
+            providers.append(FeedProvider())
+        else:
+            logger.warning("Unknown news source provider '%s' ignored", name)
+    return providers
+
+
+def _title_key(title):
+    return re.sub(r"\W+", " ", (title or "").casefold()).strip()
+
+
+def merge_results(result_lists, limit=None):
+    """Merge provider results in provider order, dropping duplicates
+
+    An article is a duplicate if its canonical URL was already taken, or if an
+    earlier provider returned an article with the same normalized title (the
+    same story linked differently, e.g. a feed's redirect link).
+
+    Args:
+        result_lists (list): Lists of ArticleRecords, one per provider
+        limit (int, optional): Maximum number of articles
+
+    Returns:
+        list: Merged ArticleRecords
+    """
+    merged = []
+    seen_urls, seen_titles = set(), set()
+    for records in result_lists:
+        titles = set()
+        for record in records:
+            url = canonical_url(record.link) if record.link else None
+            title = _title_key(record.title)
+            if (url and url in seen_urls) or (title and title in seen_titles):
+                continue
+            if url:
+                seen_urls.add(url)
+            titles.add(title)
+            merged.append(record)
+            if limit and len(merged) >= limit:
+                return merged
+        seen_titles |= titles - {""}
+    return merged
+
+
+async def _query(provider, query, time_period, limit):
+    with span("source.search", provider=provider.name) as source_span:
+        records = await provider.search(query, time_period, limit)
+        source_span.set(results=len(records))
+    return records
+
+
+async def _fan_out(providers, query, time_period, limit):
+    outcomes = await asyncio.gather(
+        *(_query(provider, query, time_period, limit) for provider in providers), return_exceptions=True
+    )
+    results, errors = [], []
+    for provider, outcome in zip(providers, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, BaseException):
+            logger.warning("News source '%s' failed: %s", provider.name, outcome)
+            errors.append(outcome)
+        else:
+            results.append(outcome)
+    return results, errors
+
+
+async def search_sources(query, time_period, limit, providers):
+    """Query providers concurrently and merge their results
+
+    With SOURCES_CONFIG["local_first"], local providers are asked first and
+    remote ones (SerpAPI) only when the local results fall short of limit.
+
+    Args:
+        query (str): Canonical topic
+        time_period (str): Search window
+        limit (int): Articles wanted
+        providers (list): SourceProviders in priority order
+
+    Returns:
+        list: Merged ArticleRecords
+
+    Raises:
+        Exception: If every provider failed
+    """
+    if SOURCES_CONFIG["local_first"]:
+        local = [provider for provider in providers if provider.local]
+        results, errors = await _fan_out(local, query, time_period, limit)
+        merged = merge_results(results, limit)
+        if len(merged) >= limit:
+            logger.info("Answered '%s' from local sources", query)
+            return merged
+        remote_results, remote_errors = await _fan_out(
+            [provider for provider in providers if not provider.local], query, time_period, limit
+        )
+        results += remote_results
+        errors += remote_errors
+    else:
+        results, errors = await _fan_out(providers, query, time_period, limit)
+
+    if errors and not results:
+        raise errors[0]
+    return merge_results(results, limit)
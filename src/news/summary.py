@@ -5,21 +5,40 @@ Handles summarizing news articles using LLM.
 
 import logging
 import asyncio
-import litellm
-from ..config import OPENAI_API_KEY, LLM_CONFIG
+import hashlib
+import json
+import time
+from ..config import OPENAI_API_KEY, LLM_CONFIG, LLM_ROUTER_CONFIG, DEGRADED_CONFIG, MEMORY_CONFIG
+from ..utils.cache import cached, get_cache
+from .topics import canonical_topic
+from .records import ArticleRecord
+from .model_router import Route, estimate_tokens, get_model_router, report_route
+from .extractive import extractive_summary
+from ..utils.hedging import HedgePolicy
+from ..utils.memory_budget import reserve_memory
+from ..utils.metrics import span, traced, LLM_TOKENS, DEGRADED_SUMMARIES
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-async def summarize_with_llm(articles, topic, model=None, max_tokens=None):
+LLM_HEDGE = HedgePolicy("llm")
+
+# LLM calls left running after their request was answered in degraded mode
+_upgrades = set()
+
+@traced("summarize")
+async def summarize_with_llm(articles, topic, model=None, max_tokens=None, latency_target=None):
     """Summarize the news articles using an LLM asynchronously
     
     Args:
-        articles (list): List of processed articles
+        articles (list): ArticleRecords from process_news_results
         topic (str): The original search topic
-        model (str, optional): LLM model to use. Defaults to the one in LLM_CONFIG.
+        model (str, optional): LLM model to use. Defaults to the one the model router
+            picks from LLM_ROUTER_CONFIG["models"].
         max_tokens (int, optional): Maximum tokens for LLM response. 
             Defaults to the value in LLM_CONFIG.
+        latency_target (float, optional): Seconds the caller is willing to wait for the
+            completion. Defaults to LLM_ROUTER_CONFIG["latency_target"].
         
     Returns:
         str: Summarized news in the requested format
@@ -29,8 +48,7 @@ async def summarize_with_llm(articles, topic, model=None, max_tokens=None):
             logger.warning("No articles found to summarize.")
             raise ValueError("No articles found to summarize.")
         
-        # Use default model and max_tokens if none provided
-        model = model or LLM_CONFIG["model"]
+        # Use default max_tokens if none provided
         max_tokens = max_tokens or LLM_CONFIG["max_tokens"]
         
         if not OPENAI_API_KEY:
@@ -39,48 +57,174 @@ async def summarize_with_llm(articles, topic, model=None, max_tokens=None):
         
         logger.info("Summarizing news articles using LLM...")
         
-        # Prepare the context for the LLM
-        context = f"I need a summary of recent news about '{topic}'. Here are the articles I found:\n\n"
+        # The canonical topic keeps prompts, and so summary cache keys, identical across spellings
+        topic = canonical_topic(topic)
         
-        for i, article in enumerate(articles):
-            context += f"Article {i+1}: {article.get('title', 'Untitled')}\n"
-            source = article.get('source', {})
-            source_name = source['name'] if isinstance(source, dict) and 'name' in source else str(source or 'Unknown Source')
-            context += f"Source: {source_name}\n"
-            context += f"Content: {article.get('content', 'No content available')}\n\n"
+        articles = [ArticleRecord.coerce(article) for article in articles]
         
-        # Create the prompt for the LLM
-        prompt = f"""{context}
+        # The prompt and its copies stay alive until the completion returns
+        async with reserve_memory(_prompt_bytes(articles, topic) * MEMORY_CONFIG["prompt_factor"], "prompt"):
+            # Prepare the context for the LLM
+            context = "".join([
+                f"I need a summary of recent news about '{topic}'. Here are the articles I found:\n\n",
+                *(
+                    f"Article {i+1}: {article.title}\nSource: {article.source}\nContent: {article.content}\n\n"
+                    for i, article in enumerate(articles)
+                ),
+            ])
+            
+            # Create the prompt for the LLM
+            prompt = f"""{context}
         
         Based on these articles, provide me with the "Top 3 important items I should know about {topic} and why they matter".
         
         Format your response as a numbered list with a brief explanation for each item.
         Focus on the most significant developments or insights.
         """
-        
-        # Configure litellm
-        litellm.set_verbose = False
-        
-        # Since litellm.completion might be synchronous, we'll run it in an executor
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: litellm.completion(
-                model=model,
-                messages=[
-                    {"role": "system", "content": LLM_CONFIG["system_message"]},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens
+            del context
+            
+            # Identical prompts produce the same summary, so share it across workers
+            messages = [
+                {"role": "system", "content": LLM_CONFIG["system_message"]},
+                {"role": "user", "content": prompt}
+            ]
+            # Without an explicit model, pick one for the prompt size and latency target
+            router = get_model_router()
+            latency_target = latency_target or LLM_ROUTER_CONFIG["latency_target"] or None
+            if model:
+                route = Route(model, "requested")
+            else:
+                route = router.choose(estimate_tokens(messages), max_tokens, latency_target)
+            summary, route = await router.run(
+                route,
+                lambda name: cached(
+                    "summary",
+                    _summary_cache_key(name, max_tokens, messages),
+                    lambda: _complete(name, messages, max_tokens)
+                ),
+                latency_target
             )
-        )
-        
-        # Extract the summary from the response
-        summary = response.choices[0].message.content
-        logger.info("Successfully generated summary")
+        report_route(route)
+        logger.info("Successfully generated summary with %s (%s)", route.model, route.reason)
         return summary
         
     except Exception as e:
         error_msg = f"Error in summarization: {str(e)}"
         logger.error(error_msg)
-        raise Exception(error_msg)  # Propagate error for proper HTTP status 
\ No newline at end of file
+        raise Exception(error_msg)  # Propagate error for proper HTTP status 
+
+async def summarize_within(articles, topic, timeout, latency_target=None):
+    """Summarize with the LLM, or extractively if it cannot answer within timeout
+    
+    If the LLM fails, or has not answered after timeout seconds, a local
+    extractive Top 3 is returned instead. With DEGRADED_CONFIG["upgrade"] and
+    the shared cache enabled, a late LLM call keeps running in the background
+    so the next request for the same articles gets its summary from the cache.
+    
+    Args:
+        articles (list): ArticleRecords from process_news_results
+        topic (str): The original search topic
+        timeout (float): Seconds the LLM may take
+        latency_target (float, optional): Passed on to the model router
+        
+    Returns:
+        tuple: (summary, None) or (extractive summary, reason it was degraded: "deadline" or "error")
+    """
+    if timeout < DEGRADED_CONFIG["min_llm_seconds"]:
+        return _degraded(articles, topic, "deadline")
+    
+    task = asyncio.ensure_future(summarize_with_llm(articles, topic, latency_target=latency_target))
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if done:
+        if task.exception() is None:
+            return task.result(), None
+        return _degraded(articles, topic, "error")
+    
+    if DEGRADED_CONFIG["upgrade"] and get_cache() is not None:
+        logger.info("LLM missed the %.1fs deadline for '%s'; finishing it in the background", timeout, topic)
+        _upgrades.add(task)
+        task.add_done_callback(_upgrade_done)
+    else:
+        task.cancel()
+    return _degraded(articles, topic, "deadline")
+
+def _upgrade_done(task):
+    _upgrades.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background summary failed: %s", task.exception())
+
+def _degraded(articles, topic, reason):
+    logger.warning("Returning an extractive summary for '%s' (%s)", topic, reason)
+    DEGRADED_SUMMARIES.inc(reason=reason)
+    return extractive_summary(articles, topic), reason
+
+def _prompt_bytes(articles, topic):
+    """Approximate size of the prompt built for articles, before building it"""
+    # The fixed instructions plus the topic, which appears twice
+    size = 400 + 2 * len(topic)
+    for article in articles:
+        size += 40 + len(article.title) + len(article.source) + len(article.content)
+    return size
+
+def _summary_cache_key(model, max_tokens, messages):
+    """Cache key for a completion request"""
+    payload = json.dumps({"model": model, "max_tokens": max_tokens, "messages": messages}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def load_litellm():
+    """Import and configure litellm on first use
+    
+    litellm takes seconds to import, so it is loaded lazily: on the executor
+    thread of the first completion, or earlier by the server warm-up.
+    """
+    import litellm
+    litellm.set_verbose = False
+    return litellm
+
+async def _complete(model, messages, max_tokens):
+    """Run the LLM completion and return the generated text"""
+    # Since litellm.completion might be synchronous, we'll run it in an executor
+    loop = asyncio.get_event_loop()
+    
+    def request():
+        return loop.run_in_executor(
+            None,
+            lambda: load_litellm().completion(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                api_base=LLM_CONFIG["api_base"]
+            )
+        )
+    
+    router = get_model_router()
+    start = time.perf_counter()
+    with span("llm.completion", kind="outbound", model=model) as llm_span:
+        try:
+            response = await LLM_HEDGE.run(request)
+        except asyncio.CancelledError:
+            router.record(model, time.perf_counter() - start)
+            raise
+        except Exception:
+            router.record(model, time.perf_counter() - start, ok=False)
+            raise
+        router.record(model, time.perf_counter() - start, ok=True)
+        _record_usage(llm_span, model, response)
+    
+    # Extract the summary from the response
+    return response.choices[0].message.content
+
+def _record_usage(llm_span, model, response):
+    """Attach token counts from a completion response to the span and metrics"""
+    usage = getattr(response, "usage", None)
+    if not usage:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    llm_span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    LLM_TOKENS.inc(prompt_tokens, model=model, type="prompt")
+    LLM_TOKENS.inc(completion_tokens, model=model, type="completion")
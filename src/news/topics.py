@@ -0,0 +1,96 @@
+"""
+Topic canonicalization for the Newsaroo application.
+Maps free-text topics such as "AI", " ai " and "Artificial-Intelligence" to
+one canonical form, so equivalent topics share searches, cache entries and
+summaries. The original spelling is kept by callers for display.
+"""
+
+import json
+import logging
+import re
+import threading
+import unicodedata
+from ..config import TOPIC_CONFIG
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_SEPARATORS = re.compile(r"[\s\-_/,;:|]+")
+_EDGE_PUNCTUATION = "\"'`.!?()[]{}"
+
+_aliases = None
+_aliases_lock = threading.Lock()
+
+
+def normalize_topic(topic):
+    """Case, whitespace, separator and Unicode normalization of a topic
+
+    Accents are folded ("Pokémon" -> "pokemon"), case is folded, and runs of
+    whitespace, hyphens, underscores and similar separators become one space.
+
+    Args:
+        topic (str): Topic as entered
+
+    Returns:
+        str: Normalized topic
+    """
+    text = unicodedata.normalize("NFKD", topic)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = _SEPARATORS.sub(" ", text.casefold())
+    return text.strip().strip(_EDGE_PUNCTUATION).strip()
+
+
+def load_aliases():
+    """The alias map, normalized: built-in aliases plus NEWSAROO_TOPIC_ALIASES_FILE
+
+    Returns:
+        dict: Normalized alias -> normalized canonical topic
+    """
+    global _aliases
+    if _aliases is None:
+        with _aliases_lock:
+            if _aliases is None:
+                aliases = dict(TOPIC_CONFIG["aliases"])
+                path = TOPIC_CONFIG["aliases_file"]
+                if path:
+                    try:
+                        with open(path) as f:
+                            aliases.update(json.load(f))
+                    except (OSError, ValueError) as e:
+                        logger.warning("Could not load topic aliases from %s: %s", path, e)
+                _aliases = {normalize_topic(alias): normalize_topic(target) for alias, target in aliases.items()}
+    return _aliases
+
+
+def canonical_topic(topic):
+    """Canonical form of a topic, used for searches and every cache and deduplication key
+
+    Args:
+        topic (str): Topic as entered
+
+    Returns:
+        str: Canonical topic
+    """
+    normalized = normalize_topic(topic)
+    aliases = load_aliases()
+    # "a.i." and "ai" should hit the same alias
+    return aliases.get(normalized) or aliases.get(normalized.replace(".", "")) or normalized
+
+
+def dedupe_topics(topics):
+    """Drop topics equivalent to an earlier one, keeping the first spelling
+
+    Args:
+        topics (list): Topics as entered
+
+    Returns:
+        list: One topic per canonical form, in the original order
+    """
+    seen = set()
+    unique = []
+    for topic in topics:
+        key = canonical_topic(topic)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(topic)
+    return unique
@@ -0,0 +1,74 @@
+"""
+Server launcher for the Newsaroo API.
+Runs uvicorn either in development mode (single process, auto-reload) or in
+production mode (multiple worker processes with graceful shutdown and
+periodic worker recycling).
+"""
+
+import logging
+import os
+import uvicorn
+from .config import SERVER_CONFIG
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+APP = "src.main:app"
+
+def run_development(host=None, port=None):
+    """Run a single auto-reloading process for local development"""
+    uvicorn.run(
+        APP,
+        host=host or SERVER_CONFIG["host"],
+        port=port or SERVER_CONFIG["port"],
+        reload=True,  # Enable auto-reload during development
+        log_level="info"
+    )
+
+def run_production(host=None, port=None, workers=None, max_requests=None, graceful_timeout=None):
+    """Run multiple worker processes behind one listening socket
+    
+    Workers share SERP, article and summary caches through the SQLite cache at
+    CACHE_CONFIG["path"], so a result fetched by one worker is reused by all.
+    The cache is opt-in and enabled here unless NEWSAROO_CACHE_ENABLED is set;
+    the same goes for the article store and NEWSAROO_ARTICLE_STORE_ENABLED.
+    Uvicorn's supervisor restarts workers that exit, which is how recycling
+    after max_requests works; each worker adds up to max_requests_jitter extra
+    requests so they do not all restart at once.
+    
+    Each worker keeps its own metrics, so /metrics reports the process that
+    served the scrape.
+    
+    Args:
+        host (str, optional): Bind address. Defaults to SERVER_CONFIG["host"].
+        port (int, optional): Bind port. Defaults to SERVER_CONFIG["port"].
+        workers (int, optional): Number of worker processes. Defaults to SERVER_CONFIG["workers"].
+        max_requests (int, optional): Requests served before a worker is recycled (0 disables).
+            Defaults to SERVER_CONFIG["max_requests"].
+        graceful_timeout (int, optional): Seconds to let in-flight requests finish on shutdown.
+            Defaults to SERVER_CONFIG["graceful_timeout"].
+    """
+    workers = workers or SERVER_CONFIG["workers"]
+    max_requests = SERVER_CONFIG["max_requests"] if max_requests is None else max_requests
+    graceful_timeout = SERVER_CONFIG["graceful_timeout"] if graceful_timeout is None else graceful_timeout
+    
+    # Workers import the configuration fresh, so the environment is how the setting reaches them
+    os.environ.setdefault("NEWSAROO_CACHE_ENABLED", "true")
+    os.environ.setdefault("NEWSAROO_ARTICLE_STORE_ENABLED", "true")
+    if os.environ["NEWSAROO_CACHE_ENABLED"].lower() not in ("1", "true", "yes") and workers > 1:
+        logger.warning("Shared cache is disabled; each worker will repeat upstream calls")
+    
+    logger.info("Starting %s workers (recycle after %s requests)", workers, max_requests or "unlimited")
+    uvicorn.run(
+        APP,
+        host=host or SERVER_CONFIG["host"],
+        port=port or SERVER_CONFIG["port"],
+        workers=workers,
+        limit_max_requests=max_requests or None,
+        limit_max_requests_jitter=SERVER_CONFIG["max_requests_jitter"] if max_requests else 0,
+        timeout_graceful_shutdown=graceful_timeout,
+        timeout_keep_alive=SERVER_CONFIG["keep_alive"],
+        proxy_headers=True,
+        access_log=False,
+        log_level="info"
+    )
@@ -0,0 +1,286 @@
+"""
+Shared cache for the Newsaroo application.
+Stores SERP results, article text and summaries in a local SQLite database
+(WAL mode) so every worker process on the host shares one warm cache, and
+coordinates single-flight computation across coroutines and processes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ..config import CACHE_CONFIG
+from .metrics import record_cache_lookup
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS cache_leases (
+    lease_key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class _Flight:
+    """A computation in progress and how many callers are waiting for it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SharedCache:
+    """SQLite-backed TTL cache shared by all worker processes on a host
+
+    All database access runs on one dedicated thread that owns the connection,
+    so disk I/O and lock waits never block the event loop.
+
+    Args:
+        path (str): Database file path
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.owner = f"{os.getpid()}-{id(self)}"
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="newsaroo-cache")
+        self._inflight = {}
+
+    def _connection(self):
+        # Only called on the executor thread
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=CACHE_CONFIG["busy_timeout"], isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def get(self, namespace, key):
+        """Get a cached value
+
+        Args:
+            namespace (str): Cache namespace, e.g. "serp" or "summary"
+            key (str): Entry key
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        return await self._run(self._get, namespace, key)
+
+    async def set(self, namespace, key, value, ttl):
+        """Store a JSON-serializable value for ttl seconds"""
+        await self._run(self._set, namespace, key, value, ttl)
+
+    async def delete(self, namespace, key):
+        """Remove an entry"""
+        await self._run(self._delete, namespace, key)
+
+    async def purge_expired(self):
+        """Remove expired entries and leases"""
+        await self._run(self._purge_expired)
+
+    def _get(self, namespace, key):
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Cache read failed: %s", e)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _set(self, namespace, key, value, ttl):
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), time.time() + ttl)
+            )
+            if random.random() < CACHE_CONFIG["purge_probability"]:
+                self._purge_expired()
+        except sqlite3.Error as e:
+            logger.warning("Cache write failed: %s", e)
+
+    def _delete(self, namespace, key):
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+        except sqlite3.Error as e:
+            logger.warning("Cache delete failed: %s", e)
+
+    def _purge_expired(self):
+        now = time.time()
+        conn = self._connection()
+        conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        conn.execute("DELETE FROM cache_leases WHERE expires_at <= ?", (now,))
+
+    def _poll(self, namespace, key, lease_key):
+        """Read-only check used by waiters: (cached value or None, whether a live lease exists)"""
+        now = time.time()
+        try:
+            row = self._connection().execute(
+                "SELECT (SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?), "
+                "EXISTS (SELECT 1 FROM cache_leases WHERE lease_key = ? AND expires_at > ?)",
+                (namespace, key, now, lease_key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Cache poll failed: %s", e)
+            return None, False
+        return (json.loads(row[0]) if row[0] is not None else None), bool(row[1])
+
+    def _try_lease(self, lease_key, ttl):
+        """Try to become the process computing lease_key"""
+        now = time.time()
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT owner, expires_at FROM cache_leases WHERE lease_key = ?", (lease_key,)).fetchone()
+            if row and row[0] != self.owner and row[1] > now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_leases (lease_key, owner, expires_at) VALUES (?, ?, ?)",
+                (lease_key, self.owner, now + ttl)
+            )
+            conn.execute("COMMIT")
+            return True
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning("Cache lease failed: %s", e)
+            # Fall back to computing locally rather than stalling the request
+            return True
+
+    def _release_lease(self, lease_key):
+        try:
+            self._connection().execute(
+                "DELETE FROM cache_leases WHERE lease_key = ? AND owner = ?", (lease_key, self.owner)
+            )
+        except sqlite3.Error as e:
+            logger.warning("Cache lease release failed: %s", e)
+
+    async def get_or_compute(self, namespace, key, compute, ttl, cacheable=None, finish_abandoned=False):
+        """Return the cached value or compute it exactly once across workers
+
+        Concurrent callers in this process share one computation; callers in
+        other processes wait for the lease holder to publish the result. A
+        cancelled caller leaves the computation running for the others; when
+        the last one is cancelled the computation is cancelled too, unless
+        finish_abandoned is set.
+
+        Args:
+            namespace (str): Cache namespace
+            key (str): Entry key
+            compute (callable): Coroutine function producing the value
+            ttl (float): Time to live in seconds
+            cacheable (callable, optional): Predicate deciding whether a result is stored.
+                Defaults to storing anything that is not None.
+            finish_abandoned (bool): Keep computing and fill the cache even if every caller
+                has gone, for work that is paid for once started
+
+        Returns:
+            The cached or freshly computed value
+        """
+        value = await self.get(namespace, key)
+        record_cache_lookup(namespace, value is not None)
+        if value is not None:
+            return value
+
+        flight_key = (namespace, key)
+        flight = self._inflight.get(flight_key)
+        if flight is None:
+            flight = self._inflight[flight_key] = _Flight(
+                asyncio.ensure_future(self._compute_once(namespace, key, compute, ttl, cacheable))
+            )
+            flight.task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        flight.waiters += 1
+        try:
+            # Shield so one cancelled waiter does not abort work others are waiting on
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not finish_abandoned:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def _compute_once(self, namespace, key, compute, ttl, cacheable):
+        lease_key = f"{namespace}:{key}"
+        lease_ttl = CACHE_CONFIG["lease_ttl"]
+        deadline = time.monotonic() + lease_ttl
+        leased = await self._run(self._try_lease, lease_key, lease_ttl)
+        while not leased:
+            # Another worker is computing this entry: wait with reads until it publishes,
+            # and only contend for the write lock once its lease is gone
+            await asyncio.sleep(CACHE_CONFIG["lease_poll_interval"])
+            value, lease_held = await self._run(self._poll, namespace, key, lease_key)
+            if value is not None:
+                return value
+            if time.monotonic() > deadline:
+                break
+            if not lease_held:
+                leased = await self._run(self._try_lease, lease_key, lease_ttl)
+        try:
+            value = await compute()
+            if value is not None and (cacheable is None or cacheable(value)):
+                await self.set(namespace, key, value, ttl)
+            return value
+        finally:
+            if leased:
+                await self._run(self._release_lease, lease_key)
+
+
+_cache = None
+
+
+def get_cache():
+    """Get the process-wide shared cache, or None when caching is disabled"""
+    global _cache
+    if not CACHE_CONFIG["enabled"]:
+        return None
+    if _cache is None:
+        _cache = SharedCache(CACHE_CONFIG["path"])
+    return _cache
+
+
+async def cached(namespace, key, compute, cacheable=None):
+    """Run compute through the shared cache for namespace, or directly if caching is disabled
+
+    Args:
+        namespace (str): One of the namespaces in CACHE_CONFIG["ttl"]
+        key (str): Entry key
+        compute (callable): Coroutine function producing the value
+        cacheable (callable, optional): Predicate deciding whether a result is stored
+
+    Returns:
+        The cached or freshly computed value
+    """
+    cache = get_cache()
+    if cache is None:
+        return await compute()
+    return await cache.get_or_compute(
+        namespace, key, compute, CACHE_CONFIG["ttl"][namespace], cacheable,
+        finish_abandoned=namespace in CACHE_CONFIG["finish_abandoned"]
+    )
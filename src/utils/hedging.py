@@ -0,0 +1,95 @@
+"""
+Hedged requests for the Newsaroo application.
+When a call has not finished by a percentile of its recent latencies, an
+identical second attempt is started and whichever succeeds first is used.
+A token budget caps how often hedges are sent.
+"""
+
+import asyncio
+import collections
+import logging
+import math
+import time
+from ..config import HEDGE_CONFIG
+from .metrics import HEDGE_CALLS, HEDGES_SENT, HEDGE_WINS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """Latency-percentile hedging with a hedge-rate budget for one kind of call
+
+    Args:
+        name (str): Call name used in metrics, e.g. "serpapi"
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = collections.deque(maxlen=HEDGE_CONFIG["window"])
+        self._tokens = HEDGE_CONFIG["burst"]
+
+    def delay(self):
+        """Seconds to wait for the primary attempt before hedging, or None while there is too little history"""
+        if len(self.latencies) < HEDGE_CONFIG["min_samples"]:
+            return None
+        ordered = sorted(self.latencies)
+        rank = max(0, math.ceil(HEDGE_CONFIG["percentile"] / 100 * len(ordered)) - 1)
+        return max(HEDGE_CONFIG["min_delay"], ordered[rank])
+
+    def _take_token(self):
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def _attempt(self, call):
+        start = time.perf_counter()
+        result = await call()
+        return result, time.perf_counter() - start
+
+    async def run(self, call):
+        """Run call, hedging it with a second identical attempt if it is slow
+
+        Attempts that lose are cancelled. Work already handed to a thread
+        (e.g. via run_in_executor) finishes in the background and is discarded.
+
+        Args:
+            call (callable): Returns an awaitable performing the request; called once per attempt
+
+        Returns:
+            The result of the first attempt to succeed
+
+        Raises:
+            Exception: The primary attempt's error if every attempt failed
+        """
+        HEDGE_CALLS.inc(call=self.name)
+        # Each call earns a fraction of a hedge, so hedges stay under budget x calls
+        self._tokens = min(HEDGE_CONFIG["burst"], self._tokens + HEDGE_CONFIG["budget"])
+
+        primary = asyncio.ensure_future(self._attempt(call))
+        attempts = [primary]
+        try:
+            delay = self.delay() if HEDGE_CONFIG["enabled"] else None
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._take_token():
+                    HEDGES_SENT.inc(call=self.name)
+                    logger.debug("Hedging %s after %.3fs", self.name, delay)
+                    attempts.append(asyncio.ensure_future(self._attempt(call)))
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in sorted(done, key=attempts.index):
+                    if attempt.exception() is None:
+                        result, elapsed = attempt.result()
+                        self.latencies.append(elapsed)
+                        if attempt is not primary:
+                            HEDGE_WINS.inc(call=self.name)
+                        return result
+            return primary.result()
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
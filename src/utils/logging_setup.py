@@ -0,0 +1,154 @@
+"""
+Logging setup for the Newsaroo application.
+Configures a non-blocking logging pipeline: records are queued on the
+calling thread and formatted/written by a background listener thread.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from ..config import LOGGING_CONFIG
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes present on every LogRecord; anything else was passed via `extra`
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting and I/O to the listener thread
+
+    The stock QueueHandler formats the whole record (timestamp, traceback,
+    formatter output) on the calling thread so it can be pickled. Our queue
+    is in-process, so only the message is rendered here, which snapshots
+    mutable `%`-style arguments before the caller can change them, and the
+    formatters and handlers run on the background listener.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG records for selected loggers
+
+    Args:
+        sample_rates (dict): Logger name prefix -> fraction of DEBUG records to keep
+    """
+
+    def __init__(self, sample_rates):
+        super().__init__()
+        # Longest prefix first so the most specific rate wins
+        self.sample_rates = sorted(sample_rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or not self.sample_rates:
+            return True
+        for prefix, rate in self.sample_rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects"""
+
+    def format(self, record):
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def configure_logging(level=None, log_file=None, json_output=None, sample_rates=None, stream=None):
+    """Configure application logging in one place
+
+    Installs a queue handler on the root logger and starts a background
+    listener that writes to stdout and the log file. Calling it again
+    replaces the previous configuration.
+
+    Args:
+        level (str, optional): Root log level. Defaults to LOGGING_CONFIG["level"].
+        log_file (str, optional): Log file path, empty to disable. Defaults to LOGGING_CONFIG["file"].
+        json_output (bool, optional): Emit structured JSON lines. Defaults to LOGGING_CONFIG["json"].
+        sample_rates (dict, optional): Per-logger DEBUG sampling rates.
+            Defaults to LOGGING_CONFIG["sample_rates"].
+        stream (file, optional): Console stream. Defaults to stdout.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener
+    """
+    global _listener
+
+    level = level or LOGGING_CONFIG["level"]
+    log_file = LOGGING_CONFIG["file"] if log_file is None else log_file
+    json_output = LOGGING_CONFIG["json"] if json_output is None else json_output
+    sample_rates = LOGGING_CONFIG["sample_rates"] if sample_rates is None else sample_rates
+
+    formatter = JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(stream or sys.stdout)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    shutdown_logging()
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def ensure_logging():
+    """Configure logging with the defaults unless it is already configured
+
+    Used by the API app at startup, so worker processes get the standard
+    pipeline while tools that configured logging themselves keep theirs.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener
+    """
+    return _listener if _listener is not None else configure_logging()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
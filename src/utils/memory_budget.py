@@ -0,0 +1,154 @@
+"""
+In-flight memory budget for the Newsaroo application.
+Page fetches, page extraction and prompt building reserve the bytes they are
+about to hold before allocating them, and give them back as soon as they are
+done, so the article content a worker holds at once stays within
+MEMORY_CONFIG["budget_bytes"]. Reservations that do not fit wait in FIFO order.
+"""
+
+import asyncio
+import collections
+import contextlib
+import logging
+import time
+from ..config import MEMORY_CONFIG
+from .metrics import MEMORY_BUDGET_IN_USE, MEMORY_BUDGET_LIMIT, MEMORY_BUDGET_WAIT, MEMORY_BUDGET_WAITING
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class Reservation:
+    """Bytes held from a MemoryBudget by one stage of work
+
+    Args:
+        budget (MemoryBudget): The budget the bytes come from, or None when budgeting is off
+        nbytes (int): Bytes reserved
+        stage (str): Stage holding them, e.g. "fetch"
+        waited (float): Seconds spent waiting for room
+    """
+
+    __slots__ = ("budget", "nbytes", "stage", "waited")
+
+    def __init__(self, budget, nbytes, stage, waited=0.0):
+        self.budget = budget
+        self.nbytes = nbytes
+        self.stage = stage
+        self.waited = waited
+
+    def shrink(self, nbytes, stage=None):
+        """Give back everything above nbytes, optionally handing the rest to another stage
+
+        Never waits: a reservation can only shrink.
+        """
+        nbytes = max(0, min(int(nbytes), self.nbytes))
+        stage = stage or self.stage
+        if self.budget is not None:
+            self.budget._adjust(self.nbytes, self.stage, nbytes, stage)
+        self.nbytes, self.stage = nbytes, stage
+
+    def release(self):
+        """Give back all the bytes; releasing again has no effect"""
+        self.shrink(0)
+
+
+class MemoryBudget:
+    """Byte budget shared by every request in a worker
+
+    Args:
+        limit (int): Bytes that may be reserved at once. A single reservation
+            larger than limit is reduced to limit, so it runs alone.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters = collections.deque()  # (future, nbytes, stage)
+        MEMORY_BUDGET_LIMIT.set(limit)
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    async def acquire(self, nbytes, stage):
+        """Reserve nbytes for stage, waiting until they fit
+
+        Returns:
+            Reservation: The reserved bytes, to be released by the caller
+        """
+        nbytes = max(0, min(int(nbytes), self.limit))
+        start = time.perf_counter()
+        if self._waiters or self.in_use + nbytes > self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            entry = (waiter, nbytes, stage)
+            self._waiters.append(entry)
+            MEMORY_BUDGET_WAITING.set(len(self._waiters))
+            try:
+                # _grant() takes the bytes for the waiter before waking it
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._adjust(nbytes, stage, 0, stage)
+                raise
+            finally:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    # Waiters queued behind a cancelled one may fit now
+                    self._grant()
+        else:
+            self._adjust(0, stage, nbytes, stage)
+        waited = time.perf_counter() - start
+        MEMORY_BUDGET_WAIT.observe(waited, stage=stage)
+        return Reservation(self, nbytes, stage, waited)
+
+    def _adjust(self, old_bytes, old_stage, nbytes, stage):
+        self.in_use += nbytes - old_bytes
+        MEMORY_BUDGET_IN_USE.dec(old_bytes, stage=old_stage)
+        MEMORY_BUDGET_IN_USE.inc(nbytes, stage=stage)
+        if nbytes < old_bytes:
+            self._grant()
+
+    def _grant(self):
+        """Wake waiters in arrival order while the oldest one fits"""
+        while self._waiters:
+            waiter, nbytes, stage = self._waiters[0]
+            if not waiter.done():
+                if self.in_use + nbytes > self.limit:
+                    break
+                self.in_use += nbytes
+                MEMORY_BUDGET_IN_USE.inc(nbytes, stage=stage)
+                waiter.set_result(None)
+            self._waiters.popleft()
+        MEMORY_BUDGET_WAITING.set(len(self._waiters))
+
+
+_budget = None
+
+
+def get_memory_budget():
+    """Get the worker's memory budget, or None when MEMORY_CONFIG["budget_bytes"] is 0"""
+    global _budget
+    if MEMORY_CONFIG["budget_bytes"] <= 0:
+        return None
+    if _budget is None:
+        _budget = MemoryBudget(MEMORY_CONFIG["budget_bytes"])
+    return _budget
+
+
+@contextlib.asynccontextmanager
+async def reserve_memory(nbytes, stage):
+    """Hold nbytes of the memory budget for the duration of the block
+
+    Args:
+        nbytes (int): Bytes the block is about to allocate
+        stage (str): Stage name used in metrics ("fetch", "extract" or "prompt")
+
+    Yields:
+        Reservation: Shrink it as memory is freed inside the block; the rest is released on exit
+    """
+    budget = get_memory_budget()
+    reservation = await budget.acquire(nbytes, stage) if budget is not None else Reservation(None, nbytes, stage)
+    try:
+        yield reservation
+    finally:
+        reservation.release()
@@ -0,0 +1,514 @@
+"""
+Metrics and tracing utilities for the Newsaroo application.
+Provides a small in-process metrics registry with Prometheus text export
+and span-style timing of pipeline stages and outbound calls.
+"""
+
+import asyncio
+import contextvars
+import copy
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Default latency buckets in seconds (covers fast cache hits up to slow LLM calls)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Trace of the current request, only set when timings were requested
+_current_trace = contextvars.ContextVar("newsaroo_trace", default=None)
+
+
+def _format_labels(names, values, extra=None):
+    """Render a Prometheus label set"""
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.extend(extra)
+    if not pairs:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + rendered + "}"
+
+
+class _Metric:
+    """Base class for labelled metrics"""
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self):
+        """Return a copy of the current values keyed by label-value tuples"""
+        with self._lock:
+            return copy.deepcopy(self._values)
+
+    def collect(self):
+        """Return the metric lines in Prometheus text format"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets"""
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def collect(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            items = sorted((key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items())
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on the /metrics endpoint"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                return self._metrics[metric.name]
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector):
+        """Register a callable returning extra exposition lines at render time"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """Render every registered metric in Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        for collector in collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {str(e)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name, documentation, labelnames=()):
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# Core pipeline metrics
+SPAN_DURATION = histogram(
+    "newsaroo_span_duration_seconds",
+    "Duration of pipeline stages and outbound calls",
+    ("span", "kind"),
+)
+SPANS_IN_FLIGHT = gauge(
+    "newsaroo_spans_in_flight",
+    "Pipeline stages and outbound calls currently running",
+    ("span",),
+)
+SPAN_ERRORS = counter(
+    "newsaroo_span_errors_total",
+    "Pipeline stages and outbound calls that failed",
+    ("span",),
+)
+CANCELLED_WORK = counter(
+    "newsaroo_cancelled_work_total",
+    "Pipeline stages and outbound calls abandoned mid-flight because nobody needed the result any more",
+    ("span",),
+)
+FETCH_DURATION = histogram(
+    "newsaroo_fetch_duration_seconds",
+    "Duration of article page fetches by publisher domain",
+    ("domain",),
+)
+FETCH_SKIPPED = counter(
+    "newsaroo_fetch_skipped_total",
+    "Article page fetches skipped by publisher domain and reason",
+    ("domain", "reason"),
+)
+FETCH_CIRCUIT_OPEN = gauge(
+    "newsaroo_fetch_circuit_open",
+    "Whether the circuit breaker for a publisher domain is open (1) or closed (0)",
+    ("domain",),
+)
+LLM_TOKENS = counter(
+    "newsaroo_llm_tokens_total",
+    "Tokens consumed by LLM completions",
+    ("model", "type"),
+)
+LLM_ROUTES = counter(
+    "newsaroo_llm_routes_total",
+    "Summary model choices by model and reason",
+    ("model", "reason"),
+)
+LLM_FALLBACKS = counter(
+    "newsaroo_llm_fallbacks_total",
+    "Summaries answered by a fallback model by primary model, fallback model and cause (deadline/error)",
+    ("primary", "fallback", "cause"),
+)
+DEGRADED_SUMMARIES = counter(
+    "newsaroo_degraded_summaries_total",
+    "Extractive summaries returned instead of an LLM summary by reason (deadline/error)",
+    ("reason",),
+)
+HEDGE_CALLS = counter(
+    "newsaroo_hedge_calls_total",
+    "Calls made through a hedging policy",
+    ("call",),
+)
+HEDGES_SENT = counter(
+    "newsaroo_hedges_sent_total",
+    "Second attempts sent because the first was slower than the hedge delay",
+    ("call",),
+)
+HEDGE_WINS = counter(
+    "newsaroo_hedge_wins_total",
+    "Hedged calls where the second attempt finished first",
+    ("call",),
+)
+CACHE_LOOKUPS = counter(
+    "newsaroo_cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ("cache", "result"),
+)
+HTTP_REQUEST_DURATION = histogram(
+    "newsaroo_http_request_duration_seconds",
+    "Duration of HTTP requests by route",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = gauge(
+    "newsaroo_http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+HTTP_CONDITIONAL_RESPONSES = counter(
+    "newsaroo_http_conditional_responses_total",
+    "Summary responses by route and result (not_modified/full)",
+    ("route", "result"),
+)
+HTTP_RESPONSE_BYTES = counter(
+    "newsaroo_http_response_bytes_total",
+    "Summary response body bytes sent by route and content encoding (identity/gzip/br)",
+    ("route", "encoding"),
+)
+ADMISSION_QUEUE_DEPTH = gauge(
+    "newsaroo_admission_queue_depth",
+    "Requests waiting for an admission slot by route",
+    ("route",),
+)
+ADMISSION_ACTIVE = gauge(
+    "newsaroo_admission_active",
+    "Admitted requests currently running by route",
+    ("route",),
+)
+ADMISSION_WAIT = histogram(
+    "newsaroo_admission_wait_seconds",
+    "Time admitted requests spent queued by route",
+    ("route",),
+)
+ADMISSION_REJECTED = counter(
+    "newsaroo_admission_rejected_total",
+    "Requests turned away by admission control by route and reason (queue_full/queue_timeout)",
+    ("route", "reason"),
+)
+SERP_KEY_REQUESTS = counter(
+    "newsaroo_serpapi_key_requests_total",
+    "SerpAPI requests by pool key and outcome (ok/error/rate_limited)",
+    ("key", "outcome"),
+)
+SERP_KEY_QUOTA_REMAINING = gauge(
+    "newsaroo_serpapi_key_quota_remaining",
+    "Searches left this month by pool key (keys with a quota only)",
+    ("key",),
+)
+SERP_KEY_WAIT = histogram(
+    "newsaroo_serpapi_key_wait_seconds",
+    "Time searches waited for a SerpAPI key with a free token",
+)
+
+MEMORY_BUDGET_IN_USE = gauge(
+    "newsaroo_memory_budget_in_use_bytes",
+    "Bytes of the in-flight content budget reserved by stage (fetch/extract/prompt)",
+    ("stage",),
+)
+MEMORY_BUDGET_LIMIT = gauge(
+    "newsaroo_memory_budget_limit_bytes",
+    "Size of the in-flight content budget",
+)
+MEMORY_BUDGET_WAITING = gauge(
+    "newsaroo_memory_budget_waiting",
+    "Reservations waiting for room in the in-flight content budget",
+)
+MEMORY_BUDGET_WAIT = histogram(
+    "newsaroo_memory_budget_wait_seconds",
+    "Time reservations waited for room in the in-flight content budget by stage",
+    ("stage",),
+)
+
+EVENT_LOOP_LAG = histogram(
+    "newsaroo_event_loop_lag_seconds",
+    "How late the event-loop lag monitor's check-ins ran",
+)
+EVENT_LOOP_STALLS = counter(
+    "newsaroo_event_loop_stalls_total",
+    "Event-loop stalls longer than the configured threshold",
+)
+PROFILES_TAKEN = counter(
+    "newsaroo_profiles_total",
+    "Requests profiled on demand",
+)
+
+DELTA_DIGESTS = counter(
+    "newsaroo_delta_digests_total",
+    "Delta digests by outcome (new: summarized new articles, unchanged: LLM call skipped)",
+    ("outcome",),
+)
+
+
+def record_cache_lookup(cache, hit):
+    """Record a cache hit or miss
+
+    Args:
+        cache (str): Name of the cache
+        hit (bool): Whether the lookup was a hit
+    """
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _cache_hit_ratio_lines():
+    """Derive hit ratios per cache from the lookup counters"""
+    totals = {}
+    for (cache, result), value in CACHE_LOOKUPS.snapshot().items():
+        hits, lookups = totals.get(cache, (0, 0))
+        totals[cache] = (hits + (value if result == "hit" else 0), lookups + value)
+    lines = [
+        "# HELP newsaroo_cache_hit_ratio Ratio of cache lookups that were hits",
+        "# TYPE newsaroo_cache_hit_ratio gauge",
+    ]
+    for cache, (hits, lookups) in sorted(totals.items()):
+        ratio = hits / lookups if lookups else 0.0
+        lines.append(f"newsaroo_cache_hit_ratio{_format_labels(('cache',), (cache,))} {ratio}")
+    return lines
+
+
+REGISTRY.register_collector(_cache_hit_ratio_lines)
+
+
+def _hedge_rate_lines():
+    """Derive the fraction of calls that were hedged from the hedge counters"""
+    calls = HEDGE_CALLS.snapshot()
+    sent = HEDGES_SENT.snapshot()
+    lines = [
+        "# HELP newsaroo_hedge_rate Fraction of calls that sent a hedge",
+        "# TYPE newsaroo_hedge_rate gauge",
+    ]
+    for key, total in sorted(calls.items()):
+        rate = sent.get(key, 0) / total if total else 0.0
+        lines.append(f"newsaroo_hedge_rate{_format_labels(('call',), key)} {rate}")
+    return lines
+
+
+REGISTRY.register_collector(_hedge_rate_lines)
+
+
+class Span:
+    """A single timed unit of work"""
+    __slots__ = ("name", "kind", "attrs", "duration", "error")
+
+    def __init__(self, name, kind, attrs):
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs
+        self.duration = None
+        self.error = None
+
+    def set(self, **attrs):
+        """Attach extra attributes (e.g. token counts) to the span"""
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        data = {
+            "span": self.name,
+            "kind": self.kind,
+            "duration_ms": round((self.duration or 0.0) * 1000, 2),
+        }
+        if self.attrs:
+            data.update(self.attrs)
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+@contextmanager
+def span(name, kind="stage", **attrs):
+    """Time a pipeline stage or outbound call
+
+    Records the duration in the span histogram, tracks in-flight work,
+    counts errors and appends the span to the request trace if one is active.
+    Set ``span.error`` to record a failure that did not raise.
+
+    Args:
+        name (str): Span name, e.g. "search" or "serpapi.search"
+        kind (str): "stage" for pipeline stages, "outbound" for remote calls
+        **attrs: Extra attributes reported in the request trace
+
+    Yields:
+        Span: The running span
+    """
+    current = Span(name, kind, attrs)
+    SPANS_IN_FLIGHT.inc(span=name)
+    start = time.perf_counter()
+    try:
+        yield current
+    except asyncio.CancelledError:
+        # Cancellation (e.g. the client disconnected) is work saved, not a failure
+        current.set(cancelled=True)
+        CANCELLED_WORK.inc(span=name)
+        raise
+    except BaseException as e:
+        current.error = current.error or type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        SPANS_IN_FLIGHT.dec(span=name)
+        SPAN_DURATION.observe(current.duration, span=name, kind=kind)
+        if current.error:
+            SPAN_ERRORS.inc(span=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append(current.to_dict())
+
+
+def traced(name, kind="stage"):
+    """Decorator that wraps an async function in a span
+
+    Args:
+        name (str): Span name
+        kind (str): Span kind ("stage" or "outbound")
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name, kind=kind):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace():
+    """Start collecting spans for the current request
+
+    Returns:
+        list: The list that spans of this request will be appended to
+    """
+    trace = []
+    _current_trace.set(trace)
+    return trace
+
+
+def get_trace():
+    """Get the spans collected for the current request, if tracing is active"""
+    return _current_trace.get()
+
+
+def render_metrics():
+    """Render all metrics in Prometheus text exposition format"""
+    return REGISTRY.render()
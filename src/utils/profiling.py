@@ -0,0 +1,300 @@
+"""
+On-demand profiling for the Newsaroo application.
+A sampling profiler records the stacks of every thread in the worker while a
+single request runs and saves them as folded stacks, ready for flamegraph.pl,
+speedscope or inferno. An event-loop lag monitor records stalls together with
+the stack the loop thread was running at the time. Nothing runs unless a
+profile is requested or the monitor is enabled.
+"""
+
+import asyncio
+import collections
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from ..config import PROFILING_CONFIG
+from .metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS, PROFILES_TAKEN
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Frames kept per stack, innermost last
+_MAX_DEPTH = 128
+
+
+@functools.lru_cache(maxsize=4096)
+def _short_path(path):
+    """A readable file name: relative to site-packages or the working directory"""
+    _, marker, rest = path.rpartition("site-packages" + os.sep)
+    if marker:
+        return rest
+    relative = os.path.relpath(path) if os.path.isabs(path) else path
+    return os.path.basename(path) if relative.startswith("..") else relative
+
+
+def folded_stack(frame):
+    """A frame's call stack as "outer;...;inner", one "function (file:line)" per frame"""
+    labels = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        code = frame.f_code
+        # Function start lines, so all samples in one function fold together
+        labels.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ","))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class Profile:
+    """Stacks sampled while one request ran
+
+    Args:
+        method (str): HTTP method
+        path (str): Request path
+    """
+
+    __slots__ = ("id", "method", "path", "started", "duration", "samples", "stacks", "status")
+
+    def __init__(self, method, path):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started = time.monotonic()
+        self.duration = None
+        self.samples = 0
+        self.stacks = collections.Counter()  # "thread;outer;...;inner" -> samples
+        self.status = None
+
+    def folded(self):
+        """The profile in folded-stack format: one "stack count" line per distinct stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class StackSampler:
+    """Samples every thread's stack while at least one profile is active
+
+    The sampling thread only exists while a profile is being taken.
+
+    Args:
+        interval (float): Seconds between samples
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, profile):
+        with self._lock:
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="newsaroo-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self, profile):
+        with self._lock:
+            self._active.discard(profile)
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                # Profiles left running by a stuck request stop after max_seconds
+                expired = {p for p in self._active if time.monotonic() - p.started > PROFILING_CONFIG["max_seconds"]}
+                self._active -= expired
+                if not self._active:
+                    self._thread = None
+                    return
+                active = list(self._active)
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = f"{names.get(ident, ident)};{folded_stack(frame)}"
+                for profile in active:
+                    profile.stacks[stack] += 1
+            for profile in active:
+                profile.samples += 1
+            time.sleep(self.interval)
+
+
+_sampler = None
+
+
+def _get_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = StackSampler(PROFILING_CONFIG["sample_interval"])
+    return _sampler
+
+
+def start_profile(method, path):
+    """Start sampling every thread for one request
+
+    Returns:
+        Profile: Filled in as samples are taken until finish_profile()
+    """
+    profile = Profile(method, path)
+    _get_sampler().start(profile)
+    return profile
+
+
+def finish_profile(profile):
+    """Stop sampling for profile; calling it again has no effect"""
+    if profile.duration is not None:
+        return
+    _get_sampler().stop(profile)
+    profile.duration = time.monotonic() - profile.started
+    PROFILES_TAKEN.inc()
+
+
+def save_profile(profile):
+    """Write a profile to the profile directory, where every worker can serve it
+
+    Older profiles beyond PROFILING_CONFIG["keep"] are removed.
+
+    Returns:
+        str: The file written, or None if it could not be written
+    """
+    directory = PROFILING_CONFIG["dir"]
+    path = os.path.join(directory, f"{profile.id}.folded")
+    header = (f"# {profile.method} {profile.path} status={profile.status} "
+              f"duration_ms={profile.duration * 1000:.1f} samples={profile.samples}\n")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(header + profile.folded())
+        os.replace(tmp_path, path)
+        for old in list_profiles()[PROFILING_CONFIG["keep"]:]:
+            os.remove(os.path.join(directory, f"{old['id']}.folded"))
+    except OSError as e:
+        logger.warning("Could not save profile %s to %s: %s", profile.id, directory, e)
+        return None
+    return path
+
+
+def list_profiles():
+    """Saved profiles, newest first
+
+    Returns:
+        list: One dict per profile with id, request and summary from its header line
+    """
+    directory = PROFILING_CONFIG["dir"]
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".folded")]
+    except FileNotFoundError:
+        return []
+    entries = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            with open(path) as f:
+                header = f.readline()
+            modified = os.path.getmtime(path)
+        except OSError:
+            continue  # Removed by another worker meanwhile
+        fields = header.lstrip("# ").split()
+        entries.append({
+            "id": name[:-len(".folded")],
+            "request": " ".join(fields[:2]),
+            **dict(field.split("=", 1) for field in fields[2:] if "=" in field),
+            "saved_at": modified,
+        })
+    return sorted(entries, key=lambda entry: entry["saved_at"], reverse=True)
+
+
+def read_profile(profile_id):
+    """The folded stacks of a saved profile, or None if there is no such profile"""
+    if not profile_id.isalnum():
+        return None
+    try:
+        with open(os.path.join(PROFILING_CONFIG["dir"], f"{profile_id}.folded")) as f:
+            return "".join(line for line in f if not line.startswith("#"))
+    except FileNotFoundError:
+        return None
+
+
+class LoopLagMonitor:
+    """Records event-loop stalls and what the loop was running during them
+
+    A coroutine on the loop checks in every interval. A watchdog thread
+    notices when it is overdue by more than threshold and grabs the loop
+    thread's stack while the stall is still in progress.
+
+    Args:
+        threshold (float): Seconds of lag recorded as a stall
+        interval (float): Seconds between check-ins
+        keep (int): Latest stalls kept
+    """
+
+    def __init__(self, threshold, interval, keep):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = collections.deque(maxlen=keep)
+        self._beat = time.monotonic()
+        self._loop_thread = None
+        self._stack = None
+        self._stopped = threading.Event()
+
+    async def run(self):
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        watchdog = threading.Thread(target=self._watch, name="newsaroo-loop-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                self._beat = time.monotonic()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.monotonic() - self._beat - self.interval)
+                EVENT_LOOP_LAG.observe(lag)
+                if lag >= self.threshold:
+                    self._record(lag)
+        finally:
+            self._stopped.set()
+
+    def _watch(self):
+        while not self._stopped.wait(min(self.interval, self.threshold / 2)):
+            overdue = time.monotonic() - self._beat - self.interval
+            if overdue >= self.threshold and self._stack is None:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._stack = folded_stack(frame)
+
+    def _record(self, lag):
+        stack, self._stack = self._stack, None
+        EVENT_LOOP_STALLS.inc()
+        frames = stack.split(";") if stack else []
+        self.stalls.append({
+            "at": round(time.time() - lag, 3),
+            "lag_ms": round(lag * 1000, 1),
+            "stack": frames,
+        })
+        logger.warning("Event loop stalled for %.0f ms in %s", lag * 1000,
+                       " <- ".join(reversed(frames[-3:])) or "an unknown frame")
+
+
+_monitor = None
+
+
+def get_loop_monitor():
+    """Get the worker's event-loop lag monitor, or None when it is disabled"""
+    return _monitor
+
+
+def start_loop_monitor():
+    """Start the event-loop lag monitor in the background if it is enabled
+
+    Returns:
+        asyncio.Task: The monitoring task, or None when the monitor is disabled
+    """
+    global _monitor
+    if not PROFILING_CONFIG["loop_monitor"]:
+        return None
+    _monitor = LoopLagMonitor(PROFILING_CONFIG["stall_threshold"], PROFILING_CONFIG["loop_interval"],
+                              PROFILING_CONFIG["keep_stalls"])
+    return asyncio.create_task(_monitor.run())
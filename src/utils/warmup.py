@@ -0,0 +1,58 @@
+"""
+Startup warm-up for the Newsaroo API.
+Slow client libraries are imported lazily so the server starts answering
+quickly; this pays for them in the background instead of on the first request.
+"""
+
+import asyncio
+import logging
+import time
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def _import_clients():
+    # Runs on an executor thread: these imports take seconds and would stall the event loop
+    from ..news.summary import load_litellm
+    import httpx  # noqa: F401
+    import bs4  # noqa: F401
+    import serpapi.google_search  # noqa: F401
+    load_litellm()
+
+
+async def warm_up():
+    """Import client libraries and open connections before the first request needs them
+
+    Every step is best effort: a failure is logged and the request path retries
+    it on demand as it would without warm-up.
+    """
+    from ..db.article_store import get_article_store
+    from ..db.supabase_client import get_supabase_client
+    from ..news.fetch_scheduler import get_fetch_scheduler
+    from ..config import settings
+    from .cache import get_cache
+
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    steps = [
+        ("client imports", lambda: loop.run_in_executor(None, _import_clients)),
+        ("fetch statistics", lambda: loop.run_in_executor(None, get_fetch_scheduler)),
+    ]
+    if settings.SUPABASE_API_URL and settings.SUPABASE_API_KEY:
+        steps.append(("supabase client", lambda: loop.run_in_executor(None, get_supabase_client)))
+    cache = get_cache()
+    if cache is not None:
+        # Opens the database connection on the cache thread
+        steps.append(("cache", cache.purge_expired))
+    store = get_article_store()
+    if store is not None:
+        steps.append(("article store", store.compact))
+    for name, step in steps:
+        try:
+            await step()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Warm-up step '%s' failed: %s", name, e)
+    logger.info("Warm-up finished in %.0f ms", (time.perf_counter() - start) * 1000)
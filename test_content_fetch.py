@@ -25,7 +25,7 @@ async def test_enhanced_content():
     logger.info(f"Found {len(news_results)} news results")
     
     # Check if any articles have full_content
-    articles_with_content = [article for article in news_results if "full_content" in article]
+    articles_with_content = [article for article in news_results if article.has_full_content]
     logger.info(f"Articles with full content: {len(articles_with_content)} out of {len(news_results)}")
     
     # Step 2: Process the news results
@@ -39,10 +39,10 @@ async def test_enhanced_content():
     
     # Print content length for each article
     for i, article in enumerate(processed_articles):
-        content_length = len(article["content"])
-        logger.info(f"Article {i+1}: '{article['title']}' - Content length: {content_length} chars")
+        content_length = len(article.content)
+        logger.info(f"Article {i+1}: '{article.title}' - Content length: {content_length} chars")
         # Print first 100 chars of content
-        logger.info(f"Content preview: {article['content'][:100]}...")
+        logger.info(f"Content preview: {article.content[:100]}...")
     
     # Step 3: Generate summary
     summary = await summarize_with_llm(processed_articles, topic)
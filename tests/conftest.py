@@ -0,0 +1,17 @@
+"""
+Shared test configuration.
+Points the application at harmless settings before any src module is imported.
+"""
+
+import os
+
+os.environ.setdefault("SERP_API_KEY", "test-serpapi-key")
+os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ.setdefault("NEWSAROO_LOG_FILE", "")
+os.environ.setdefault("NEWSAROO_CACHE_ENABLED", "false")
+os.environ.setdefault("NEWSAROO_FETCH_STATS_PATH", "")
+os.environ.setdefault("NEWSAROO_SERP_USAGE_PATH", "")
+os.environ.setdefault("NEWSAROO_ARTICLE_STORE_ENABLED", "false")
+os.environ.setdefault("NEWSAROO_WARMUP", "false")
+os.environ.setdefault("NEWSAROO_FEEDS", "")
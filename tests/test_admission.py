@@ -0,0 +1,95 @@
+"""
+Tests for admission control on the pipeline routes.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import admission
+from src.api.admission import AdmissionController, Overloaded
+from src.utils.metrics import ADMISSION_REJECTED
+
+
+def test_requests_beyond_limit_wait_in_fifo_order():
+    async def main():
+        controller = AdmissionController("test_fifo", max_concurrent=1, max_queue=5, queue_timeout=1)
+        order = []
+
+        async def request(name):
+            await controller.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            controller.release(0.01)
+
+        await asyncio.gather(*(request(i) for i in range(4)))
+        return order, controller
+
+    order, controller = asyncio.run(main())
+    assert order == [0, 1, 2, 3]
+    assert controller.active == 0
+    assert controller.queue_depth == 0
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def main():
+        controller = AdmissionController("test_full", max_concurrent=1, max_queue=1, queue_timeout=1)
+        await controller.acquire()
+        queued = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as rejected:
+            await controller.acquire()
+        controller.release(2.0)
+        await queued
+        controller.release(2.0)
+        return rejected.value, controller
+
+    rejected, controller = asyncio.run(main())
+    assert rejected.reason == "queue_full"
+    assert rejected.retry_after >= 1
+    assert controller.active == 0
+    assert ADMISSION_REJECTED.get(route="test_full", reason="queue_full") == 1
+
+
+def test_queued_request_times_out():
+    async def main():
+        controller = AdmissionController("test_timeout", max_concurrent=1, max_queue=1, queue_timeout=0.05)
+        await controller.acquire()
+        with pytest.raises(Overloaded) as rejected:
+            await controller.acquire()
+        return rejected.value, controller
+
+    rejected, controller = asyncio.run(main())
+    assert rejected.reason == "queue_timeout"
+    assert controller.queue_depth == 0
+    assert controller.active == 1
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def main():
+        controller = AdmissionController("test_cancel", max_concurrent=1, max_queue=2, queue_timeout=1)
+        await controller.acquire()
+        waiting = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.sleep(0)
+        controller.release()
+        return controller
+
+    controller = asyncio.run(main())
+    assert controller.active == 0
+    assert controller.queue_depth == 0
+
+
+def test_route_returns_429_when_overloaded(monkeypatch):
+    from src.main import app
+
+    controller = AdmissionController("news_summarize", max_concurrent=1, max_queue=0, queue_timeout=1)
+    controller.active = 1  # the only slot is taken
+    monkeypatch.setitem(admission._controllers, "news_summarize", controller)
+
+    response = TestClient(app).post("/api/v1/news/summarize", json={"topic": "ai"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
@@ -0,0 +1,90 @@
+"""
+Tests for the local article store.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.db import article_store
+from src.db.article_store import ArticleStore, canonical_url
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setitem(article_store.ARTICLE_STORE_CONFIG, "enabled", True)
+    monkeypatch.setitem(article_store.ARTICLE_STORE_CONFIG, "compact_probability", 0)
+    monkeypatch.setattr(article_store, "_store", ArticleStore(str(tmp_path / "articles.sqlite3")))
+    return article_store.get_article_store()
+
+
+def test_canonical_url_ignores_tracking_and_cosmetic_differences():
+    assert canonical_url("HTTPS://WWW.News.example/a/story/?utm_source=x&b=2&a=1#top") == \
+        "https://news.example/a/story?a=1&b=2"
+    assert canonical_url("https://news.example/a/story?a=1&b=2&fbclid=abc") == \
+        canonical_url("https://news.example/a/story/?b=2&a=1")
+
+
+def test_put_get_and_search(store):
+    async def main():
+        await store.put("https://www.a.example/mars?utm_medium=rss", "Rover finds ancient riverbed on Mars",
+                        title="Mars rover", source="Space Daily", published="2 hours ago")
+        await store.put("https://b.example/markets", "Stocks rally as rates fall", title="Markets")
+        hit = await store.get("https://a.example/mars")
+        results = await store.search("ancient riverbed")
+        odd_query = await store.search('rover "AND" -mars:')
+        return hit, results, odd_query
+
+    hit, results, odd_query = asyncio.run(main())
+    assert hit["title"] == "Mars rover" and hit["source"] == "Space Daily"
+    assert [result["url"] for result in results] == ["https://a.example/mars"]
+    assert "[ancient]" in results[0]["snippet"]
+    assert odd_query == []
+
+
+def test_compaction_applies_retention_and_size_limit(store, monkeypatch):
+    store.max_articles = 2
+
+    async def main():
+        for i in range(4):
+            await store.put(f"https://n.example/{i}", f"story number {i}")
+        # Age the first article past the retention period
+        await store._run(lambda: store._connection().execute(
+            "UPDATE articles SET fetched_at = ? WHERE url = ?", (time.time() - 30 * 86400, "https://n.example/0")))
+        removed = await store.compact()
+        remaining = [await store.get(f"https://n.example/{i}") for i in range(4)]
+        return removed, remaining, await store.search("story")
+
+    removed, remaining, results = asyncio.run(main())
+    assert removed == 2
+    assert [record is not None for record in remaining] == [False, False, True, True]
+    assert len(results) == 2
+
+
+def test_search_reuses_stored_articles_across_topics(store, monkeypatch):
+    from src.main import app
+    from src.news import search
+
+    fetched = []
+
+    async def fake_serp(params):
+        return {"news_results": [{"title": "Shared story", "link": "https://s.example/shared",
+                                  "source": {"name": "Wire"}, "date": "1 hour ago"}]}
+
+    async def fake_fetch_page(url, timeout):
+        fetched.append(url)
+        return "quantum computing breakthrough announced"
+
+    monkeypatch.setattr(search, "_serp_search", fake_serp)
+    monkeypatch.setattr(search, "_fetch_page", fake_fetch_page)
+
+    for topic in ("AI", "technology"):
+        results = asyncio.run(search.search_news(topic, api_key="key"))
+        assert results[0].full_content == "quantum computing breakthrough announced"
+    assert fetched == ["https://s.example/shared"]
+
+    response = TestClient(app).get("/api/v1/articles/search", params={"q": "quantum"})
+    assert response.status_code == 200
+    assert response.json()["results"][0]["source"] == "Wire"
@@ -0,0 +1,68 @@
+"""
+Tests for the batch summarize endpoint.
+"""
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+
+def test_batch_streams_in_completion_order_and_shares_fetches(monkeypatch):
+    from src.api import routes
+    from src.news import summary
+    from src.main import app
+    from src.news import search
+
+    fetched = []
+    delays = {"slow": 0.3, "fast": 0.0, "also fast": 0.05}
+
+    async def fake_fetch_page(url, timeout):
+        fetched.append(url)
+        await asyncio.sleep(0.01)
+        return f"content of {url}"
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        if topic == "nothing":
+            return []
+        await asyncio.sleep(delays[topic])
+        links = ["https://shared.example/story", f"https://{topic.replace(' ', '-')}.example/story"]
+        return [
+            {"title": link, "link": link, "source": {"name": "Daily"}, "snippet": "snippet",
+             "full_content": await search.fetch_article_content(link)}
+            for link in links
+        ]
+
+    async def fake_summarize(articles, topic, model=None, max_tokens=None, latency_target=None):
+        return f"summary of {topic}"
+
+    monkeypatch.setattr(search, "_fetch_page", fake_fetch_page)
+    monkeypatch.setattr(routes, "search_news", fake_search)
+    monkeypatch.setattr(summary, "summarize_with_llm", fake_summarize)
+
+    response = TestClient(app).post("/api/v1/news/summarize/batch", json={"requests": [
+        {"topic": "slow"}, {"topic": "fast"}, {"topic": "nothing"}, {"topic": "also fast", "include_timings": True},
+    ]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results, done = lines[:-1], lines[-1]
+
+    assert [line["topic"] for line in results][-1] == "slow"
+    assert {line["topic"]: line["status"] for line in results} == {
+        "slow": 200, "fast": 200, "nothing": 404, "also fast": 200,
+    }
+    by_topic = {line["topic"]: line for line in results}
+    assert by_topic["fast"]["index"] == 1
+    assert by_topic["fast"]["result"]["summary"] == "summary of fast"
+    assert "timings" in by_topic["also fast"]["result"]["metadata"]
+    assert done == {**done, "done": True, "count": 4, "failed": 1, "duplicate_fetches_avoided": 2}
+    assert fetched.count("https://shared.example/story") == 1
+    assert len(fetched) == 4
+
+
+def test_batch_rejects_empty_request():
+    from src.main import app
+
+    assert TestClient(app).post("/api/v1/news/summarize/batch", json={"requests": []}).status_code == 422
@@ -0,0 +1,31 @@
+"""
+Tests for the benchmark result helpers.
+"""
+
+from benchmarks.report import percentile, summarize_latencies
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+
+
+def test_percentile_small_samples():
+    assert percentile([], 50) is None
+    assert percentile([7], 99) == 7
+    assert percentile([1, 2], 50) == 1
+    assert percentile([1, 2, 3, 4], 75) == 3
+
+
+def test_summarize_latencies_throughput():
+    summary = summarize_latencies([10.0, 20.0, 30.0, 40.0], elapsed_s=2)
+
+    assert summary["count"] == 4
+    assert summary["mean_ms"] == 25.0
+    assert summary["p50_ms"] == 20.0
+    assert summary["max_ms"] == 40.0
+    assert summary["throughput_per_s"] == 2.0
@@ -0,0 +1,133 @@
+"""
+Tests for the shared SQLite cache.
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils import cache as cache_module
+from src.utils.cache import SharedCache
+
+
+@pytest.fixture(autouse=True)
+def fast_leases(monkeypatch):
+    monkeypatch.setitem(cache_module.CACHE_CONFIG, "lease_poll_interval", 0.01)
+    monkeypatch.setitem(cache_module.CACHE_CONFIG, "lease_ttl", 5)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+class Counter:
+    def __init__(self, result, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+def test_entries_expire_after_ttl(path):
+    async def main():
+        cache = SharedCache(path)
+        await cache.set("serp", "k", {"v": 1}, ttl=0.05)
+        assert await cache.get("serp", "k") == {"v": 1}
+        await asyncio.sleep(0.1)
+        return await cache.get("serp", "k")
+
+    assert asyncio.run(main()) is None
+
+
+def test_concurrent_callers_share_one_computation(path):
+    compute = Counter({"summary": "text"}, delay=0.05)
+
+    async def main():
+        cache = SharedCache(path)
+        results = await asyncio.gather(*(cache.get_or_compute("summary", "k", compute, 60) for _ in range(5)))
+        again = await cache.get_or_compute("summary", "k", compute, 60)
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert compute.calls == 1
+    assert results == [{"summary": "text"}] * 5
+    assert again == {"summary": "text"}
+
+
+def test_none_and_uncacheable_results_are_not_stored(path):
+    empty = Counter(None)
+    failed = Counter({"error": "quota"})
+
+    async def main():
+        cache = SharedCache(path)
+        for _ in range(2):
+            await cache.get_or_compute("article", "k", empty, 60)
+            await cache.get_or_compute("serp", "k", failed, 60, cacheable=lambda r: "error" not in r)
+
+    asyncio.run(main())
+    assert empty.calls == 2
+    assert failed.calls == 2
+
+
+def test_failed_computation_releases_lease(path):
+    async def broken():
+        raise RuntimeError("upstream down")
+
+    async def main():
+        cache = SharedCache(path)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("serp", "k", broken, 60)
+        other = SharedCache(path)
+        return await other._run(other._try_lease, "serp:k", 5)
+
+    assert asyncio.run(main()) is True
+
+
+def test_waiter_uses_value_published_by_lease_holder(path):
+    compute = Counter("computed by waiter")
+
+    async def main():
+        holder, waiter = SharedCache(path), SharedCache(path)
+        assert await holder._run(holder._try_lease, "summary:k", 5)
+        waiting = asyncio.create_task(waiter.get_or_compute("summary", "k", compute, 60))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        await holder.set("summary", "k", "computed by holder", 60)
+        await holder._run(holder._release_lease, "summary:k")
+        return await waiting
+
+    assert asyncio.run(main()) == "computed by holder"
+    assert compute.calls == 0
+
+
+def test_waiter_takes_over_released_lease(path):
+    compute = Counter("computed by waiter")
+
+    async def main():
+        holder, waiter = SharedCache(path), SharedCache(path)
+        assert await holder._run(holder._try_lease, "summary:k", 5)
+        waiting = asyncio.create_task(waiter.get_or_compute("summary", "k", compute, 60))
+        await asyncio.sleep(0.05)
+        # The holder gave up without publishing a value
+        await holder._run(holder._release_lease, "summary:k")
+        return await waiting
+
+    assert asyncio.run(main()) == "computed by waiter"
+    assert compute.calls == 1
+
+
+def test_cached_bypasses_cache_when_disabled(monkeypatch):
+    monkeypatch.setitem(cache_module.CACHE_CONFIG, "enabled", False)
+    compute = Counter("fresh")
+
+    async def main():
+        await cache_module.cached("serp", "k", compute)
+        return await cache_module.cached("serp", "k", compute)
+
+    assert asyncio.run(main()) == "fresh"
+    assert compute.calls == 2
@@ -0,0 +1,75 @@
+"""
+Tests for the CLI batch mode.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+
+import pytest
+
+from src import cli
+from src.utils.metrics import span
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    calls = []
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        calls.append(topic)
+        with span("serpapi.search", kind="outbound"):
+            await asyncio.sleep(0.05 if topic == "slow" else 0)
+        if topic == "broken":
+            raise RuntimeError("search failed")
+        return [] if topic == "empty" else [{"title": topic, "snippet": "s", "source": "Daily"}]
+
+    async def fake_process(news_results, max_articles=None):
+        return [{"title": article["title"], "content": "c"} for article in news_results]
+
+    async def fake_summarize(articles, topic, model=None, max_tokens=None):
+        return f"summary of {topic}"
+
+    monkeypatch.setattr(cli, "search_news", fake_search)
+    monkeypatch.setattr(cli, "process_news_results", fake_process)
+    monkeypatch.setattr(cli, "summarize_with_llm", fake_summarize)
+    return calls
+
+
+def test_read_topics_skips_comments_blanks_and_repeats():
+    source = io.StringIO("climate\n\n# comment\nmarkets\nclimate\n  space  \n")
+    assert cli.read_topics(source) == ["climate", "markets", "space"]
+
+
+def test_run_batch_writes_one_line_per_topic(pipeline):
+    output = io.StringIO()
+
+    failed = asyncio.run(cli.run_batch(["slow", "fast", "empty", "broken"], output, concurrency=4))
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert failed == 2
+    assert records[-1]["topic"] == "slow"
+    by_topic = {record["topic"]: record for record in records}
+    assert by_topic["fast"]["status"] == "ok"
+    assert by_topic["fast"]["summary"] == "summary of fast"
+    assert by_topic["empty"]["status"] == "no_results"
+    assert by_topic["broken"]["status"] == "error"
+    assert [entry["span"] for entry in by_topic["fast"]["timings"]] == ["serpapi.search"]
+
+
+def test_resume_skips_topics_already_written(pipeline, tmp_path):
+    output = tmp_path / "summaries.jsonl"
+    output.write_text(json.dumps({"topic": "climate", "status": "ok"}) + "\n" + '{"topic": "mark')
+    topics = tmp_path / "topics.txt"
+    topics.write_text("climate\nmarkets\n")
+    args = argparse.Namespace(batch=str(topics), output=str(output), resume=True, concurrency=2,
+                              time_period=None, max_articles=None)
+
+    assert cli.batch_main(args) == 0
+
+    assert pipeline == ["markets"]
+    lines = output.read_text().splitlines()
+    assert json.loads(lines[0])["topic"] == "climate"
+    assert json.loads(lines[-1])["topic"] == "markets"
+    assert cli.completed_topics(str(output)) == {"climate", "markets"}
@@ -0,0 +1,130 @@
+"""
+Tests for conditional summary responses: ETags, 304s, Cache-Control and compression.
+"""
+
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import conditional
+from src.news.records import ArticleRecord
+
+
+def _article(link, content):
+    return ArticleRecord(f"Story {link}", link=link, source={"name": "Daily"}, full_content=content)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    from src.api import routes
+    from src.news import summary
+
+    state = {"articles": [_article("https://a.example/1", "launch " * 200)], "summary": "1. Launch", "renders": 0}
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        return list(state["articles"])
+
+    async def fake_summarize(articles, topic, model=None, max_tokens=None, latency_target=None):
+        return state["summary"]
+
+    class FakeSupabase:
+        async def get_user(self, mobile):
+            return {"mobile_number": mobile, "topics_of_interest": ["space"]}
+
+    encode = conditional.encode
+
+    def counting_encode(content, model=None):
+        state["renders"] += 1
+        return encode(content, model)
+
+    monkeypatch.setattr(routes, "search_news", fake_search)
+    monkeypatch.setattr(summary, "summarize_with_llm", fake_summarize)
+    monkeypatch.setattr(routes, "summarize_with_llm", fake_summarize)
+    monkeypatch.setattr(routes, "get_supabase_client", lambda: FakeSupabase())
+    monkeypatch.setattr(conditional, "encode", counting_encode)
+    return state
+
+
+@pytest.fixture
+def client():
+    from src.main import app
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("poll", [
+    lambda client, headers: client.post("/api/v1/news/summarize", json={"topic": "space"}, headers=headers),
+    lambda client, headers: client.get("/api/v1/users/9876543210/summaries", headers=headers),
+])
+def test_unchanged_summary_is_not_modified(upstream, client, poll):
+    first = poll(client, {"Accept-Encoding": "identity"})
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('"') and not etag.startswith("W/")
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = poll(client, {"If-None-Match": etag, "Accept-Encoding": "identity"})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+    # The 304 never serialized a response body
+    assert upstream["renders"] == 1
+
+    upstream["summary"] = "1. Launch delayed"
+    changed = poll(client, {"If-None-Match": etag, "Accept-Encoding": "identity"})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_etag_follows_article_content(upstream, client):
+    etag = client.get("/api/v1/users/9876543210/summaries").headers["etag"]
+    upstream["articles"] = [_article("https://a.example/1", "launch " * 199 + "scrubbed")]
+    assert client.get("/api/v1/users/9876543210/summaries").headers["etag"] != etag
+
+
+def test_large_bodies_are_compressed_with_a_tag_per_coding(upstream, client, monkeypatch):
+    monkeypatch.setitem(conditional.RESPONSE_CONFIG, "compress_min_bytes", 100)
+    monkeypatch.setattr(conditional, "ENCODINGS", ("gzip",))
+    upstream["summary"] = "1. Launch " * 50
+
+    plain = client.post("/api/v1/news/summarize", json={"topic": "space"}, headers={"Accept-Encoding": "identity"})
+    compressed = client.post("/api/v1/news/summarize", json={"topic": "space"}, headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert compressed.json()["summary"] == plain.json()["summary"]
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    # Either tag revalidates, and the 304 names the representation the client holds
+    again = client.post("/api/v1/news/summarize", json={"topic": "space"},
+                        headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]})
+    assert again.status_code == 304 and again.headers["etag"] == compressed.headers["etag"]
+
+
+def test_small_bodies_are_not_compressed(upstream, client, monkeypatch):
+    monkeypatch.setitem(conditional.RESPONSE_CONFIG, "compress_min_bytes", 1 << 20)
+    response = client.post("/api/v1/news/summarize", json={"topic": "space"}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_cache_control_follows_summary_ttl(upstream, client, monkeypatch):
+    monkeypatch.setitem(conditional.CACHE_CONFIG, "enabled", True)
+    monkeypatch.setitem(conditional.CACHE_CONFIG["ttl"], "summary", 600)
+    response = client.get("/api/v1/users/9876543210/summaries")
+    assert response.headers["cache-control"] == "private, max-age=600"
+
+
+def test_timed_responses_are_not_tagged(upstream, client):
+    response = client.post("/api/v1/news/summarize", json={"topic": "space", "include_timings": True})
+    assert response.status_code == 200 and "etag" not in response.headers
+
+
+def test_matching_tag_and_encoding_negotiation():
+    assert conditional.matching_tag('W/"abc", "def-gzip"', '"def"') == '"def-gzip"'
+    assert conditional.matching_tag('"abc"', '"def"') is None
+    assert conditional.matching_tag("*", '"def"') == '"def"'
+    assert conditional.negotiate_encoding("gzip;q=0, deflate") is None
+    assert conditional.negotiate_encoding("*") == conditional.ENCODINGS[0]
+    assert conditional.negotiate_encoding(None) is None
+
+
+def test_gzip_output_is_deterministic():
+    body = b'{"summary": "' + b"x" * 2000 + b'"}'
+    assert conditional.compress(body, "gzip") == conditional.compress(body, "gzip")
+    assert gzip.decompress(conditional.compress(body, "gzip")) == body
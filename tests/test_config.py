@@ -0,0 +1,45 @@
+"""
+Tests for lazy settings and cold-start import cost.
+"""
+
+import subprocess
+import sys
+
+from src import config
+
+
+def test_settings_are_read_on_first_use_and_reload(monkeypatch):
+    settings = config.Settings()
+    assert settings._values is None
+
+    monkeypatch.setenv("NEWSAROO_PORT", "9123")
+    assert settings.SERVER_CONFIG["port"] == 9123
+    monkeypatch.setenv("NEWSAROO_PORT", "9124")
+    assert settings.SERVER_CONFIG["port"] == 9123
+
+    settings.reload()
+    assert settings.SERVER_CONFIG["port"] == 9124
+
+
+def test_module_attributes_resolve_through_settings():
+    assert config.CACHE_CONFIG is config.settings.CACHE_CONFIG
+    assert not hasattr(config, "not_a_setting")
+    assert not hasattr(config.settings, "NOT_A_SETTING")
+
+
+def _imported_after(statement):
+    code = f"import sys; {statement}; print(' '.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_importing_config_does_not_read_the_environment():
+    modules = _imported_after("import src.config as c; assert c.settings._values is None")
+    assert "dotenv" not in modules
+
+
+def test_entry_points_do_not_import_slow_client_libraries():
+    for statement in ("import src.cli", "import src.main"):
+        modules = _imported_after(statement)
+        for slow in ("litellm", "supabase", "serpapi", "bs4"):
+            assert slow not in modules, f"{statement} imports {slow}"
@@ -0,0 +1,110 @@
+"""
+Tests for degraded mode and extractive summaries.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.news import summary
+from src.news.extractive import extractive_summary, key_sentence
+from src.news.records import ArticleRecord
+
+ARTICLES = [
+    ArticleRecord("Central bank raises rates", source="Wire", full_content=(
+        "Markets opened lower on Tuesday. The central bank raised interest rates by half a point to curb inflation, "
+        "its largest increase in a decade. Analysts had expected a smaller move.")),
+    ArticleRecord("Central Bank Raises Rates", source="Copy", full_content="Syndicated copy of the same story."),
+    ArticleRecord("Mortgage costs climb", source="Daily", snippet="Lenders passed the higher interest rates on to "
+                  "borrowers within hours, pushing mortgage costs to a new high."),
+    ArticleRecord("Stocks slide", source="Ledger"),
+    ArticleRecord("Bond yields jump", source="Ledger"),
+]
+
+
+def test_key_sentence_prefers_topic_words():
+    sentence = key_sentence(ARTICLES[0].content, ARTICLES[0].title, {"interest", "rates"})
+    assert sentence.startswith("The central bank raised interest rates")
+
+
+def test_extractive_summary_lists_three_distinct_stories():
+    text = extractive_summary(ARTICLES, "interest rates")
+    lines = text.splitlines()
+    assert lines[0] == "1. Central bank raises rates (Wire)"
+    assert "raised interest rates" in lines[1]
+    assert lines[2] == "2. Mortgage costs climb (Daily)"
+    assert lines[-1] == "3. Stocks slide (Ledger)"
+
+
+@pytest.fixture
+def app_with(monkeypatch):
+    from src.api import routes
+    from src.main import app
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        return list(ARTICLES)
+
+    monkeypatch.setattr(routes, "search_news", fake_search)
+    monkeypatch.setitem(summary.DEGRADED_CONFIG, "enabled", True)
+    monkeypatch.setitem(summary.DEGRADED_CONFIG, "slo", 0.5)
+    monkeypatch.setitem(summary.DEGRADED_CONFIG, "min_llm_seconds", 0.05)
+
+    def install(llm):
+        monkeypatch.setattr(summary, "summarize_with_llm", llm)
+        monkeypatch.setattr(routes, "summarize_with_llm", llm)
+        return app
+    return install
+
+
+def test_slow_llm_degrades_within_the_slo(app_with):
+    async def slow_llm(articles, topic, model=None, max_tokens=None, latency_target=None):
+        await asyncio.sleep(5)
+        return "1. LLM"
+
+    start = time.perf_counter()
+    response = TestClient(app_with(slow_llm)).post("/api/v1/news/summarize", json={"topic": "interest rates"})
+    assert time.perf_counter() - start < 2
+    assert response.status_code == 200
+    body = response.json()
+    assert body["metadata"]["degraded"] is True and body["metadata"]["degraded_reason"] == "deadline"
+    assert body["summary"].startswith("1. Central bank raises rates")
+
+
+def test_llm_error_degrades_instead_of_failing(app_with, monkeypatch):
+    async def broken_llm(articles, topic, model=None, max_tokens=None, latency_target=None):
+        raise Exception("Error in summarization: upstream unavailable")
+
+    client = TestClient(app_with(broken_llm))
+    response = client.post("/api/v1/news/summarize", json={"topic": "interest rates"})
+    assert response.status_code == 200
+    assert response.json()["metadata"]["degraded_reason"] == "error"
+
+    monkeypatch.setitem(summary.DEGRADED_CONFIG, "enabled", False)
+    assert client.post("/api/v1/news/summarize", json={"topic": "interest rates"}).status_code == 500
+
+
+def test_late_llm_summary_upgrades_the_cache(app_with, monkeypatch, tmp_path):
+    from src.utils import cache
+
+    monkeypatch.setitem(cache.CACHE_CONFIG, "enabled", True)
+    monkeypatch.setitem(cache.CACHE_CONFIG, "path", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cache, "_cache", None)
+    calls = []
+
+    async def slow_complete(model, messages, max_tokens):
+        calls.append(model)
+        await asyncio.sleep(0.8)
+        return "1. From the LLM"
+
+    monkeypatch.setattr(summary, "_complete", slow_complete)
+    with TestClient(app_with(summary.summarize_with_llm)) as client:
+        first = client.post("/api/v1/news/summarize", json={"topic": "interest rates"}).json()
+        assert first["metadata"]["degraded"] is True
+        # The abandoned LLM call finishes in the background and fills the summary cache
+        time.sleep(1.0)
+        second = client.post("/api/v1/news/summarize", json={"topic": "interest rates"}).json()
+
+    assert second["metadata"]["degraded"] is False and second["summary"] == "1. From the LLM"
+    assert len(calls) == 1
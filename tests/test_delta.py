@@ -0,0 +1,96 @@
+"""
+Tests for delta digests.
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from src.news import delta
+from src.news.records import ArticleRecord
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.states = {}
+        self.saves = 0
+
+    async def get_user(self, mobile_number):
+        return {"mobile_number": mobile_number, "topics_of_interest": ["space"]}
+
+    async def get_digest_state(self, mobile_number, topic):
+        return self.states.get((mobile_number, topic))
+
+    async def save_digest_state(self, mobile_number, topic, seen_articles, last_summary):
+        self.saves += 1
+        self.states[(mobile_number, topic)] = {"seen_articles": seen_articles, "last_summary": last_summary}
+
+
+def _article(link, content):
+    return ArticleRecord(link, link=link, source={"name": "Daily"}, full_content=content)
+
+
+def test_user_summaries_delta_mode(monkeypatch):
+    from src.api import routes
+    from src.main import app
+
+    supabase = FakeSupabase()
+    upstream = {"articles": [_article("https://a.example/1", "launch"), _article("https://b.example/2", "landing")]}
+    searched_with = []
+    llm_inputs = []
+
+    async def fake_search(topic, api_key=None, time_period=None, skip_urls=None, max_articles=None):
+        searched_with.append(set(skip_urls or ()))
+        return [article for article in upstream["articles"] if article.link not in (skip_urls or ())]
+
+    async def fake_summarize(articles, topic, model=None, max_tokens=None):
+        llm_inputs.append([article.link for article in articles])
+        return f"digest {len(llm_inputs)}"
+
+    monkeypatch.setattr(routes, "get_supabase_client", lambda: supabase)
+    monkeypatch.setattr(delta, "search_news", fake_search)
+    monkeypatch.setattr(delta, "summarize_with_llm", fake_summarize)
+    client = TestClient(app)
+
+    first = client.get("/api/v1/users/9000000001/summaries?delta=true").json()
+    assert first["summaries"] == [{"topic": "space", "summary": "digest 1", "status": "new"}]
+
+    # Nothing new: no LLM call, previous digest returned with the marker
+    second = client.get("/api/v1/users/9000000001/summaries?delta=true").json()
+    assert second["summaries"] == [{"topic": "space", "summary": "digest 1", "status": "no_new_developments"}]
+    assert searched_with[1] == {"https://a.example/1", "https://b.example/2"}
+    assert len(llm_inputs) == 1 and supabase.saves == 1
+
+    # A new link and a syndicated copy of a seen story: only the new one is summarized
+    upstream["articles"] += [_article("https://c.example/3", "docking"), _article("https://mirror.example/1", "launch")]
+    upstream["articles"][-1].title = "https://a.example/1"
+    third = client.get("/api/v1/users/9000000001/summaries?delta=true").json()
+    assert third["summaries"][0]["status"] == "new"
+    assert llm_inputs[-1] == ["https://c.example/3"]
+
+
+def test_remember_keeps_most_recent_entries():
+    fresh = [(ArticleRecord("t", link=f"https://x.example/{i}"), f"h{i}") for i in range(5)]
+    seen = delta.remember({"https://old.example": "h"}, fresh, limit=3)
+    assert list(seen) == ["https://x.example/2", "https://x.example/3", "https://x.example/4"]
+
+
+def test_search_skips_seen_links_before_fetching(monkeypatch):
+    from src.news import search
+
+    fetched = []
+
+    async def fake_serp(params):
+        return {"news_results": [{"title": "t", "link": f"https://n.example/{i}"} for i in range(3)]}
+
+    async def fake_fetch(url, timeout=None, article=None):
+        fetched.append(url)
+        return "body"
+
+    monkeypatch.setattr(search, "_serp_search", fake_serp)
+    monkeypatch.setattr(search, "fetch_article_content", fake_fetch)
+
+    results = asyncio.run(search.search_news("news", api_key="key", skip_urls={"https://n.example/1"}))
+
+    assert [article.link for article in results] == ["https://n.example/0", "https://n.example/2"]
+    assert fetched == ["https://n.example/0", "https://n.example/2"]
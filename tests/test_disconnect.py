@@ -0,0 +1,101 @@
+"""
+Tests for cancelling work when the client disconnects.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.utils import cache as cache_module
+from src.utils.cache import SharedCache
+from src.utils.metrics import CANCELLED_WORK, span
+
+
+async def _call(app, path, body, disconnect_after):
+    """Send a POST through the ASGI app and disconnect after the given delay"""
+    sent = []
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80), "root_path": "",
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+def test_disconnect_cancels_pipeline(monkeypatch):
+    from src.api import routes
+    from src.main import app
+
+    state = {"started": False, "finished": False, "cancelled": False}
+
+    async def slow_search(topic, api_key=None, time_period=None, max_articles=None):
+        state["started"] = True
+        try:
+            with span("test.disconnect.fetch", kind="outbound"):
+                await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        state["finished"] = True
+        return []
+
+    monkeypatch.setattr(routes, "search_news", slow_search)
+    before = CANCELLED_WORK.get(span="test.disconnect.fetch")
+
+    sent = asyncio.run(asyncio.wait_for(
+        _call(app, "/api/v1/news/summarize", {"topic": "ai"}, disconnect_after=0.1), timeout=3
+    ))
+
+    assert state == {"started": True, "finished": False, "cancelled": True}
+    assert CANCELLED_WORK.get(span="test.disconnect.fetch") == before + 1
+    assert not any(message["type"] == "http.response.start" for message in sent)
+
+
+@pytest.mark.parametrize("finish_abandoned", [False, True])
+def test_abandoned_cache_fill(tmp_path, monkeypatch, finish_abandoned):
+    monkeypatch.setitem(cache_module.CACHE_CONFIG, "lease_poll_interval", 0.01)
+    progress = []
+
+    async def compute():
+        progress.append("started")
+        await asyncio.sleep(0.1)
+        progress.append("finished")
+        return "value"
+
+    async def main():
+        cache = SharedCache(str(tmp_path / "cache.sqlite3"))
+        callers = [
+            asyncio.create_task(cache.get_or_compute("summary", "k", compute, 60, finish_abandoned=finish_abandoned))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        callers[0].cancel()
+        await asyncio.sleep(0)
+        assert not callers[1].done()  # the other waiter keeps the computation alive
+        callers[1].cancel()
+        await asyncio.sleep(0.2)
+        return await cache.get("summary", "k")
+
+    stored = asyncio.run(main())
+    if finish_abandoned:
+        assert progress == ["started", "finished"]
+        assert stored == "value"
+    else:
+        assert progress == ["started"]
+        assert stored is None
@@ -0,0 +1,182 @@
+"""
+Tests for feed ingestion and the pluggable news sources.
+"""
+
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.db.article_store import ArticleStore
+from src.news import search, sources
+from src.news.feeds import FeedPoller, FeedProvider, parse_feed
+from src.news.records import ArticleRecord
+
+NOW = datetime.now(timezone.utc)
+
+RSS = f"""<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <title>Space Wire</title>
+  <item>
+    <title>Rover finds ancient riverbed on Mars</title>
+    <link>https://space.example/mars-riverbed</link>
+    <description>&lt;p&gt;The rover found a &lt;b&gt;riverbed&lt;/b&gt; on Mars.&lt;/p&gt;</description>
+    <pubDate>{format_datetime(NOW - timedelta(hours=2))}</pubDate>
+  </item>
+  <item>
+    <title>Old Mars mission retrospective</title>
+    <link>https://space.example/old</link>
+    <description>A look back at Mars missions.</description>
+    <pubDate>{format_datetime(NOW - timedelta(days=30))}</pubDate>
+  </item>
+</channel></rss>
+""".encode()
+
+ATOM = f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Planet News</title>
+  <entry>
+    <title>Mars sample return delayed</title>
+    <link rel="self" href="https://planet.example/feed/1"/>
+    <link rel="alternate" href="https://planet.example/mars-sample"/>
+    <summary>Mars sample return slips again.</summary>
+    <updated>{(NOW - timedelta(hours=1)).isoformat()}</updated>
+  </entry>
+</feed>
+""".encode()
+
+
+@pytest.fixture
+def feed_files(tmp_path):
+    rss, atom = tmp_path / "space.xml", tmp_path / "planet.atom"
+    rss.write_bytes(RSS)
+    atom.write_bytes(ATOM)
+    return [str(rss), atom.as_uri()]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ArticleStore(str(tmp_path / "feeds.sqlite3"))
+
+
+def test_parse_rss_and_atom():
+    rss = parse_feed(RSS, "https://space.example/rss")
+    assert [entry["title"] for entry in rss] == ["Rover finds ancient riverbed on Mars", "Old Mars mission retrospective"]
+    assert rss[0]["summary"] == "The rover found a riverbed on Mars."
+    assert rss[0]["source"] == "Space Wire"
+    assert rss[0]["published_at"] == pytest.approx((NOW - timedelta(hours=2)).timestamp(), abs=1)
+
+    atom = parse_feed(ATOM, "https://planet.example/feed")
+    assert atom[0]["link"] == "https://planet.example/mars-sample"
+    assert atom[0]["source"] == "Planet News"
+    assert atom[0]["published_at"] == pytest.approx((NOW - timedelta(hours=1)).timestamp(), abs=1)
+
+
+def test_poll_indexes_entries_and_provider_filters_by_period(feed_files, index):
+    async def main():
+        poller = FeedPoller(feed_files, index, interval=60)
+        indexed = await poller.poll_once()
+        recent = await FeedProvider(index).search("mars", "1d", 10)
+        month = await FeedProvider(index).search("mars", "60d", 10)
+        return indexed, recent, month
+
+    indexed, recent, month = asyncio.run(main())
+    assert indexed == 3
+    assert {record.link for record in recent} == {"https://space.example/mars-riverbed", "https://planet.example/mars-sample"}
+    assert len(month) == 3
+    record = next(record for record in recent if record.source == "Space Wire")
+    assert record.content == "The rover found a riverbed on Mars."
+
+
+def test_unchanged_entries_are_not_rewritten(feed_files, index):
+    async def main():
+        poller = FeedPoller(feed_files, index, interval=60)
+        await poller.poll_once()
+        changes = await index._run(lambda: index._connection().total_changes)
+        await poller.poll_once()
+        return changes, await index._run(lambda: index._connection().total_changes)
+
+    before, after = asyncio.run(main())
+    assert after == before
+
+
+def test_unreadable_feed_is_skipped(feed_files, index, tmp_path):
+    (tmp_path / "broken.xml").write_text("<rss><channel>")
+    poller = FeedPoller(feed_files + [str(tmp_path / "broken.xml"), str(tmp_path / "missing.xml")], index, 60)
+    assert asyncio.run(poller.poll_once()) == 3
+
+
+class FakeProvider(sources.SourceProvider):
+    def __init__(self, name, records, local=False):
+        self.name, self.records, self.local = name, records, local
+        self.calls = 0
+
+    async def search(self, query, time_period, limit):
+        self.calls += 1
+        if isinstance(self.records, Exception):
+            raise self.records
+        return self.records[:limit]
+
+
+def test_merge_drops_duplicate_links_and_titles_across_providers():
+    feed = [ArticleRecord("Mars sample return delayed", link="https://www.planet.example/mars-sample?utm_source=rss")]
+    serp = [
+        ArticleRecord("Mars sample return delayed", link="https://planet.example/mars-sample"),
+        ArticleRecord("Mars Sample Return Delayed!", link="https://syndicated.example/copy"),
+        ArticleRecord("Live updates", link="https://a.example/live"),
+        ArticleRecord("Live updates", link="https://b.example/live"),
+    ]
+    merged = sources.merge_results([feed, serp])
+    assert [record.link for record in merged] == [feed[0].link, "https://a.example/live", "https://b.example/live"]
+
+
+def test_local_first_skips_remote_when_local_results_suffice(monkeypatch):
+    monkeypatch.setitem(sources.SOURCES_CONFIG, "local_first", True)
+    local = FakeProvider("feeds", [ArticleRecord(f"story {i}", link=f"https://l.example/{i}") for i in range(3)], local=True)
+    remote = FakeProvider("serpapi", [ArticleRecord("remote", link="https://r.example/1")])
+
+    merged = asyncio.run(sources.search_sources("mars", "1d", 3, [local, remote]))
+    assert len(merged) == 3 and remote.calls == 0
+
+    merged = asyncio.run(sources.search_sources("mars", "1d", 4, [local, remote]))
+    assert [record.link for record in merged][-1] == "https://r.example/1" and remote.calls == 1
+
+
+def test_failed_provider_is_tolerated_unless_all_fail(monkeypatch):
+    monkeypatch.setitem(sources.SOURCES_CONFIG, "local_first", False)
+    ok = FakeProvider("feeds", [ArticleRecord("story", link="https://l.example/1")], local=True)
+    broken = FakeProvider("serpapi", RuntimeError("quota exceeded"))
+
+    assert len(asyncio.run(sources.search_sources("mars", "1d", 5, [ok, broken]))) == 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(sources.search_sources("mars", "1d", 5, [broken]))
+
+
+def test_search_news_combines_feeds_and_serpapi(feed_files, index, monkeypatch):
+    monkeypatch.setitem(sources.SOURCES_CONFIG, "local_first", True)
+    fetched = []
+
+    async def fake_serp(params):
+        return {"news_results": [
+            {"title": "Mars sample return delayed", "link": "https://planet.example/mars-sample", "source": {"name": "Planet"}},
+            {"title": "Mars helicopter flies again", "link": "https://wire.example/heli", "source": {"name": "Wire"}},
+        ]}
+
+    async def fake_fetch(url, timeout=None, article=None):
+        fetched.append(url)
+        return "full text"
+
+    monkeypatch.setattr(search, "_serp_search", fake_serp)
+    monkeypatch.setattr(search, "fetch_article_content", fake_fetch)
+
+    async def main():
+        await FeedPoller(feed_files, index, 60).poll_once()
+        providers = [FeedProvider(index), search.SerpApiProvider("key")]
+        return await search.search_news("mars", time_period="1d", providers=providers)
+
+    results = asyncio.run(main())
+    links = [record.link for record in results]
+    assert sorted(links[:2]) == ["https://planet.example/mars-sample", "https://space.example/mars-riverbed"]
+    assert links[2:] == ["https://wire.example/heli"]
+    assert len(fetched) == 3
@@ -0,0 +1,118 @@
+"""
+Tests for per-domain fetch scheduling.
+"""
+
+import asyncio
+
+import pytest
+
+from src.news import fetch_scheduler as scheduler_module
+from src.news.fetch_scheduler import FetchScheduler
+
+
+@pytest.fixture(autouse=True)
+def config(monkeypatch):
+    settings = {
+        "default_timeout": 10.0,
+        "min_timeout": 0.5,
+        "max_timeout": 8.0,
+        "timeout_multiplier": 2.0,
+        "min_samples": 3,
+        "window": 10,
+        "max_per_host": 2,
+        "failure_threshold": 3,
+        "open_seconds": 60,
+        "save_interval": 3600,
+    }
+    for key, value in settings.items():
+        monkeypatch.setitem(scheduler_module.FETCH_CONFIG, key, value)
+
+
+def test_timeout_follows_observed_p95():
+    scheduler = FetchScheduler()
+    assert scheduler.timeout_for("fast.example") == 10.0
+
+    for latency in (0.2, 0.3, 0.4, 1.0):
+        scheduler.record("fast.example", latency, ok=True)
+    assert scheduler.timeout_for("fast.example") == pytest.approx(2.0)
+
+    for _ in range(3):
+        scheduler.record("tiny.example", 0.01, ok=True)
+        scheduler.record("slow.example", 30.0, ok=True)
+    assert scheduler.timeout_for("tiny.example") == 0.5
+    assert scheduler.timeout_for("slow.example") == 8.0
+
+
+def test_circuit_opens_after_consecutive_failures_and_probes(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scheduler_module.time, "time", lambda: now[0])
+    scheduler = FetchScheduler()
+
+    for _ in range(2):
+        scheduler.record("down.example", 10.0, ok=False)
+    scheduler.record("down.example", 0.1, ok=True)
+    for _ in range(2):
+        scheduler.record("down.example", 10.0, ok=False)
+    assert scheduler.allow("down.example")
+
+    scheduler.record("down.example", 10.0, ok=False)
+    assert not scheduler.allow("down.example")
+
+    now[0] += 61
+    assert scheduler.allow("down.example")  # one probe
+    assert not scheduler.allow("down.example")
+    scheduler.record("down.example", 10.0, ok=False)
+    assert not scheduler.allow("down.example")
+
+    now[0] += 61
+    assert scheduler.allow("down.example")
+    scheduler.record("down.example", 0.2, ok=True)
+    assert scheduler.allow("down.example")
+    assert scheduler.allow("down.example")
+
+
+def test_statistics_survive_restart(tmp_path):
+    path = str(tmp_path / "fetch_stats.json")
+    scheduler = FetchScheduler(path)
+    for latency in (0.1, 0.2, 0.3):
+        scheduler.record("news.example", latency, ok=True)
+    for _ in range(3):
+        scheduler.record("down.example", 10.0, ok=False)
+    scheduler.save()
+
+    restarted = FetchScheduler(path)
+    assert restarted.timeout_for("news.example") == pytest.approx(0.6)
+    assert not restarted.allow("down.example")
+
+
+def test_per_host_concurrency_is_bounded():
+    scheduler = FetchScheduler()
+    running = {"now": 0, "max": 0}
+
+    async def fetch(domain):
+        async with scheduler.slot(domain):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+
+    async def main():
+        await asyncio.gather(*(fetch("busy.example") for _ in range(6)))
+
+    asyncio.run(main())
+    assert running["max"] == 2
+
+
+def test_open_circuit_skips_fetch(monkeypatch):
+    from src.news import search
+
+    scheduler = FetchScheduler()
+    for _ in range(3):
+        scheduler.record("down.example", 10.0, ok=False)
+    monkeypatch.setattr(search, "get_fetch_scheduler", lambda: scheduler)
+
+    async def unexpected(*args):
+        raise AssertionError("fetch attempted while the circuit is open")
+
+    monkeypatch.setattr(search, "_fetch_and_extract", unexpected)
+    assert asyncio.run(search.fetch_article_content("https://down.example/story")) is None
@@ -0,0 +1,102 @@
+"""
+Tests for hedged requests.
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils import hedging
+from src.utils.hedging import HedgePolicy
+from src.utils.metrics import HEDGES_SENT, HEDGE_WINS
+
+
+@pytest.fixture(autouse=True)
+def config(monkeypatch):
+    settings = {"enabled": True, "percentile": 50, "budget": 1.0, "burst": 1,
+                "min_samples": 3, "min_delay": 0.01, "window": 50}
+    for key, value in settings.items():
+        monkeypatch.setitem(hedging.HEDGE_CONFIG, key, value)
+
+
+def _warm(policy, latency=0.02):
+    policy.latencies.extend([latency] * 3)
+
+
+def _slow_then_fast(delays):
+    """Call factory whose successive attempts take the given delays"""
+    calls = []
+
+    async def call():
+        attempt = len(calls)
+        calls.append(attempt)
+        await asyncio.sleep(delays[attempt])
+        return attempt
+
+    return call, calls
+
+
+def test_no_hedging_without_history():
+    policy = HedgePolicy("test_cold")
+    call, calls = _slow_then_fast([0.05, 0.0])
+
+    assert asyncio.run(policy.run(call)) == 0
+    assert calls == [0]
+
+
+def test_slow_primary_is_hedged_and_hedge_wins():
+    policy = HedgePolicy("test_win")
+    _warm(policy)
+    call, calls = _slow_then_fast([1.0, 0.01])
+
+    assert asyncio.run(policy.run(call)) == 1
+    assert calls == [0, 1]
+    assert HEDGES_SENT.get(call="test_win") == 1
+    assert HEDGE_WINS.get(call="test_win") == 1
+
+
+def test_fast_primary_is_not_hedged():
+    policy = HedgePolicy("test_fast")
+    _warm(policy, latency=0.2)
+    call, calls = _slow_then_fast([0.01, 0.01])
+
+    assert asyncio.run(policy.run(call)) == 0
+    assert calls == [0]
+
+
+def test_budget_limits_hedges():
+    policy = HedgePolicy("test_budget")
+    _warm(policy)
+    hedging.HEDGE_CONFIG["budget"] = 0.0
+    policy._tokens = 0
+
+    call, calls = _slow_then_fast([0.05, 0.0])
+    assert asyncio.run(policy.run(call)) == 0
+    assert calls == [0]
+    assert HEDGES_SENT.get(call="test_budget") == 0
+
+
+def test_failed_attempt_falls_back_to_other():
+    policy = HedgePolicy("test_failure")
+    _warm(policy)
+    attempts = []
+
+    async def call():
+        attempts.append(None)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("primary failed")
+        await asyncio.sleep(0.2)
+        return "hedge"
+
+    assert asyncio.run(policy.run(call)) == "hedge"
+
+
+def test_all_attempts_failing_raises_primary_error():
+    policy = HedgePolicy("test_all_fail")
+
+    async def call():
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        asyncio.run(policy.run(call))
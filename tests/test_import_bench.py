@@ -0,0 +1,24 @@
+"""
+Tests for the cold-start benchmark helpers.
+"""
+
+from benchmarks.import_bench import check_budgets, heaviest, parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |       3000 |     fastapi.routing
+import time:       900 |       5000 |   fastapi
+import time:       200 |       6200 | src.main
+"""
+
+
+def test_parse_importtime_and_rank_packages():
+    modules = parse_importtime(SAMPLE)
+    assert modules["fastapi"] == (900, 5000)
+    assert heaviest(modules, 2, exclude="src") == [["fastapi", 5.0], ["_io", 0.1]]
+
+
+def test_check_budgets_reports_slow_and_missing_targets():
+    results = {"src.cli": {"median_ms": 150.0}, "src.main": {"median_ms": 2400.0}}
+    violations = check_budgets(results, {"src.cli": 500, "src.main": 1500, "src.other": 10})
+    assert violations == ["src.main: 2400 ms > 1500 ms budget", "src.other: not measured"]
@@ -0,0 +1,104 @@
+"""
+Tests for the queued, sampled logging pipeline.
+"""
+
+import json
+import logging
+import queue
+import sys
+
+import pytest
+
+from src.utils import logging_setup
+from src.utils.logging_setup import JsonFormatter, LazyQueueHandler, SamplingFilter
+
+
+def _record(name, level=logging.DEBUG, msg="message", args=None, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture(autouse=True)
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    logging_setup.shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_sampling_rate_zero_drops_and_one_keeps_debug():
+    sampler = SamplingFilter({"src.news.search": 0.0, "src.news.content": 1.0})
+
+    assert not any(sampler.filter(_record("src.news.search")) for _ in range(100))
+    assert all(sampler.filter(_record("src.news.content")) for _ in range(100))
+
+
+def test_sampling_never_drops_info_or_unlisted_loggers():
+    sampler = SamplingFilter({"src": 0.0})
+
+    assert sampler.filter(_record("src.news.search", level=logging.INFO))
+    assert sampler.filter(_record("litellm"))
+    assert sampler.filter(_record("srcfoo.bar"))  # prefixes match on dotted boundaries only
+
+
+def test_sampling_uses_longest_matching_prefix():
+    sampler = SamplingFilter({"src": 0.0, "src.news.content": 1.0})
+
+    assert sampler.filter(_record("src.news.content.worker"))
+    assert not sampler.filter(_record("src.news.search"))
+
+
+def test_json_formatter_includes_extras_and_exception():
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        record = logging.LogRecord("src.test", logging.ERROR, __file__, 1, "failed %s", ("x",), None)
+        record.exc_info = sys.exc_info()
+    record.url = "https://example.com"
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "failed x"
+    assert payload["level"] == "ERROR"
+    assert payload["logger"] == "src.test"
+    assert payload["url"] == "https://example.com"
+    assert "ValueError: bad" in payload["exc_info"]
+
+
+def test_queue_handler_snapshots_mutable_arguments():
+    log_queue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    articles = ["one"]
+
+    handler.handle(_record("src.test", logging.INFO, "articles: %s", (articles,)))
+    articles.append("two")
+
+    queued = log_queue.get_nowait()
+    assert queued.getMessage() == "articles: ['one']"
+    assert queued.args is None
+
+
+def test_configure_logging_is_idempotent(tmp_path):
+    log_file = tmp_path / "app.log"
+
+    first = logging_setup.configure_logging(level="INFO", log_file=str(log_file), json_output=True)
+    second = logging_setup.configure_logging(level="INFO", log_file=str(log_file), json_output=True)
+
+    root = logging.getLogger()
+    assert len([h for h in root.handlers if isinstance(h, LazyQueueHandler)]) == 1
+    assert first is not second
+    assert logging_setup.ensure_logging() is second
+
+    logging.getLogger("src.test").info("hello %s", "world", extra={"topic": "ai"})
+    logging_setup.shutdown_logging()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["message"] == "hello world"
+    assert json.loads(lines[0])["topic"] == "ai"
@@ -0,0 +1,122 @@
+"""
+Tests for the in-flight memory budget.
+"""
+
+import asyncio
+
+from src.utils import memory_budget
+from src.utils.memory_budget import MemoryBudget
+from src.utils.metrics import MEMORY_BUDGET_IN_USE
+
+
+def test_reservations_wait_for_room_in_arrival_order():
+    budget = MemoryBudget(100)
+    order = []
+
+    async def main():
+        first = await budget.acquire(60, "fetch")
+
+        async def waiter(name, nbytes):
+            reservation = await budget.acquire(nbytes, "prompt")
+            order.append(name)
+            return reservation
+
+        large = asyncio.ensure_future(waiter("large", 80))
+        small = asyncio.ensure_future(waiter("small", 10))
+        await asyncio.sleep(0)
+        # The small one would fit, but does not overtake the large one
+        assert budget.waiting == 2 and order == []
+
+        first.shrink(30, stage="extract")
+        await asyncio.sleep(0)
+        assert order == [] and MEMORY_BUDGET_IN_USE.get(stage="extract") >= 30
+
+        first.release()
+        (await large).release()
+        (await small).release()
+
+    asyncio.run(main())
+    assert order == ["large", "small"]
+    assert budget.in_use == 0 and budget.waiting == 0
+
+
+def test_oversized_reservation_runs_alone():
+    budget = MemoryBudget(100)
+
+    async def main():
+        reservation = await budget.acquire(500, "fetch")
+        assert reservation.nbytes == 100 and budget.in_use == 100
+        reservation.release()
+        reservation.release()
+
+    asyncio.run(main())
+    assert budget.in_use == 0
+
+
+def test_cancelled_waiter_does_not_hold_the_queue():
+    budget = MemoryBudget(100)
+
+    async def main():
+        held = await budget.acquire(90, "fetch")
+        blocked = asyncio.ensure_future(budget.acquire(50, "fetch"))
+        behind = asyncio.ensure_future(budget.acquire(10, "prompt"))
+        await asyncio.sleep(0)
+        blocked.cancel()
+        await asyncio.sleep(0)
+        (await behind).release()
+        held.release()
+
+    asyncio.run(main())
+    assert budget.in_use == 0 and budget.waiting == 0
+
+
+def test_reserve_memory_is_a_no_op_when_disabled(monkeypatch):
+    monkeypatch.setitem(memory_budget.MEMORY_CONFIG, "budget_bytes", 0)
+    monkeypatch.setattr(memory_budget, "_budget", None)
+
+    async def main():
+        async with memory_budget.reserve_memory(10**12, "fetch") as reservation:
+            assert reservation.budget is None and reservation.waited == 0
+
+    asyncio.run(main())
+
+
+def test_large_pages_are_cut_off_and_parse_trees_released(monkeypatch):
+    from benchmarks.stubs import PublisherFarm
+    from src.news import search
+
+    monkeypatch.setitem(memory_budget.MEMORY_CONFIG, "budget_bytes", 8 * 1024 * 1024)
+    monkeypatch.setitem(memory_budget.MEMORY_CONFIG, "max_page_bytes", 64 * 1024)
+    monkeypatch.setattr(memory_budget, "_budget", None)
+    profile = {"publishers": 1, "page_latency_ms": 0, "page_size_kb": 512, "page_size_sigma": 0, "page_error_rate": 0}
+    parsed = []
+    extract = search._extract_text
+    monkeypatch.setattr(search, "_extract_text", lambda html: parsed.append(len(html)) or extract(html))
+
+    farm = PublisherFarm(profile).start()
+
+    async def main():
+        pages = [search._fetch_page(farm.article_url(i, "big"), 5) for i in range(4)]
+        return await asyncio.gather(*pages)
+
+    try:
+        texts = asyncio.run(main())
+    finally:
+        farm.stop()
+
+    assert all(text and len(text) <= 3003 for text in texts)
+    assert parsed == [64 * 1024] * 4
+    budget = memory_budget.get_memory_budget()
+    assert budget.in_use == 0 and MEMORY_BUDGET_IN_USE.get(stage="extract") == 0
+
+
+def test_burst_of_digests_stays_within_the_budget():
+    from benchmarks.memory_budget_bench import parse_args, run_child
+
+    # The burst runs in a fresh interpreter, so the RSS measured is its own
+    args = parse_args(["--users", "3", "--topics-per-user", "3", "--page-kb", "128"])
+    stats = run_child(args, budget_mb=12)
+    assert stats["errors"] == 0 and stats["pages_fetched"] >= 50
+    # The budget was the limiting factor, and RSS grew no more than it
+    assert 8 < stats["peak_reserved_mb"] <= 12
+    assert stats["within_budget"], stats
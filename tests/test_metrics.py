@@ -0,0 +1,148 @@
+"""
+Tests for the metrics registry, span tracing and request timings.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.news.records import ArticleRecord
+from src.utils import metrics
+from src.utils.metrics import Counter, Histogram, span, start_trace, get_trace
+
+
+def test_histogram_buckets_and_exposition():
+    hist = Histogram("test_latency_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0))
+    hist.observe(0.05, stage="a")
+    hist.observe(0.5, stage="a")
+    hist.observe(5.0, stage="a")
+
+    lines = hist.collect()
+    assert "# TYPE test_latency_seconds histogram" in lines
+    assert 'test_latency_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_sum{stage="a"} 5.55' in lines
+    assert 'test_latency_seconds_count{stage="a"} 3' in lines
+
+
+def test_label_values_are_escaped():
+    counter = Counter("test_escape_total", "Escaping", ("value",))
+    counter.inc(value='a "quoted"\\path\nnext')
+
+    assert 'test_escape_total{value="a \\"quoted\\"\\\\path\\nnext"} 1' in counter.collect()
+
+
+def test_snapshot_is_a_copy():
+    hist = Histogram("test_snapshot_seconds", "Snapshot", buckets=(1.0,))
+    hist.observe(0.5)
+    snapshot = hist.snapshot()
+    hist.observe(0.5)
+
+    assert snapshot[()][2] == 1
+    assert hist.snapshot()[()][2] == 2
+
+
+def test_cache_hit_ratio_collector():
+    metrics.record_cache_lookup('ratio"test', True)
+    metrics.record_cache_lookup('ratio"test', True)
+    metrics.record_cache_lookup('ratio"test', False)
+
+    lines = metrics._cache_hit_ratio_lines()
+    assert 'newsaroo_cache_hit_ratio{cache="ratio\\"test"} 0.6666666666666666' in lines
+
+
+def test_span_records_duration_and_errors():
+    errors_before = metrics.SPAN_ERRORS.get(span="test.failing")
+
+    with pytest.raises(RuntimeError):
+        with span("test.failing", kind="outbound"):
+            raise RuntimeError("boom")
+    with span("test.failing") as soft:
+        soft.error = "HTTP 503"
+    with span("test.ok"):
+        pass
+
+    assert metrics.SPAN_ERRORS.get(span="test.failing") == errors_before + 2
+    assert metrics.SPAN_ERRORS.get(span="test.ok") == 0
+    assert metrics.SPANS_IN_FLIGHT.get(span="test.failing") == 0
+    durations = metrics.SPAN_DURATION.snapshot()
+    assert durations[("test.failing", "outbound")][2] >= 1
+
+
+def test_trace_is_isolated_between_tasks():
+    async def request(name):
+        trace = start_trace()
+        await asyncio.sleep(0)
+        with span(name):
+            await asyncio.sleep(0)
+        return trace
+
+    async def main():
+        return await asyncio.gather(
+            asyncio.create_task(request("first")),
+            asyncio.create_task(request("second")),
+        )
+
+    first, second = asyncio.run(main())
+    assert [entry["span"] for entry in first] == ["first"]
+    assert [entry["span"] for entry in second] == ["second"]
+    assert get_trace() is None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from src.api import routes
+    from src.news import summary
+    from src.main import app
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        with span("serpapi.search", kind="outbound"):
+            pass
+        return [ArticleRecord("Story", source={"name": "Daily"}, snippet="Something happened")]
+
+    async def fake_summarize(articles, topic, model=None, max_tokens=None, latency_target=None):
+        with span("llm.completion", kind="outbound", model="test"):
+            pass
+        return "1. Item"
+
+    class FakeSupabase:
+        async def get_user(self, mobile):
+            return {"mobile_number": mobile, "topics_of_interest": ["ai"]}
+
+    monkeypatch.setattr(routes, "search_news", fake_search)
+    monkeypatch.setattr(summary, "summarize_with_llm", fake_summarize)
+    monkeypatch.setattr(routes, "summarize_with_llm", fake_summarize)
+    monkeypatch.setattr(routes, "get_supabase_client", lambda: FakeSupabase())
+    return TestClient(app)
+
+
+def test_summarize_returns_timings_when_requested(client):
+    response = client.post("/api/v1/news/summarize", json={"topic": "ai", "include_timings": True})
+
+    assert response.status_code == 200
+    spans = [entry["span"] for entry in response.json()["metadata"]["timings"]]
+    assert "serpapi.search" in spans
+    assert "llm.completion" in spans
+    assert "process" in spans
+
+    plain = client.post("/api/v1/news/summarize", json={"topic": "ai"})
+    assert "timings" not in plain.json()["metadata"]
+
+
+def test_user_summaries_return_timings_when_requested(client):
+    response = client.get("/api/v1/users/9876543210/summaries", params={"include_timings": "true"})
+
+    assert response.status_code == 200
+    spans = [entry["span"] for entry in response.json()["metadata"]["timings"]]
+    assert "serpapi.search" in spans
+    assert "llm.completion" in spans
+
+
+def test_metrics_endpoint_uses_route_templates(client):
+    client.get("/api/v1/users/9876543210/summaries")
+    body = client.get("/metrics").text
+
+    assert 'route="/api/v1/users/{mobile}/summaries"' in body
+    assert "9876543210" not in body
@@ -0,0 +1,100 @@
+"""
+Tests for LLM model routing.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.stubs import FakeCompletionServer
+from src.news import model_router, summary
+from src.news.model_router import ModelRouter
+from src.news.records import ArticleRecord
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setitem(model_router.LLM_ROUTER_CONFIG, "models", ["gpt-4", "gpt-4o-mini"])
+    monkeypatch.setitem(model_router.LLM_ROUTER_CONFIG, "expected_latency", {"gpt-4": 12.0, "gpt-4o-mini": 2.0})
+    monkeypatch.setitem(model_router.LLM_ROUTER_CONFIG, "fallback", True)
+    monkeypatch.setitem(model_router.LLM_ROUTER_CONFIG, "latency_target", 0)
+    return model_router.LLM_ROUTER_CONFIG
+
+
+def test_preferred_model_without_a_target(config):
+    route = ModelRouter(config["models"]).choose(1000, 500)
+    assert (route.model, route.reason, route.fallback) == ("gpt-4", "preferred", None)
+
+
+def test_large_prompts_go_to_a_model_that_fits(config):
+    route = ModelRouter(config["models"]).choose(20000, 1000)
+    assert (route.model, route.reason) == ("gpt-4o-mini", "prompt_size")
+
+
+def test_latency_target_uses_observed_latency(config):
+    router = ModelRouter(config["models"])
+    route = router.choose(1000, 500, latency_target=5)
+    assert (route.model, route.reason) == ("gpt-4o-mini", "latency_target")
+
+    # Once gpt-4 is seen answering quickly it meets the target, with gpt-4o-mini as fallback
+    for _ in range(config["min_samples"]):
+        router.record("gpt-4", 1.0, ok=True)
+        router.record("gpt-4o-mini", 0.5, ok=True)
+    route = router.choose(1000, 500, latency_target=5)
+    assert (route.model, route.reason, route.fallback) == ("gpt-4", "preferred", "gpt-4o-mini")
+
+    route = router.choose(1000, 500, latency_target=0.1)
+    assert (route.model, route.reason) == ("gpt-4o-mini", "fastest")
+
+
+def test_failing_models_are_skipped(config):
+    router = ModelRouter(config["models"])
+    for _ in range(config["min_samples"]):
+        router.record("gpt-4", 3.0, ok=False)
+    route = router.choose(1000, 500)
+    assert (route.model, route.reason) == ("gpt-4o-mini", "error_rate")
+
+
+def test_fallback_wins_when_primary_misses_the_deadline(config):
+    router = ModelRouter(config["models"])
+    route = model_router.Route("gpt-4", "preferred", fallback="gpt-4o-mini")
+
+    async def call(model):
+        await asyncio.sleep(1.0 if model == "gpt-4" else 0.01)
+        return model
+
+    result, used = asyncio.run(router.run(route, call, latency_target=0.05))
+    assert result == "gpt-4o-mini" and used.reason == "fallback_deadline"
+
+
+def test_summaries_fall_back_against_the_fake_completion_endpoint(config, monkeypatch):
+    from src.api import routes
+    from src.main import app
+
+    # gpt-4 is believed fast but the endpoint answers it slowly
+    server = FakeCompletionServer({
+        "llm_ttft_ms": 20,
+        "llm_completion_tokens": 20,
+        "llm_models": {"gpt-4": {"llm_ttft_ms": 3000}},
+    }).start()
+    monkeypatch.setitem(summary.LLM_CONFIG, "api_base", server.api_base)
+    monkeypatch.setitem(config, "expected_latency", {"gpt-4": 0.2, "gpt-4o-mini": 0.1})
+    monkeypatch.setattr(model_router, "_router", None)
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        return [ArticleRecord("Launch", link="https://a.example/1", source="Wire", full_content="Rocket launched")]
+
+    monkeypatch.setattr(routes, "search_news", fake_search)
+    try:
+        response = TestClient(app).post(
+            "/api/v1/news/summarize", json={"topic": "space", "latency_target_ms": 1000}
+        )
+    finally:
+        server.stop()
+
+    assert response.status_code == 200
+    metadata = response.json()["metadata"]
+    assert metadata["model"] == "gpt-4o-mini" and metadata["model_reason"] == "fallback_deadline"
+    assert server.models["gpt-4"] == 1 and server.models["gpt-4o-mini"] == 1
+    assert "1." in response.json()["summary"]
@@ -0,0 +1,118 @@
+"""
+Tests for on-demand request profiling and the event-loop lag monitor.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.news.records import ArticleRecord
+from src.utils import profiling
+from src.utils.profiling import LoopLagMonitor
+
+
+def _parse_pages_slowly():
+    # Stands in for blocking HTML parsing on the event loop
+    deadline = time.perf_counter() + 0.15
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    from src.api import routes
+    from src.main import app
+    from src.news import summary
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        _parse_pages_slowly()
+        return [ArticleRecord("Story", link="https://a.example/1", source={"name": "Daily"}, snippet="Text")]
+
+    async def fake_summarize(articles, topic, model=None, max_tokens=None, latency_target=None):
+        return "1. Story"
+
+    monkeypatch.setattr(routes, "search_news", fake_search)
+    monkeypatch.setattr(summary, "summarize_with_llm", fake_summarize)
+    monkeypatch.setattr(routes, "summarize_with_llm", fake_summarize)
+    monkeypatch.setitem(profiling.PROFILING_CONFIG, "dir", str(tmp_path / "profiles"))
+    monkeypatch.setitem(profiling.PROFILING_CONFIG, "sample_interval", 0.002)
+    return TestClient(app)
+
+
+def _summarize(client, headers):
+    return client.post("/api/v1/news/summarize", json={"topic": "space"}, headers=headers)
+
+
+def test_profiling_is_off_without_an_admin_token(client, monkeypatch):
+    monkeypatch.setitem(profiling.PROFILING_CONFIG, "admin_token", "")
+    response = _summarize(client, {"X-Profile": "1", "X-Admin-Token": ""})
+    assert response.status_code == 200 and "x-profile-id" not in response.headers
+    assert client.get("/api/v1/admin/profiles").status_code == 404
+
+
+def test_wrong_token_is_not_profiled(client, monkeypatch):
+    monkeypatch.setitem(profiling.PROFILING_CONFIG, "admin_token", "s3cret")
+    response = _summarize(client, {"X-Profile": "1", "X-Admin-Token": "guess"})
+    assert response.status_code == 200 and "x-profile-id" not in response.headers
+    assert client.get("/api/v1/admin/profiles", headers={"X-Admin-Token": "guess"}).status_code == 403
+
+
+def test_profiled_request_returns_folded_stacks(client, monkeypatch):
+    monkeypatch.setitem(profiling.PROFILING_CONFIG, "admin_token", "s3cret")
+    admin = {"X-Admin-Token": "s3cret"}
+    response = _summarize(client, {"X-Profile": "1", **admin})
+    assert response.status_code == 200 and response.json()["summary"] == "1. Story"
+    profile_id = response.headers["x-profile-id"]
+
+    listed = client.get("/api/v1/admin/profiles", headers=admin).json()["profiles"]
+    assert listed[0]["id"] == profile_id and listed[0]["request"] == "POST /api/v1/news/summarize"
+    assert listed[0]["status"] == "200"
+
+    stacks = client.get(f"/api/v1/admin/profiles/{profile_id}", headers=admin)
+    assert stacks.status_code == 200 and stacks.headers["content-type"].startswith("text/plain")
+    lines = stacks.text.splitlines()
+    # "thread;outer;...;inner count", with the blocking function on the loop thread's stacks
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    blocking = sum(int(line.rsplit(" ", 1)[1]) for line in lines if "_parse_pages_slowly" in line)
+    assert blocking >= 10
+    assert client.get("/api/v1/admin/profiles/missing", headers=admin).status_code == 404
+
+    # The sampling thread stops once no profile is active
+    time.sleep(0.05)
+    assert profiling._get_sampler()._thread is None
+
+
+def test_old_profiles_are_pruned(client, monkeypatch):
+    monkeypatch.setitem(profiling.PROFILING_CONFIG, "admin_token", "s3cret")
+    monkeypatch.setitem(profiling.PROFILING_CONFIG, "keep", 2)
+    ids = [_summarize(client, {"X-Profile": "1", "X-Admin-Token": "s3cret"}).headers["x-profile-id"] for _ in range(3)]
+    assert {entry["id"] for entry in profiling.list_profiles()} <= set(ids)
+    assert len(profiling.list_profiles()) == 2
+
+
+def _block_loop():
+    time.sleep(0.2)
+
+
+def test_loop_monitor_records_stalls_with_the_blocking_stack():
+    monitor = LoopLagMonitor(threshold=0.05, interval=0.01, keep=10)
+
+    async def main():
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.05)
+        _block_loop()
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(main())
+    assert len(monitor.stalls) == 1
+    stall = monitor.stalls[0]
+    assert stall["lag_ms"] >= 150
+    assert any("_block_loop" in frame for frame in stall["stack"])
+
+
+def test_loop_monitor_is_off_by_default(monkeypatch):
+    monkeypatch.setitem(profiling.PROFILING_CONFIG, "loop_monitor", False)
+    assert profiling.start_loop_monitor() is None
@@ -0,0 +1,42 @@
+"""
+Tests for article records.
+"""
+
+import asyncio
+
+from src.news.content import process_news_results
+from src.news.records import ArticleRecord
+
+
+def test_source_is_normalized_once_and_interned():
+    from_dict = ArticleRecord.from_serp({"title": "a", "source": {"name": "Daily " + "Planet", "icon": "x.png"}})
+    from_name = ArticleRecord.from_serp({"title": "b", "source": "".join(["Daily", " Planet"])})
+    missing = ArticleRecord.from_serp({})
+
+    assert from_dict.source == from_name.source == "Daily Planet"
+    assert from_dict.source is from_name.source
+    assert from_dict.source_details == {"name": "Daily Planet", "icon": "x.png"}
+    assert from_name.source_details is None
+    assert (missing.title, missing.source, missing.content) == ("Untitled", "Unknown Source", "No content available")
+
+
+def test_content_prefers_full_text_and_preview_is_derived():
+    record = ArticleRecord("t", snippet="short snippet")
+    assert record.content == record.preview == "short snippet"
+    assert not record.has_full_content
+
+    record.full_content = "x" * 250
+    assert record.content == "x" * 250
+    assert record.preview == "x" * 200 + "..."
+    assert not hasattr(record, "__dict__")
+
+
+def test_process_keeps_records_and_converts_dicts():
+    record = ArticleRecord("kept", full_content="body")
+    processed = asyncio.run(process_news_results(
+        [record, {"title": "converted", "description": "desc", "link": "https://x.example"}, {"title": "dropped"}],
+        max_articles=2
+    ))
+    assert processed[0] is record
+    assert (processed[1].title, processed[1].content, processed[1].link) == ("converted", "desc", "https://x.example")
+    assert len(processed) == 2
@@ -0,0 +1,105 @@
+"""
+Tests for response serialization and the pre-serialized response cache.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import serialization
+from src.api.models import NewsResponse
+from src.news.records import ArticleRecord
+
+
+def _articles():
+    return [
+        ArticleRecord("Café opens on Mars", link="https://a.example/1", source={"name": "Daily", "icon": "i.png"},
+                      full_content="The first café. " * 30),
+        ArticleRecord("Rover update", link="https://b.example/2", source="Wire", snippet="Short"),
+    ]
+
+
+def _response():
+    metadata = {"time_period": "1d", "articles_found": 2, "total_results": 2, "degraded": False}
+    return serialization.news_response("mars", "1. Café", _articles(), "2024-03-07T12:00:00", metadata)
+
+
+@pytest.mark.parametrize("orjson", [serialization.orjson, None])
+def test_fast_body_matches_the_validated_model(monkeypatch, orjson):
+    monkeypatch.setattr(serialization, "orjson", orjson)
+    monkeypatch.setitem(serialization.RESPONSE_CONFIG, "fast_json", True)
+    fast = serialization.encode(_response(), NewsResponse)
+    monkeypatch.setitem(serialization.RESPONSE_CONFIG, "fast_json", False)
+    validated = serialization.encode(_response(), NewsResponse)
+
+    assert json.loads(fast) == json.loads(validated)
+    assert NewsResponse.model_validate_json(fast).articles[0].source_details == {"name": "Daily", "icon": "i.png"}
+    # UTF-8, not \u escapes
+    assert "Café".encode("utf-8") in fast
+
+
+def test_validated_mode_rejects_a_malformed_body(monkeypatch):
+    monkeypatch.setitem(serialization.RESPONSE_CONFIG, "fast_json", False)
+    body = _response()
+    del body["summary"]
+    with pytest.raises(ValueError):
+        serialization.encode(body, NewsResponse)
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    from src.api import routes
+    from src.news import summary
+    from src.utils import cache
+
+    monkeypatch.setitem(cache.CACHE_CONFIG, "enabled", True)
+    monkeypatch.setitem(cache.CACHE_CONFIG, "path", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cache, "_cache", None)
+    calls = {"search": 0, "summary": "1. Café on Mars"}
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        calls["search"] += 1
+        return _articles()
+
+    async def fake_summarize(articles, topic, model=None, max_tokens=None, latency_target=None):
+        if isinstance(calls["summary"], Exception):
+            raise calls["summary"]
+        return calls["summary"]
+
+    monkeypatch.setattr(routes, "search_news", fake_search)
+    monkeypatch.setattr(summary, "summarize_with_llm", fake_summarize)
+    monkeypatch.setattr(routes, "summarize_with_llm", fake_summarize)
+    return calls
+
+
+def test_cached_response_is_served_without_running_the_pipeline(pipeline):
+    from src.main import app
+
+    with TestClient(app) as client:
+        first = client.post("/api/v1/news/summarize", json={"topic": "mars"})
+        second = client.post("/api/v1/news/summarize", json={"topic": "mars"})
+        other = client.post("/api/v1/news/summarize", json={"topic": "mars", "max_articles": 2})
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content and second.headers["etag"] == first.headers["etag"]
+    assert first.json()["summary"] == "1. Café on Mars"
+    # Different options are a different response
+    assert other.status_code == 200 and pipeline["search"] == 2
+
+
+def test_timed_and_degraded_responses_are_not_cached(pipeline):
+    from src.main import app
+
+    with TestClient(app) as client:
+        client.post("/api/v1/news/summarize", json={"topic": "mars", "include_timings": True})
+        client.post("/api/v1/news/summarize", json={"topic": "mars", "include_timings": True})
+        assert pipeline["search"] == 2
+
+        pipeline["summary"] = RuntimeError("the LLM is down")
+        degraded = client.post("/api/v1/news/summarize", json={"topic": "venus"})
+        pipeline["summary"] = "1. Venus"
+        recovered = client.post("/api/v1/news/summarize", json={"topic": "venus"})
+
+    assert degraded.json()["metadata"]["degraded"] is True
+    assert recovered.json()["metadata"]["degraded"] is False and recovered.json()["summary"] == "1. Venus"
@@ -0,0 +1,122 @@
+"""
+Tests for the SerpAPI key pool.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.news import search, serp_keys
+from src.news.serp_keys import KeyPool, QuotaExhausted, SerpRateLimited, key_label
+
+
+@pytest.fixture
+def config(monkeypatch):
+    settings = {"monthly_quota": 0, "rate": 100.0, "burst": 2, "max_wait": 1.0, "backoff_initial": 5.0,
+                "backoff_max": 300.0, "save_interval": 3600}
+    for name, value in settings.items():
+        monkeypatch.setitem(serp_keys.SERP_KEYS_CONFIG, name, value)
+    return serp_keys.SERP_KEYS_CONFIG
+
+
+def _acquire(pool, times=1):
+    async def main():
+        return [await pool.acquire() for _ in range(times)]
+    return [state.key for state in asyncio.run(main())]
+
+
+def test_searches_are_spread_across_keys(config):
+    assert sorted(_acquire(KeyPool(["a", "b"]), 4)) == ["a", "a", "b", "b"]
+
+
+def test_acquire_waits_for_a_token(config, monkeypatch):
+    monkeypatch.setitem(config, "rate", 20.0)
+    monkeypatch.setitem(config, "burst", 1)
+    start = time.monotonic()
+    assert _acquire(KeyPool(["a"]), 3) == ["a", "a", "a"]
+    assert time.monotonic() - start >= 0.09
+
+
+def test_quota_per_key(config):
+    pool = KeyPool(["a:1", "b:2"])
+    assert sorted(_acquire(pool, 3)) == ["a", "b", "b"]
+    assert {entry["used"] for entry in pool.usage()} == {1, 2}
+    assert {entry["remaining"] for entry in pool.usage()} == {0}
+    with pytest.raises(QuotaExhausted):
+        _acquire(pool)
+
+
+def test_rate_limited_key_backs_off_alone(config, monkeypatch):
+    monkeypatch.setitem(config, "keys", ["a", "b"])
+    monkeypatch.setattr(serp_keys, "_pool", None)
+    used = []
+
+    def fake_get_dict(params):
+        used.append(params["api_key"])
+        if params["api_key"] == "a":
+            raise SerpRateLimited("Too many requests")
+        return {"news_results": [{"title": "t", "link": "https://n.example/1"}]}
+
+    monkeypatch.setattr(search, "_serp_get_dict", fake_get_dict)
+
+    async def main():
+        results = [await search._serp_request({"engine": "google_news", "q": "x", "api_key": None}) for _ in range(3)]
+        return results
+
+    results = asyncio.run(main())
+    assert all(result["news_results"] for result in results)
+    # "a" is tried once (both keys start with full buckets), then rests while "b" serves
+    assert used.count("a") == 1 and used.count("b") == 3
+    usage = {entry["key"]: entry for entry in serp_keys.get_key_pool().usage()}
+    assert usage[key_label("a")]["rate_limited"] == 1 and usage[key_label("a")]["backoff_seconds"] > 0
+    assert usage[key_label("b")]["backoff_seconds"] == 0
+
+
+def test_out_of_searches_marks_key_exhausted(config):
+    pool = KeyPool(["a", "b"])
+
+    async def main():
+        state = await pool.acquire()
+        error = SerpRateLimited("Your account has run out of searches.")
+        pool.release(state, rate_limited=True, out_of_searches=error.out_of_searches)
+        return state.key, [await pool.acquire() for _ in range(2)]
+
+    exhausted, later = asyncio.run(main())
+    assert {state.key for state in later} == {"a", "b"} - {exhausted}
+
+
+def test_usage_persists_and_merges_across_workers(config, tmp_path):
+    path = str(tmp_path / "usage.json")
+    first, second = KeyPool(["key-one:100"], path), KeyPool(["key-one:100"], path)
+    _acquire(first, 3)
+    _acquire(second, 2)
+    first.save()
+    second.save()
+
+    with open(path) as f:
+        data = json.load(f)
+    assert data["keys"] == {key_label("key-one"): {"used": 5, "exhausted": False}}
+    assert "key-one" not in open(path).read()
+
+    restarted = KeyPool(["key-one:100"], path)
+    assert restarted.usage()[0]["used"] == 5 and restarted.usage()[0]["remaining"] == 95
+
+
+def test_usage_from_an_earlier_month_is_ignored(config, tmp_path):
+    path = tmp_path / "usage.json"
+    path.write_text(json.dumps({"period": "1999-01", "keys": {key_label("a"): {"used": 7, "exhausted": True}}}))
+    assert KeyPool(["a:100"], str(path)).usage()[0]["used"] == 0
+
+
+def test_usage_endpoint_hides_keys(config, monkeypatch):
+    from src.main import app
+
+    monkeypatch.setattr(serp_keys, "_pool", KeyPool(["secret-key:50"]))
+    response = TestClient(app).get("/api/v1/search/keys")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["keys"][0]["key"] == key_label("secret-key") and body["keys"][0]["quota"] == 50
+    assert "secret-key" not in response.text
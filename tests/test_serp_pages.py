@@ -0,0 +1,116 @@
+"""
+Tests for SerpAPI result paging.
+"""
+
+import asyncio
+
+import pytest
+
+from src.news import search
+from src.news.search import SerpApiProvider
+
+
+class FakeSerp:
+    """SerpAPI stand-in serving `total` results, optionally repeating some links"""
+
+    def __init__(self, total, duplicate_every=None, delay=0.01):
+        self.total = total
+        self.duplicate_every = duplicate_every
+        self.delay = delay
+        self.starts = []
+        self.in_flight = self.max_in_flight = 0
+        self.cancelled = 0
+
+    async def __call__(self, params):
+        start = params.get("start", 0)
+        self.starts.append(start)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Later pages are slower, so earlier ones complete first
+            await asyncio.sleep(self.delay * (1 + start // params["num"]))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        results = []
+        for i in range(start, min(start + params["num"], self.total)):
+            n = i - 1 if self.duplicate_every and i % self.duplicate_every == 0 else i
+            results.append({"title": f"story {i}", "link": f"https://n.example/{n}"})
+        return {"news_results": results}
+
+
+@pytest.fixture
+def serp(monkeypatch):
+    def install(fake):
+        monkeypatch.setattr(search, "_serp_search", fake)
+        return fake
+    monkeypatch.setitem(search.SERP_CONFIG, "page_size", 10)
+    monkeypatch.setitem(search.SERP_CONFIG, "max_pages", 3)
+    return install
+
+
+def test_single_page_when_limit_fits(serp):
+    fake = serp(FakeSerp(total=100))
+    records = asyncio.run(SerpApiProvider("key").search("mars", "1d", 10))
+    assert len(records) == 10 and fake.starts == [0]
+
+
+def test_extra_pages_are_fetched_concurrently(serp):
+    fake = serp(FakeSerp(total=100))
+    records = asyncio.run(SerpApiProvider("key").search("mars", "1d", 20))
+    assert [record.link for record in records] == [f"https://n.example/{i}" for i in range(20)]
+    assert sorted(fake.starts) == [0, 10] and fake.max_in_flight == 2
+
+
+def test_duplicates_are_dropped_and_topped_up_from_the_next_page(serp):
+    fake = serp(FakeSerp(total=100, duplicate_every=5))
+    records = asyncio.run(SerpApiProvider("key").search("mars", "1d", 20))
+    links = [record.link for record in records]
+    assert len(links) == 20 and len(set(links)) == 20
+    assert sorted(fake.starts) == [0, 10, 20]
+
+
+def test_stops_when_results_run_out(serp):
+    fake = serp(FakeSerp(total=4))
+    records = asyncio.run(SerpApiProvider("key").search("mars", "1d", 30))
+    assert len(records) == 4
+    # The short first page ends the search: later pages are cancelled, not topped up
+    assert fake.cancelled == 2 and len(fake.starts) == 3
+
+
+def test_pages_never_exceed_max_pages(serp, monkeypatch):
+    monkeypatch.setitem(search.SERP_CONFIG, "max_pages", 2)
+    fake = serp(FakeSerp(total=100))
+    assert len(asyncio.run(SerpApiProvider("key").search("mars", "1d", 50))) == 20
+    assert sorted(fake.starts) == [0, 10]
+
+
+def test_pages_are_cached_separately(serp, tmp_path, monkeypatch):
+    from src.utils import cache
+
+    monkeypatch.setitem(cache.CACHE_CONFIG, "enabled", True)
+    monkeypatch.setitem(cache.CACHE_CONFIG, "path", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(cache, "_cache", None)
+    fake = serp(FakeSerp(total=100))
+
+    async def main():
+        await SerpApiProvider("key").search("mars", "1d", 10)
+        await SerpApiProvider("key").search("mars", "1d", 20)
+
+    asyncio.run(main())
+    # The first page is shared; only the second one is a new request
+    assert fake.starts == [0, 10]
+
+
+def test_search_news_requests_enough_articles_for_max_articles(serp, monkeypatch):
+    fake = serp(FakeSerp(total=100))
+
+    async def fake_fetch(url, timeout=None, article=None):
+        return None
+
+    monkeypatch.setattr(search, "fetch_article_content", fake_fetch)
+    records = asyncio.run(search.search_news("mars", api_key="key", max_articles=20,
+                                             providers=[SerpApiProvider("key")]))
+    assert len(records) == 20 and sorted(fake.starts) == [0, 10]
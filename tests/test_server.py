@@ -0,0 +1,49 @@
+"""
+Tests for the server launcher.
+"""
+
+import pytest
+
+from src import server
+
+
+@pytest.fixture
+def uvicorn_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(server.uvicorn, "run", lambda app, **kwargs: calls.append((app, kwargs)))
+    return calls
+
+
+def test_production_runs_recycled_workers_with_shared_cache(monkeypatch, uvicorn_calls):
+    monkeypatch.delenv("NEWSAROO_CACHE_ENABLED", raising=False)
+    monkeypatch.setitem(server.SERVER_CONFIG, "max_requests_jitter", 250)
+
+    server.run_production(host="127.0.0.1", port=9000, workers=3, max_requests=1000, graceful_timeout=10)
+
+    app, kwargs = uvicorn_calls[0]
+    assert app == "src.main:app"
+    assert kwargs["workers"] == 3
+    assert kwargs["limit_max_requests"] == 1000
+    assert kwargs["limit_max_requests_jitter"] == 250
+    assert kwargs["timeout_graceful_shutdown"] == 10
+    assert "reload" not in kwargs
+    assert server.os.environ["NEWSAROO_CACHE_ENABLED"] == "true"
+
+
+def test_production_respects_disabled_cache_and_recycling(monkeypatch, uvicorn_calls):
+    monkeypatch.setenv("NEWSAROO_CACHE_ENABLED", "false")
+
+    server.run_production(workers=2, max_requests=0)
+
+    _, kwargs = uvicorn_calls[0]
+    assert kwargs["limit_max_requests"] is None
+    assert kwargs["limit_max_requests_jitter"] == 0
+    assert server.os.environ["NEWSAROO_CACHE_ENABLED"] == "false"
+
+
+def test_development_reloads_single_process(uvicorn_calls):
+    server.run_development(port=9001)
+
+    _, kwargs = uvicorn_calls[0]
+    assert kwargs["reload"] is True
+    assert kwargs["port"] == 9001
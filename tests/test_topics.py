@@ -0,0 +1,91 @@
+"""
+Tests for topic canonicalization.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.topic_dedup import analyze
+from src.news import topics
+from src.news.topics import canonical_topic, dedupe_topics, normalize_topic
+
+
+@pytest.fixture
+def aliases(monkeypatch, tmp_path):
+    path = tmp_path / "aliases.json"
+    path.write_text(json.dumps({"Gen-AI": "Generative AI", "F1": "Formula One"}))
+    monkeypatch.setitem(topics.TOPIC_CONFIG, "aliases_file", str(path))
+    monkeypatch.setattr(topics, "_aliases", None)
+    yield
+    topics._aliases = None
+
+
+def test_equivalent_spellings_share_a_canonical_topic():
+    spellings = ["AI", " ai ", "A.I.", "Artificial Intelligence", "artificial-intelligence", "ARTIFICIAL_intelligence"]
+    assert {canonical_topic(spelling) for spelling in spellings} == {"artificial intelligence"}
+    assert normalize_topic("  Pokémon   Go! ") == "pokemon go"
+    assert normalize_topic("Ｆｏｒｍｕｌａ　1") == "formula 1"
+
+
+def test_alias_file_extends_builtin_aliases(aliases):
+    assert canonical_topic("gen ai") == "generative ai"
+    assert canonical_topic("f1") == "formula one"
+    assert canonical_topic("AI") == "artificial intelligence"
+
+
+def test_dedupe_keeps_first_spelling():
+    assert dedupe_topics(["AI", "Climate", "artificial intelligence", "climate ", "Space"]) == ["AI", "Climate", "Space"]
+
+
+def test_search_query_and_cache_key_use_the_canonical_topic(monkeypatch):
+    from src.news import search
+
+    queries = []
+
+    async def fake_serp(params):
+        queries.append((params["q"], search._serp_cache_key(params)))
+        return {"news_results": []}
+
+    monkeypatch.setattr(search, "_serp_search", fake_serp)
+    for spelling in ("AI", "artificial-intelligence"):
+        asyncio.run(search.search_news(spelling, api_key="key"))
+    assert queries[0] == queries[1]
+    assert queries[0][0] == "artificial intelligence"
+
+
+def test_batch_computes_equivalent_topics_once(monkeypatch):
+    from src.api import routes
+    from src.news import summary
+    from src.main import app
+
+    searched = []
+
+    async def fake_search(topic, api_key=None, time_period=None, max_articles=None):
+        searched.append(topic)
+        return [{"title": "t", "link": "https://x.example", "source": {"name": "Daily"}, "snippet": "s"}]
+
+    async def fake_summarize(articles, topic, model=None, max_tokens=None, latency_target=None):
+        return "summary"
+
+    monkeypatch.setattr(routes, "search_news", fake_search)
+    monkeypatch.setattr(summary, "summarize_with_llm", fake_summarize)
+
+    response = TestClient(app).post("/api/v1/news/summarize/batch", json={"requests": [
+        {"topic": "AI"}, {"topic": "Artificial Intelligence"}, {"topic": "AI", "max_articles": 2},
+    ]})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results, done = lines[:-1], lines[-1]
+
+    assert len(searched) == 2
+    assert sorted(line["result"]["topic"] for line in results) == ["AI", "AI", "Artificial Intelligence"]
+    assert done["duplicate_topics"] == 1
+
+
+def test_dedup_report_counts_saved_searches():
+    results = analyze(["AI", "ai", "Artificial Intelligence", "climate", "Climate", "space"])
+    assert (results["raw_keys"], results["canonical_keys"], results["searches_saved"]) == (6, 3, 3)
+    assert results["canonical_hit_ratio"] == 0.5
+    assert results["largest_groups"][0] == ["artificial intelligence", ["AI", "Artificial Intelligence", "ai"]]